@@ -0,0 +1,86 @@
+"""
+Benchmark: IVF-flat approximate search vs. exact vector search
+
+Builds an exact VectorIndex and an IVFIndex over the same hashing-embedder
+vectors of a synthetic knowledge corpus and sweeps nprobe, reporting
+recall@k against the exact top-k and queries per second. Also times
+incremental inserts and deletes on the IVF index.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_ann_search
+    python -m benchmarks.bench_ann_search --entries 1000000 --nprobe 4 16 64
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from src.knowledge.embedder import HashingEmbedder
+from src.knowledge.ivf_index import IVFIndex
+from src.knowledge.snapshot import entry_text
+from src.knowledge.vector_index import VectorIndex
+
+from .common import format_table, time_per_call
+from .corpus import build_knowledge_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--nlist", type=int, default=0, help="Inverted lists (0 picks about sqrt(entries))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--updates", type=int, default=1000, help="Vectors inserted and deleted")
+    args = parser.parse_args()
+    
+    embedder = HashingEmbedder(args.dimension)
+    entries = build_knowledge_entries(args.entries + args.updates)
+    vectors = embedder.embed([entry_text(entry) for entry in entries])
+    indexed, inserted = vectors[:args.entries], vectors[args.entries:]
+    
+    # Queries are entry titles: short text near, but not equal to, the entry's vector
+    rng = random.Random(13)
+    query_vectors = embedder.embed([entries[rng.randrange(args.entries)]["title"] for _ in range(args.queries)])
+    
+    exact = VectorIndex(indexed)
+    started = time.perf_counter()
+    ivf = IVFIndex.build(indexed, nlist=args.nlist)
+    print(f"{args.entries} vectors, {ivf.nlist} lists, IVF built in {time.perf_counter() - started:.2f}s")
+    
+    expected = [{row for row, _ in exact.search(vector, args.limit)} for vector in query_vectors]
+    exact_time = time_per_call(lambda vector: exact.search(vector, args.limit), query_vectors, 1)
+    rows = [["exact", "-", "1.000", f"{1 / exact_time:.0f}", f"{exact_time * 1e3:.3f}"]]
+    for nprobe in args.nprobe:
+        def search(vector):
+            return ivf.search(vector, args.limit, nprobe=nprobe)
+        
+        query_time = time_per_call(search, query_vectors, 1)
+        recall = sum(
+            len(expected_rows & {row for row, _ in search(vector)})
+            for vector, expected_rows in zip(query_vectors, expected)
+        ) / sum(len(expected_rows) for expected_rows in expected)
+        rows.append([
+            "ivf", nprobe, f"{recall:.3f}", f"{1 / query_time:.0f}", f"{query_time * 1e3:.3f}"
+        ])
+    
+    print()
+    print(format_table(["index", "nprobe", f"recall@{args.limit}", "queries/sec", "ms/query"], rows))
+    
+    new_ids = np.arange(args.entries, args.entries + args.updates)
+    started = time.perf_counter()
+    for vector_id, vector in zip(new_ids, inserted):
+        ivf.add([vector_id], vector[None, :])
+    insert_time = (time.perf_counter() - started) / args.updates
+    started = time.perf_counter()
+    for vector_id in new_ids:
+        ivf.remove([vector_id])
+    delete_time = (time.perf_counter() - started) / args.updates
+    print(f"\nIVF insert: {insert_time * 1e6:.1f} us/vector, delete: {delete_time * 1e6:.1f} us/vector")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
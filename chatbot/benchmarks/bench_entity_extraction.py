@@ -0,0 +1,103 @@
+"""
+Benchmark: per-pattern entity extraction vs. the single-scan EntityExtractor
+
+Times the previous analyze_message_entities (six regex scans plus a
+substring test per technology) against one EntityExtractor scan per
+message and against batch extraction, for messages up to the
+5000-character ChatMessage.content limit.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_entity_extraction
+"""
+
+import argparse
+import random
+import re
+from typing import Dict, List
+
+from src.config import TECH_KEYWORDS, TECH_KEYWORD_ALIASES
+from src.nlp.entity_extractor import EntityExtractor
+
+from .common import format_table, time_per_call
+
+FILLER_WORDS = (
+    "please review the digital onboarding checklist before our sync and "
+    "update the postgresql migration notes for the team"
+).split()
+
+ENTITY_SNIPPETS = [
+    "python", "react", "node.js", "docker", "github", "sql", "kubernetes",
+    "12/05/2024", "2024-01-15", "jan 5, 2024", "3 days", "40 hours", "75%",
+    "jane.doe@example.com", "https://wiki.example.com/onboarding?step=2",
+]
+
+
+def per_pattern_extraction(message: str) -> Dict[str, List[str]]:
+    """The previous analyze_message_entities"""
+    entities = {"dates": [], "numbers": [], "emails": [], "urls": [], "technologies": [], "people": []}
+    date_patterns = [
+        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
+        r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',
+        r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2},?\s+\d{4}\b'
+    ]
+    for pattern in date_patterns:
+        entities["dates"].extend(re.findall(pattern, message, re.IGNORECASE))
+    entities["numbers"] = re.findall(
+        r'\b\d+(?:\.\d+)?(?:%|percent|hours?|days?|weeks?|months?|years?)?\b', message, re.IGNORECASE
+    )
+    entities["emails"] = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', message)
+    entities["urls"] = re.findall(r'https?://[^\s<>"{}|\\^`\[\]]+', message)
+    message_lower = message.lower()
+    for tech in TECH_KEYWORDS:
+        if tech.lower() in message_lower:
+            entities["technologies"].append(tech)
+    return entities
+
+
+def build_message(rng: random.Random, length: int) -> str:
+    """Filler text with an entity roughly every eighth word"""
+    words = []
+    while sum(len(word) + 1 for word in words) < length:
+        words.append(rng.choice(ENTITY_SNIPPETS) if rng.random() < 0.125 else rng.choice(FILLER_WORDS))
+    return " ".join(words)[:length]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[40, 200, 1000, 5000])
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = random.Random(5)
+    extractor = EntityExtractor(TECH_KEYWORDS, TECH_KEYWORD_ALIASES)
+    
+    sample = "Our digital team moved to PostgreSQL"
+    print(f"{sample!r}")
+    print(f"  per-pattern technologies: {per_pattern_extraction(sample)['technologies']}")
+    print(f"  single-scan technologies: {extractor.extract(sample)['technologies']}")
+    print()
+    
+    rows = []
+    for length in args.lengths:
+        messages = [build_message(rng, length) for _ in range(args.messages)]
+        assert extractor.extract_batch(messages) == [extractor.extract(message) for message in messages]
+        
+        legacy_time = time_per_call(per_pattern_extraction, messages, args.repeat)
+        scan_time = time_per_call(extractor.extract, messages, args.repeat)
+        batch_time = time_per_call(extractor.extract_batch, [messages], args.repeat) / len(messages)
+        rows.append([
+            length,
+            f"{legacy_time * 1e6:.1f}",
+            f"{scan_time * 1e6:.1f}",
+            f"{batch_time * 1e6:.1f}",
+            f"{legacy_time / scan_time:.1f}x",
+        ])
+    
+    print(format_table(
+        ["chars", "per-pattern us/msg", "single-scan us/msg", "batch us/msg", "speedup"], rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""
+Benchmark: typo-tolerant keyword matching
+
+Misspells keywords in the built-in intent examples (one deletion,
+insertion, substitution or transposition per keyword) and reports how
+often keyword classification still finds the intent with fuzzy matching
+off and on, plus the added cost per message. A second table compares the
+symmetric-delete lookup with an edit-distance scan over the vocabulary as
+the vocabulary grows.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_fuzzy_matching
+"""
+
+import argparse
+import random
+import string
+from typing import List, Tuple
+
+from src.config import INTENT_CATEGORIES, TECH_KEYWORDS
+from src.nlp.fuzzy_index import SymmetricDeleteIndex, _edit_distance
+from src.nlp.intent_classifier import IntentClassifier
+from src.nlp.intent_vocabulary import IntentVocabulary
+from src.nlp.text_analysis import AnalyzedMessage
+
+from .bench_intent_matcher import build_categories
+from .common import format_table, time_per_call
+
+
+def misspell(word: str, rng: random.Random) -> str:
+    """Apply one random edit to ``word``"""
+    index = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(["delete", "insert", "substitute", "transpose"])
+    if edit == "delete":
+        return word[:index] + word[index + 1:]
+    if edit == "insert":
+        return word[:index] + rng.choice(string.ascii_lowercase) + word[index:]
+    if edit == "substitute":
+        return word[:index] + rng.choice(string.ascii_lowercase.replace(word[index], "")) + word[index + 1:]
+    return word[:index - 1] + word[index] + word[index - 1] + word[index + 1:]
+
+
+def build_misspelled_messages(rng: random.Random, min_length: int) -> List[Tuple[str, str]]:
+    """(message, intent) pairs with every long keyword in the message misspelled"""
+    samples = []
+    for intent, config in INTENT_CATEGORIES.items():
+        if intent == "general_help":
+            continue
+        for keyword in config["keywords"]:
+            if len(keyword) < min_length:
+                continue
+            for example in config["examples"]:
+                words = [
+                    misspell(word, rng) if len(word) >= min_length and word.lower() in config["keywords"] else word
+                    for word in example.split()
+                ]
+                samples.append((f"{' '.join(words)} {misspell(keyword, rng)}", intent))
+    return samples
+
+
+def brute_force_corrector(words: List[str], max_distance: int, min_length: int):
+    """Correct a token by scanning the whole vocabulary"""
+    known = set(words)
+    
+    def correct(token: str):
+        if len(token) < min_length or token in known:
+            return None
+        best = min((_edit_distance(token, word, max_distance), word_id) for word_id, word in enumerate(words))
+        return words[best[1]] if best[0] <= max_distance else None
+    
+    return correct
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--max-distance", type=int, default=1)
+    parser.add_argument("--min-length", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 100, 500, 2000])
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    rng = random.Random(11)
+    samples = build_misspelled_messages(rng, args.min_length)
+    cleaned = [AnalyzedMessage(message).normalized for message, _ in samples]
+    
+    classifier = IntentClassifier(cache_size=0)
+    exact = IntentVocabulary(INTENT_CATEGORIES, extra_keywords=TECH_KEYWORDS)
+    fuzzy = IntentVocabulary(
+        INTENT_CATEGORIES,
+        extra_keywords=TECH_KEYWORDS,
+        fuzzy_max_distance=args.max_distance,
+        fuzzy_min_length=args.min_length
+    )
+    
+    rows = []
+    for label, vocabulary in [("exact", exact), ("fuzzy", fuzzy)]:
+        def classify(message, vocabulary=vocabulary):
+            return classifier._classify_cleaned(message, None, vocabulary)[0]
+        
+        correct = sum(classify(message) == intent for message, (_, intent) in zip(cleaned, samples))
+        rows.append([
+            label,
+            f"{correct / len(samples):.3f}",
+            f"{time_per_call(classify, cleaned, args.repeat) * 1e6:.1f}",
+        ])
+    print(f"{len(samples)} misspelled messages")
+    print(format_table(["keywords", "accuracy", "us/msg"], rows))
+    print()
+    
+    rows = []
+    for size in args.sizes:
+        categories = build_categories(size)
+        words = [keyword for config in categories.values() for keyword in config["keywords"]]
+        words += TECH_KEYWORDS
+        index = SymmetricDeleteIndex(words, args.max_distance, args.min_length)
+        brute_force = brute_force_corrector(index.words, args.max_distance, args.min_length)
+        tokens = [misspell(word, rng) for word in index.words if len(word) >= args.min_length][:args.tokens]
+        
+        def lookup(token):
+            index._memo.clear()
+            return index.correct(token)
+        
+        # Both must find the same correction before their timings mean anything
+        for token in tokens:
+            assert lookup(token) == brute_force(token), token
+        
+        index_time = time_per_call(lookup, tokens, args.repeat)
+        scan_time = time_per_call(brute_force, tokens, 1)
+        rows.append([
+            len(index.words),
+            f"{scan_time * 1e6:.1f}",
+            f"{index_time * 1e6:.1f}",
+            f"{scan_time / index_time:.1f}x",
+        ])
+    print(format_table(["vocabulary", "scan us/token", "index us/token", "speedup"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
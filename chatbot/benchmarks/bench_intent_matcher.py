@@ -0,0 +1,103 @@
+"""
+Benchmark: per-intent regex loop vs. single-pass KeywordMatcher
+
+Grows the intent vocabulary from the 7 built-in intents to 500 synthetic
+ones and reports the scoring cost per message for both approaches.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_intent_matcher
+"""
+
+import argparse
+import random
+import re
+import string
+from typing import Dict, List
+
+from src.config import INTENT_CATEGORIES
+from src.nlp.keyword_matcher import KeywordMatcher
+
+from .common import format_table, time_per_call
+
+
+def build_categories(intent_count: int, seed: int = 7) -> Dict[str, Dict]:
+    """Extend the built-in intents with synthetic ones up to ``intent_count``"""
+    rng = random.Random(seed)
+    categories = {intent: dict(config) for intent, config in INTENT_CATEGORIES.items()}
+    while len(categories) < intent_count:
+        keywords = [
+            "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+            for _ in range(6)
+        ]
+        categories[f"custom_{len(categories)}"] = {"keywords": keywords, "examples": []}
+    return categories
+
+
+def build_messages() -> List[str]:
+    """Messages taken from the built-in intent examples"""
+    return [
+        example.lower()
+        for config in INTENT_CATEGORIES.values()
+        for example in config["examples"]
+    ]
+
+
+def legacy_scorer(categories: Dict[str, Dict]):
+    """Replicate the previous per-intent keyword and pattern scan"""
+    patterns = {
+        intent: [
+            re.compile(rf"\b{re.escape(keyword)}\w*\b", re.IGNORECASE)
+            for keyword in config.get("keywords", [])
+        ]
+        for intent, config in categories.items()
+    }
+    
+    def score(message: str) -> Dict[str, tuple]:
+        scores = {}
+        for intent, config in categories.items():
+            keywords = config.get("keywords", [])
+            total_weight = sum(len(keyword) for keyword in keywords)
+            matched_weight = sum(len(keyword) for keyword in keywords if keyword in message)
+            keyword_score = matched_weight / total_weight if total_weight else 0.0
+            pattern_score = (
+                sum(1 for pattern in patterns[intent] if pattern.search(message))
+                / len(patterns[intent]) if patterns[intent] else 0.0
+            )
+            if keyword_score or pattern_score:
+                scores[intent] = (keyword_score, pattern_score)
+        return scores
+    
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[7, 25, 50, 100, 250, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    messages = build_messages()
+    rows = []
+    for size in args.sizes:
+        categories = build_categories(size)
+        legacy = legacy_scorer(categories)
+        matcher = KeywordMatcher(categories)
+        
+        # Both approaches must agree before their timings mean anything
+        for message in messages:
+            assert legacy(message) == matcher.match(message), message
+        
+        legacy_time = time_per_call(legacy, messages, args.repeat)
+        matcher_time = time_per_call(matcher.match, messages, args.repeat)
+        rows.append([
+            len(categories),
+            f"{legacy_time * 1e6:.1f}",
+            f"{matcher_time * 1e6:.1f}",
+            f"{legacy_time / matcher_time:.1f}x",
+        ])
+    
+    print(format_table(["intents", "per-intent us/msg", "matcher us/msg", "speedup"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""
+Benchmark: keyword matching vs. the trained intent model
+
+Reports accuracy and per-message latency of both classification paths on
+labelled messages (NDJSON, one {"message": ..., "intent": ...} per line).
+Without --labelled, the INTENT_CATEGORIES examples are used, which the
+model was trained on, so only the latency figures are meaningful.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_intent_model --model models/intent_classifier \
+        --labelled ../ml-service/data/labelled_messages.ndjson
+"""
+
+import argparse
+import json
+from typing import List, Tuple
+
+from src.config import INTENT_CATEGORIES, settings
+from src.nlp.intent_classifier import IntentClassifier
+from src.nlp.intent_model import IntentModel
+
+from .common import format_table, time_per_call
+
+
+def load_samples(path: str) -> List[Tuple[str, str]]:
+    """Labelled (message, intent) pairs"""
+    if not path:
+        return [
+            (example, intent)
+            for intent, config in INTENT_CATEGORIES.items()
+            for example in config["examples"]
+        ]
+    with open(path, encoding="utf-8") as handle:
+        return [
+            (record["message"], record["intent"])
+            for record in map(json.loads, filter(str.strip, handle))
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--model", default=settings.INTENT_MODEL_PATH)
+    parser.add_argument("--labelled", default="")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    samples = load_samples(args.labelled)
+    keyword_classifier = IntentClassifier(cache_size=0)
+    model_classifier = IntentClassifier(cache_size=0)
+    model_classifier.intent_model = IntentModel(args.model)
+    
+    cleaned = [(keyword_classifier._preprocess_message(message), intent) for message, intent in samples]
+    rows = []
+    for name, classifier in (("keywords", keyword_classifier), ("model", model_classifier)):
+        def classify(message: str) -> str:
+            return classifier._classify_cleaned(message)[0]
+        
+        accuracy = sum(classify(message) == intent for message, intent in cleaned) / len(cleaned)
+        latency = time_per_call(classify, [message for message, _ in cleaned], args.repeat)
+        rows.append([name, f"{accuracy:.3f}", f"{latency * 1e6:.1f}"])
+    
+    print(f"{len(samples)} labelled messages")
+    print(format_table(["path", "accuracy", "us/msg"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
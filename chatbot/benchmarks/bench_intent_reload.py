@@ -0,0 +1,97 @@
+"""
+Benchmark: classification latency while intent vocabularies reload
+
+Runs a steady stream of classify_intent calls on the event loop and
+reloads a large vocabulary in the middle of it, once by rebuilding the
+matcher on the event loop (the previous behaviour) and once through
+update_intent_category, which builds in a worker thread and swaps the
+snapshot. Latency includes time spent waiting for the event loop, so a
+blocking rebuild shows up in the tail.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_intent_reload
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+import numpy as np
+
+from src.nlp.intent_classifier import IntentClassifier
+from src.nlp.intent_vocabulary import IntentVocabulary
+
+from .bench_intent_matcher import build_categories, build_messages
+from .common import format_table
+
+
+async def measure(classifier: IntentClassifier, messages: List[str], duration: float, reload) -> np.ndarray:
+    """Classify messages for ``duration`` seconds, reloading halfway through"""
+    latencies = []
+    
+    async def client():
+        deadline = time.perf_counter() + duration
+        index = 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await asyncio.sleep(0)
+            # Distinct context per call so every classification misses the cache
+            await classifier.classify_intent(messages[index % len(messages)], {"onboarding_phase": index})
+            latencies.append(time.perf_counter() - start)
+            index += 1
+    
+    async def reloader():
+        await asyncio.sleep(duration / 2)
+        await reload()
+    
+    await asyncio.gather(client(), reloader())
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--intents", type=int, default=2000)
+    parser.add_argument("--duration", type=float, default=2.0)
+    args = parser.parse_args()
+    
+    messages = build_messages()
+    categories = build_categories(args.intents)
+    config = {"keywords": ["reloaded", "vocabulary"], "examples": []}
+    
+    classifier = IntentClassifier(cache_size=0)
+    classifier._publish_vocabulary(IntentVocabulary(categories))
+    
+    async def no_reload():
+        pass
+    
+    async def blocking_reload():
+        # Previous behaviour: mutate, then recompile on the event loop
+        classifier._publish_vocabulary(classifier._vocabulary.with_category("reloaded", config))
+    
+    async def snapshot_reload():
+        await classifier.update_intent_category("reloaded", config["keywords"], config["examples"])
+    
+    rows = []
+    for label, reload in [
+        ("no reload", no_reload),
+        ("rebuild on event loop", blocking_reload),
+        ("thread build + swap", snapshot_reload),
+    ]:
+        latencies = asyncio.run(measure(classifier, messages, args.duration, reload)) * 1e6
+        p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9])
+        rows.append([
+            label,
+            len(latencies),
+            f"{p50:.0f}",
+            f"{p99:.0f}",
+            f"{p999:.0f}",
+            f"{latencies.max():.0f}",
+        ])
+    
+    print(f"{args.intents} intents, {args.duration:.1f}s per run")
+    print(format_table(["scenario", "calls", "p50 us", "p99 us", "p99.9 us", "max us"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""
+Benchmark: knowledge search with and without the versioned result cache
+
+Replays a Zipf-skewed stream of queries (a few searches dominate, with a
+long tail) against a synthetic knowledge base, first with the result
+cache disabled and then enabled. A single entry is ingested every
+``--ingest-every`` queries, which publishes a new index version and so
+invalidates every cached result. Reports mean latency, hit ratio and
+cache memory.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_knowledge_cache
+    python -m benchmarks.bench_knowledge_cache --entries 100000 --mode lexical --ingest-every 500
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from src.integrations.knowledge_base import KnowledgeBase
+from src.knowledge.embedder import HashingEmbedder
+from src.knowledge.result_cache import SearchResultCache
+
+from .common import format_table
+from .corpus import KNOWLEDGE_TERMS, build_knowledge_entries
+
+
+def query_stream(count, distinct, skew, rng):
+    """``count`` queries drawn from ``distinct`` ones with Zipf weights"""
+    queries = [" ".join(rng.sample(KNOWLEDGE_TERMS, 2)) + f" term{rng.randrange(5000)}" for _ in range(distinct)]
+    weights = [1 / (rank + 1) ** skew for rank in range(distinct)]
+    return rng.choices(queries, weights, k=count)
+
+
+async def replay(knowledge_base, queries, mode, ingest_every):
+    started = time.perf_counter()
+    for number, query in enumerate(queries, 1):
+        await knowledge_base.search(query, limit=5, mode=mode)
+        if ingest_every and number % ingest_every == 0:
+            await knowledge_base.apply_changes([{
+                "id": f"ingested-{number}",
+                "title": "Ingested entry",
+                "content": query,
+                "category": "general",
+                "tags": [],
+            }])
+    return (time.perf_counter() - started) / len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--distinct", type=int, default=2000, help="Distinct queries in the stream")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent of query popularity")
+    parser.add_argument("--mode", choices=["lexical", "semantic", "hybrid"], default="hybrid")
+    parser.add_argument("--ingest-every", type=int, default=1000, help="Queries between ingests (0: never)")
+    parser.add_argument("--cache-size", type=int, default=1024)
+    args = parser.parse_args()
+    
+    rng = random.Random(18)
+    queries = query_stream(args.queries, args.distinct, args.skew, rng)
+    knowledge_base = KnowledgeBase(HashingEmbedder())
+    knowledge_base.build_index(build_knowledge_entries(args.entries))
+    knowledge_base.initialized = True
+    
+    rows = []
+    for label, cache_size in [("off", 0), ("on", args.cache_size)]:
+        knowledge_base.result_cache = SearchResultCache(max_entries=cache_size)
+        per_query = asyncio.run(replay(knowledge_base, queries, args.mode, args.ingest_every))
+        stats = knowledge_base.result_cache.get_cache_stats()
+        rows.append([
+            label,
+            f"{per_query * 1e3:.3f}",
+            f"{1 / per_query:.0f}",
+            f"{stats['hit_ratio']:.2f}",
+            stats["stale"],
+            stats["evictions"],
+            f"{stats['bytes'] / 2 ** 10:.0f}",
+        ])
+    
+    print(format_table(["cache", "ms/query", "queries/s", "hit ratio", "stale", "evictions", "cache KiB"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Benchmark: incremental knowledge refresh vs. full rebuild
+
+Writes a knowledge directory of NDJSON documents, indexes it once, then
+times what the background refresher pays: a scan of the untouched
+directory, and scanning plus publishing an edit to a single document,
+against rebuilding the whole index. Query latency is reported before and
+after a series of edits, as every edit adds a small segment until they
+are merged.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_knowledge_refresh
+    python -m benchmarks.bench_knowledge_refresh --entries 10000 100000 --edits 20
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.knowledge.embedder import HashingEmbedder
+from src.knowledge.refresher import KnowledgeRefresher
+from src.knowledge.snapshot import KnowledgeSnapshot
+
+from .common import format_table, time_per_call
+from .corpus import KNOWLEDGE_TERMS, build_knowledge_entries
+
+ENTRIES_PER_DOCUMENT = 20
+
+
+def write_documents(root, entries):
+    """NDJSON documents of ENTRIES_PER_DOCUMENT entries each; returns their paths"""
+    paths = []
+    for start in range(0, len(entries), ENTRIES_PER_DOCUMENT):
+        path = root / f"doc-{start // ENTRIES_PER_DOCUMENT:05d}.ndjson"
+        write_records(path, entries[start:start + ENTRIES_PER_DOCUMENT])
+        paths.append(path)
+    return paths
+
+
+def write_records(path, records):
+    with open(path, "w", encoding="utf-8") as handle:
+        for record in records:
+            handle.write(json.dumps({key: record[key] for key in ("title", "content", "category", "tags")}) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--edits", type=int, default=10, help="Single-document edits applied in turn")
+    parser.add_argument("--max-segments", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    
+    rng = random.Random(15)
+    queries = [" ".join(rng.sample(KNOWLEDGE_TERMS, 2)) + f" term{rng.randrange(5000)}" for _ in range(args.queries)]
+    embedder = HashingEmbedder()
+    
+    rows = []
+    for count in args.entries:
+        entries = build_knowledge_entries(count)
+        root = Path(tempfile.mkdtemp(prefix="knowledge-docs-"))
+        try:
+            paths = write_documents(root, entries)
+            refresher = KnowledgeRefresher(root)
+            
+            started = time.perf_counter()
+            changes = refresher.scan()
+            snapshot = KnowledgeSnapshot.build(changes.added, embedder.embed)
+            refresher.commit(changes)
+            build_time = time.perf_counter() - started
+            
+            def search(query):
+                return snapshot.search_lexical(query, limit=5)
+            
+            query_before = time_per_call(search, queries, 1)
+            scan_time = time_per_call(lambda _: refresher.scan(), range(3), 1)
+            
+            refresh_times = []
+            for edit in range(args.edits):
+                path = rng.choice(paths)
+                records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+                records[rng.randrange(len(records))]["content"] += f" revised{edit}"
+                write_records(path, records)
+                stat = path.stat()
+                os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))  # Coarse mtime clocks
+                
+                started = time.perf_counter()
+                changes = refresher.scan()
+                snapshot = snapshot.with_changes(changes.added, changes.removed_ids, embedder.embed, args.max_segments)
+                refresher.commit(changes)
+                refresh_times.append(time.perf_counter() - started)
+            refresh_time = statistics.median(refresh_times)
+            query_after = time_per_call(search, queries, 1)
+        finally:
+            shutil.rmtree(root)
+        
+        rows.append([
+            count,
+            len(paths),
+            f"{build_time * 1e3:.0f}",
+            f"{scan_time * 1e3:.1f}",
+            f"{refresh_time * 1e3:.1f}",
+            f"{build_time / refresh_time:.0f}x",
+            len(snapshot.segments),
+            f"{query_before * 1e3:.2f}",
+            f"{query_after * 1e3:.2f}",
+        ])
+    
+    print(format_table(
+        ["entries", "documents", "rebuild ms", "no-op scan ms", "edit refresh ms", "speedup", "segments",
+         "query ms", "query ms after edits"],
+        rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
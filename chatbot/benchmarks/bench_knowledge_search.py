@@ -0,0 +1,107 @@
+"""
+Benchmark: linear-scan knowledge search vs. the BM25F inverted index
+
+Times the previous KnowledgeBase.search (a lowercase substring test of the
+whole query against every title, tag and content) against InvertedIndex
+queries over the same synthetic corpus, and reports the postings each
+query touches so latency can be read against work done.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_knowledge_search
+    python -m benchmarks.bench_knowledge_search --entries 10000 100000
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Optional
+
+from src.knowledge.inverted_index import InvertedIndex
+from src.knowledge.tokenizer import tokenize
+
+from .common import format_table, time_per_call
+from .corpus import KNOWLEDGE_TERMS, build_knowledge_entries
+
+
+def linear_scan_search(entries: List[Dict], query: str, category: Optional[str] = None, limit: int = 5) -> List[Dict]:
+    """The previous KnowledgeBase.search"""
+    results = []
+    query_lower = query.lower()
+    for entry in entries:
+        content_match = query_lower in entry["content"].lower()
+        title_match = query_lower in entry["title"].lower()
+        tag_match = any(query_lower in tag.lower() for tag in entry["tags"])
+        if content_match or title_match or tag_match:
+            score = 0.0
+            if title_match:
+                score += 0.5
+            if content_match:
+                score += 0.3
+            if tag_match:
+                score += 0.2
+            results.append({"entry": entry, "relevance_score": score})
+    results.sort(key=lambda x: x["relevance_score"], reverse=True)
+    return results[:limit]
+
+
+def build_queries(rng: random.Random, count: int) -> Dict[str, List[str]]:
+    """Queries by kind: common head terms, rare tail terms and a mix"""
+    return {
+        "head terms": [" ".join(rng.sample(KNOWLEDGE_TERMS[:20], 2)) for _ in range(count)],
+        "tail terms": [f"term{rng.randrange(5000, 20000)} term{rng.randrange(5000, 20000)}" for _ in range(count)],
+        "mixed": [f"{rng.choice(KNOWLEDGE_TERMS)} term{rng.randrange(100, 5000)}" for _ in range(count)],
+    }
+
+
+def postings_touched(index: InvertedIndex, query: str) -> int:
+    """Postings read by one query"""
+    term_ids = {index.terms[term] for term in tokenize(query) if term in index.terms}
+    return sum(int(index.offsets[term_id + 1] - index.offsets[term_id]) for term_id in term_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--scan-queries", type=int, default=5,
+                        help="Queries timed for the (slow) linear scan")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    rng = random.Random(11)
+    queries = build_queries(rng, args.queries)
+    
+    rows = []
+    for count in args.entries:
+        entries = build_knowledge_entries(count)
+        started = time.perf_counter()
+        index = InvertedIndex(entries)
+        build_time = time.perf_counter() - started
+        print(f"{count} entries: {len(index.terms)} terms, {len(index.doc_ids)} postings, built in {build_time:.2f}s")
+        
+        for kind, kind_queries in queries.items():
+            scan_queries = kind_queries[:args.scan_queries]
+            scan_time = time_per_call(lambda query: linear_scan_search(entries, query), scan_queries, 1)
+            scan_hits = sum(len(linear_scan_search(entries, query)) > 0 for query in scan_queries)
+            index_time = time_per_call(index.search, kind_queries, args.repeat)
+            index_hits = sum(len(index.search(query)) > 0 for query in scan_queries)
+            postings = sum(postings_touched(index, query) for query in kind_queries) / len(kind_queries)
+            rows.append([
+                count, kind,
+                f"{postings:.0f}",
+                f"{scan_time * 1e3:.2f}",
+                f"{index_time * 1e3:.3f}",
+                f"{scan_time / index_time:.0f}x",
+                f"{scan_hits}/{len(scan_queries)}",
+                f"{index_hits}/{len(scan_queries)}",
+            ])
+    
+    print()
+    print(format_table(
+        ["entries", "queries", "postings/query", "scan ms", "index ms", "speedup", "scan found", "index found"],
+        rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Benchmark: per-category knowledge shards vs. a single index
+
+Ranks queries against a synthetic knowledge base held once as a single
+index and once as one shard per category. Unfiltered queries on the
+shards fan out to the search thread pool and heap-merge the shards' top
+hits; filtered queries touch only their category's shard instead of
+masking the whole index. Only ranking is timed (no snippets, no result
+cache). One search worker searches the shards in turn on the event loop;
+more only pay off with as many free cores.
+
+Then rebuilds the training_materials shard and meanwhile searches and
+updates the onboarding_process shard, reporting their latency next to the
+rebuild time: with a single index, that update would have waited for the
+whole rebuild.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_knowledge_shards
+    python -m benchmarks.bench_knowledge_shards --entries 200000 --workers 1 8
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from src.config import settings
+from src.integrations.knowledge_base import KnowledgeBase
+from src.knowledge.embedder import HashingEmbedder
+from src.knowledge.snapshot import KnowledgeSnapshot
+
+from .common import format_table, latency_stats
+from .corpus import KNOWLEDGE_TERMS, build_knowledge_entries
+
+FILTER_CATEGORY = "onboarding_process"
+REBUILT_CATEGORY = "training_materials"
+
+
+def stats_row(label, mode, scope, stats):
+    return [label, mode, scope, f"{stats['p50_us']:.0f}", f"{stats['p99_us']:.0f}", f"{stats['ops_per_sec']:.0f}"]
+
+
+async def search_during_rebuild(knowledge_base, queries):
+    """Onboarding search and update latencies (ms) while the training shard rebuilds"""
+    rebuild = asyncio.create_task(knowledge_base.rebuild_shard(REBUILT_CATEGORY))
+    started = time.perf_counter()
+    await asyncio.sleep(0)
+    
+    search_ms, update_ms = [], []
+    number = 0
+    while not rebuild.done():
+        query = queries[number % len(queries)]
+        began = time.perf_counter()
+        await knowledge_base.search(query, FILTER_CATEGORY, limit=5, mode="lexical")
+        search_ms.append((time.perf_counter() - began) * 1e3)
+        if number % 50 == 0:
+            began = time.perf_counter()
+            await knowledge_base.apply_changes([{
+                "id": f"onboarding-update-{number}",
+                "title": "Onboarding update",
+                "content": query,
+                "category": FILTER_CATEGORY,
+                "tags": [],
+            }])
+            update_ms.append((time.perf_counter() - began) * 1e3)
+        number += 1
+        await asyncio.sleep(0)
+    await rebuild
+    return (time.perf_counter() - started) * 1e3, search_ms, update_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4], help="Shard search threads")
+    args = parser.parse_args()
+    
+    rng = random.Random(20)
+    queries = [" ".join(rng.sample(KNOWLEDGE_TERMS, 2)) + f" term{rng.randrange(5000)}" for _ in range(args.queries)]
+    entries = build_knowledge_entries(args.entries)
+    embedder = HashingEmbedder()
+    
+    single = KnowledgeSnapshot.build(entries, embedder.embed)
+    knowledge_base = KnowledgeBase(embedder)
+    knowledge_base.build_index(entries)
+    knowledge_base.initialized = True
+    knowledge_base.result_cache.max_entries = 0
+    query_vectors = {query: embedder.embed_one(query) for query in queries}
+    loop = asyncio.new_event_loop()
+    
+    rows = []
+    for scope, category in [("all", None), ("filtered", FILTER_CATEGORY)]:
+        shards = knowledge_base.shards if category is None else {category: knowledge_base.shards[category]}
+        rows.append(stats_row("single index", "lexical", scope, latency_stats(
+            lambda query: single.search_lexical(query, category, 5), queries
+        )))
+        rows.append(stats_row("single index", "semantic", scope, latency_stats(
+            lambda query: single.search_vectors(query_vectors[query], category, 5), queries
+        )))
+        for workers in args.workers if category is None else args.workers[:1]:
+            settings.KNOWLEDGE_SEARCH_WORKERS = workers
+            loop.run_until_complete(knowledge_base.close())  # Pool sized on next use
+            label = f"shards, {workers} worker{'s' if workers > 1 else ''}"
+            rows.append(stats_row(label, "lexical", scope, latency_stats(
+                lambda query: loop.run_until_complete(knowledge_base._lexical_hits(shards, query, 5)), queries
+            )))
+            rows.append(stats_row(label, "semantic", scope, latency_stats(
+                lambda query: loop.run_until_complete(knowledge_base._semantic_hits(shards, query, 5)), queries
+            )))
+    print(format_table(["index", "mode", "categories", "p50 us", "p99 us", "queries/s"], rows))
+    
+    rebuild_ms, search_ms, update_ms = loop.run_until_complete(search_during_rebuild(knowledge_base, queries))
+    loop.run_until_complete(knowledge_base.close())
+    loop.close()
+    print()
+    print(format_table(
+        ["during", "shard rebuilt", "rebuild ms", "searches", "search p50 ms", "search max ms", "updates", "update max ms"],
+        [[
+            f"{REBUILT_CATEGORY} rebuild",
+            len(knowledge_base.shards[REBUILT_CATEGORY]),
+            f"{rebuild_ms:.0f}",
+            len(search_ms),
+            f"{statistics.median(search_ms):.2f}",
+            f"{max(search_ms):.2f}",
+            len(update_ms),
+            f"{max(update_ms):.1f}",
+        ]]
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Benchmark: knowledge base startup, in-memory build vs. memory-mapped index
+
+Times what startup_event pays for the knowledge base: building the
+inverted and vector indexes in memory, against opening a published
+on-disk build with np.memmap (first and median of several opens). Also
+reports the first and steady-state query latency after opening, since a
+mapped index pages data in lazily.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_knowledge_startup
+    python -m benchmarks.bench_knowledge_startup --entries 10000 100000 --vector-index ivf
+"""
+
+import argparse
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.knowledge.embedder import HashingEmbedder
+from src.knowledge.index_store import open_index, write_index
+from src.knowledge.inverted_index import InvertedIndex
+from src.knowledge.ivf_index import IVFIndex
+from src.knowledge.snapshot import entry_text
+from src.knowledge.vector_index import VectorIndex
+
+from .common import format_table, time_per_call
+from .corpus import KNOWLEDGE_TERMS, build_knowledge_entries
+
+
+def build_in_memory(entries, embedder, vector_index):
+    """What KnowledgeBase.build_index does at startup"""
+    index = InvertedIndex(entries)
+    vectors = embedder.embed([entry_text(entry) for entry in index.entries])
+    if vector_index == "ivf":
+        return index, IVFIndex.build(vectors)
+    return index, VectorIndex(vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--vector-index", choices=["exact", "ivf"], default="exact")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--opens", type=int, default=5, help="Times the index is opened (median reported)")
+    args = parser.parse_args()
+    
+    rng = random.Random(14)
+    queries = [" ".join(rng.sample(KNOWLEDGE_TERMS, 2)) + f" term{rng.randrange(5000)}" for _ in range(args.queries)]
+    embedder = HashingEmbedder()
+    
+    rows = []
+    for count in args.entries:
+        entries = build_knowledge_entries(count)
+        started = time.perf_counter()
+        index, vector_index = build_in_memory(entries, embedder, args.vector_index)
+        build_time = time.perf_counter() - started
+        
+        root = Path(tempfile.mkdtemp(prefix="knowledge-index-"))
+        try:
+            build_dir = write_index(root, index, vector_index, embedder.name)
+            disk_bytes = sum(path.stat().st_size for path in build_dir.iterdir())
+            
+            open_times = []
+            for _ in range(args.opens):
+                started = time.perf_counter()
+                mapped_index, mapped_vectors, _ = open_index(root)
+                open_times.append(time.perf_counter() - started)
+            open_time = statistics.median(open_times)
+            
+            def search(query):
+                hits = mapped_index.search(query, limit=5)
+                mapped_vectors.search(embedder.embed_one(query), 5)
+                return [mapped_index.entries[doc_id] for doc_id, _ in hits]
+            
+            started = time.perf_counter()
+            search(queries[0])
+            first_query = time.perf_counter() - started
+            query_time = time_per_call(search, queries[1:], 1)
+        finally:
+            shutil.rmtree(root)
+        
+        rows.append([
+            count,
+            f"{build_time * 1e3:.0f}",
+            f"{open_times[0] * 1e3:.2f}",
+            f"{open_time * 1e3:.2f}",
+            f"{build_time / open_time:.0f}x",
+            f"{first_query * 1e3:.2f}",
+            f"{query_time * 1e3:.2f}",
+            f"{disk_bytes / 2 ** 20:.1f}",
+        ])
+    
+    print(format_table(
+        ["entries", "build ms", "first open ms", "open ms", "speedup", "first query ms", "query ms", "index MiB"], rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,133 @@
+"""
+Benchmark: memory per stored chat message, ChatMessage lists vs. MessageLog
+
+Stores the same chat turns (a user message and a reply with the
+metadata /chat attaches) for many sessions, first as lists of pydantic
+ChatMessage objects (the previous ChatSession.messages), then in one
+MessageLog per session. Reports bytes retained per message, measured
+with tracemalloc, next to the UTF-8 text they hold, and the cost of
+appending a turn and of materializing messages for a response.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_message_log
+    python -m benchmarks.bench_message_log --sessions 500 --turns 200
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from src.database.message_log import MessageLog
+from src.models.chat_models import ChatMessage
+
+from .common import format_table, latency_stats
+from .corpus import KNOWLEDGE_TERMS
+
+REPLIES = [
+    "I can help you with your onboarding process. You're currently making great progress!",
+    "For technical questions, I can help with coding standards and development practices.",
+    "Here's information about your team structure and contacts:",
+    "For tools and setup, here's what you'll need to install:",
+]
+
+
+def random_id(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def turns(session_id, count, rng):
+    """A session's messages, as /chat creates them"""
+    timestamp = datetime(2026, 1, 1) + timedelta(seconds=rng.randrange(86400))
+    for _ in range(count):
+        question = " ".join(rng.sample(KNOWLEDGE_TERMS, rng.randint(4, 12))).capitalize() + "?"
+        yield ChatMessage(id=random_id(rng), content=question, sender="user", timestamp=timestamp, session_id=session_id)
+        timestamp += timedelta(milliseconds=rng.randint(5, 400))
+        yield ChatMessage(
+            id=random_id(rng),
+            content=rng.choice(REPLIES) + " " + " ".join(rng.sample(KNOWLEDGE_TERMS, rng.randint(10, 30))) + ".",
+            sender="bot",
+            timestamp=timestamp,
+            session_id=session_id,
+            metadata={
+                "intent": "tools",
+                "confidence": round(rng.random(), 4),
+                "response_type": "generated",
+                "knowledge_sources": [random_id(rng) for _ in range(rng.randint(0, 3))],
+                "stage_timings_ms": {"session": 0.02, "classification": 0.41, "retrieval": 1.3, "generation": 0.05},
+                "response_time_ms": round(rng.uniform(1, 5), 2)
+            }
+        )
+        timestamp += timedelta(seconds=rng.randint(10, 600))
+
+
+def retained_bytes(build):
+    """Bytes still allocated after ``build()``, and its result"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = build()
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=20, help="Turns (two messages) per session")
+    args = parser.parse_args()
+    
+    session_ids = [f"session-{number}" for number in range(args.sessions)]
+    count = args.sessions * args.turns * 2
+    
+    def as_models():
+        rng = random.Random(24)
+        return {sid: list(turns(sid, args.turns, rng)) for sid in session_ids}
+    
+    def as_logs():
+        rng = random.Random(24)
+        return {sid: MessageLog(sid, turns(sid, args.turns, rng)) for sid in session_ids}
+    
+    model_bytes, models = retained_bytes(as_models)
+    text_bytes = sum(len(message.content.encode()) for messages in models.values() for message in messages)
+    log_bytes, logs = retained_bytes(as_logs)
+    packed_bytes = sum(log.nbytes for log in logs.values())
+    
+    for sid in session_ids[:50]:
+        assert [message.model_dump() for message in logs[sid].to_messages()] == [message.model_dump() for message in models[sid]]
+    del models
+    
+    print(f"{count} messages in {args.sessions} sessions; UTF-8 content: {text_bytes / count:.0f} bytes per message")
+    print()
+    print(format_table(
+        ["storage", "bytes/message", "MiB total"],
+        [
+            ["List[ChatMessage]", f"{model_bytes / count:.0f}", f"{model_bytes / 2**20:.1f}"],
+            ["MessageLog", f"{log_bytes / count:.0f}", f"{log_bytes / 2**20:.1f}"],
+            ["  of which buffers", f"{packed_bytes / count:.0f}", f"{packed_bytes / 2**20:.1f}"],
+        ]
+    ))
+    print()
+    
+    turn = list(turns(session_ids[0], 1, random.Random(1)))
+    sample = session_ids[:200]
+    scratch = MessageLog(session_ids[0])
+    timings = [
+        ("append a turn", latency_stats(lambda _: scratch.extend(turn), range(2000), warmup=0)),
+        ("last 10 messages", latency_stats(lambda sid: logs[sid].to_messages(-10), sample)),
+        ("all messages of a session", latency_stats(lambda sid: logs[sid].to_messages(), sample)),
+    ]
+    print(format_table(
+        ["MessageLog operation", "p50 us", "p99 us"],
+        [[label, f"{stats['p50_us']:.1f}", f"{stats['p99_us']:.1f}"] for label, stats in timings]
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Benchmark: write-behind batched message inserts vs. one transaction per turn
+
+Persists chat turns (a user message and its reply) to a SQLite database
+file, the local stand-in for DATABASE_URL: first awaiting a transaction
+per turn in a worker thread, as /chat would if it wrote through, then
+with MessageWriter, where the request only enqueues and a background
+task batch-inserts. Reports the time a request spends persisting its
+turn, and total throughput including draining the queue.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_message_writes
+    python -m benchmarks.bench_message_writes --turns 50000 --batch-size 1000 --database-url sqlite:///chat.db
+"""
+
+import argparse
+import asyncio
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from src.database.message_writer import MESSAGE_METADATA, MessageWriter, create_database_engine
+from src.models.chat_models import ChatMessage
+
+from .common import format_table
+
+
+def build_turns(count):
+    turns = []
+    for number in range(count):
+        session_id = f"session-{number % 500}"
+        turns.append([
+            ChatMessage(content=f"How do I request access to the claims system? ({number})", sender="user", session_id=session_id),
+            ChatMessage(
+                content="Ask your team lead to file an access request; it is usually approved within a day.",
+                sender="bot",
+                session_id=session_id,
+                metadata={"intent": "tools", "confidence": 0.82, "stage_timings_ms": {"classification": 0.4}}
+            ),
+        ])
+    return turns
+
+
+async def write_through(writer, turns):
+    """Per-turn request latencies (us) when each turn is its own awaited transaction"""
+    latencies = []
+    for turn in turns:
+        started = time.perf_counter()
+        await asyncio.to_thread(writer._insert, turn)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+async def write_behind(writer, turns):
+    """Per-turn request latencies (us) when turns are only enqueued, and the drain time (s)"""
+    await writer.start()
+    latencies = []
+    for number, turn in enumerate(turns):
+        started = time.perf_counter()
+        writer.enqueue(turn)
+        latencies.append((time.perf_counter() - started) * 1e6)
+        if number % 50 == 0:
+            await asyncio.sleep(0)  # Other requests run; the flusher gets its turn
+    started = time.perf_counter()
+    await writer.close()
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--database-url", default=None, help="Default: a SQLite file in a temporary directory")
+    args = parser.parse_args()
+    
+    turns = build_turns(args.turns)
+    directory = Path(tempfile.mkdtemp(prefix="chat-messages-"))
+    rows = []
+    try:
+        for label in ["write-through", "write-behind"]:
+            url = args.database_url or f"sqlite:///{directory / (label + '.db')}"
+            engine = create_database_engine(url)
+            MESSAGE_METADATA.drop_all(engine)
+            writer = MessageWriter(engine, batch_size=args.batch_size, max_pending=args.turns * 2)
+            
+            started = time.perf_counter()
+            if label == "write-through":
+                latencies = asyncio.run(write_through(writer, turns))
+                drain = 0.0
+                engine.dispose()
+            else:
+                latencies, drain = asyncio.run(write_behind(writer, turns))
+            elapsed = time.perf_counter() - started
+            rows.append([
+                label,
+                f"{statistics.median(latencies):.1f}",
+                f"{sorted(latencies)[int(len(latencies) * 0.99)]:.1f}",
+                f"{drain * 1e3:.0f}",
+                f"{args.turns * 2 / elapsed:.0f}",
+            ])
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    
+    print(format_table(["mode", "p50 us/turn", "p99 us/turn", "drain ms", "messages/s"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Benchmark: heap-based session expiry soak with a million live sessions
+
+Drives InMemorySessionStore on a simulated clock: every simulated second
+``--sessions`` per SESSION_TIMEOUT arrive, some existing ones are used
+again (keeping them alive longer), and an expiry pass runs. After one
+timeout the population is at steady state; per-user caps evict least
+recently used sessions meanwhile. Reports the expiry
+pass latency against the previous full scan over every session, and
+shows the live session count and memory staying flat.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_session_expiry
+    python -m benchmarks.bench_session_expiry --sessions 100000 --timeout 600
+"""
+
+import argparse
+import asyncio
+import random
+import resource
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from src.database.session_store import InMemorySessionStore
+from src.models.chat_models import ChatSession
+
+from .common import format_table
+
+
+def full_scan(store, cutoff):
+    """The previous cleanup: every session compared against the cutoff"""
+    return [sid for sid, session in store.sessions.items() if session.updated_at < cutoff]
+
+
+def peak_rss_mib():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def soak(args):
+    rng = random.Random(23)
+    store = InMemorySessionStore(args.max_per_user)
+    rate = args.sessions // args.timeout
+    users = max(args.sessions // args.sessions_per_user, 1)
+    started_at = datetime(2026, 1, 1)
+    created = []
+    rows = []
+    tick_ms = []
+    expired = 0
+    
+    for second in range(1, args.timeout * args.timeouts + 1):
+        now = started_at + timedelta(seconds=second)
+        for _ in range(rate):
+            session_id = f"session-{len(created)}"
+            created.append(session_id)
+            await store.create(ChatSession(
+                id=session_id, user_id=f"user-{rng.randrange(users)}", created_at=now, updated_at=now
+            ))
+        for _ in range(int(rate * args.reuse)):
+            session_id = created[rng.randrange(len(created))]
+            session = store.sessions.get(session_id)
+            if session is not None:
+                await store.touch(session_id, session.user_id, now)
+        
+        began = time.perf_counter()
+        expired += await store.expire(now - timedelta(seconds=args.timeout))
+        tick_ms.append((time.perf_counter() - began) * 1e3)
+        
+        if second % (args.timeout // 2) == 0:
+            rows.append([
+                second,
+                len(created),
+                len(store.sessions),
+                len(store._expiry),
+                expired,
+                store.evicted,
+                f"{statistics.median(tick_ms):.3f}",
+                f"{max(tick_ms):.2f}",
+                f"{peak_rss_mib():.0f}",
+            ])
+            tick_ms = []
+    
+    cutoff = started_at + timedelta(seconds=second - args.timeout)
+    began = time.perf_counter()
+    full_scan(store, cutoff)
+    scan_ms = (time.perf_counter() - began) * 1e3
+    return rows, len(store.sessions), scan_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=1000000, help="Sessions created per timeout")
+    parser.add_argument("--timeout", type=int, default=1800, help="SESSION_TIMEOUT (simulated seconds)")
+    parser.add_argument("--timeouts", type=int, default=3, help="Simulated duration, in timeouts")
+    parser.add_argument("--reuse", type=float, default=0.5, help="Sessions used again per new session")
+    parser.add_argument("--sessions-per-user", type=int, default=4, help="Average live sessions per user")
+    parser.add_argument("--max-per-user", type=int, default=10, help="MAX_SESSIONS_PER_USER")
+    args = parser.parse_args()
+    
+    rows, live, scan_ms = asyncio.run(soak(args))
+    print(format_table(
+        ["sim. s", "created", "live", "heap", "expired", "evicted", "pass p50 ms", "pass max ms", "peak RSS MiB"],
+        rows
+    ))
+    print()
+    print(f"Full scan of {live} sessions (previous cleanup): {scan_ms:.1f} ms per pass")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
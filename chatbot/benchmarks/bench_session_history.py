@@ -0,0 +1,127 @@
+"""
+Benchmark: cursor-paginated and streamed session history vs. the full response
+
+Fills one in-memory session with ``--messages`` chat messages (a long
+onboarding session) and calls the history endpoint three ways: the
+previous single JSON body with every message, a page of
+HISTORY_PAGE_SIZE messages at a random ``before`` cursor, and an NDJSON
+export streamed in chunks. Reports time and peak memory allocated per
+request (tracemalloc), and the cursor seek by binary search over the
+time-ordered ids against a scan.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_session_history
+    python -m benchmarks.bench_session_history --messages 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from src import main as api
+from src.config import settings
+from src.database.session_manager import SessionManager
+from src.database.session_store import InMemorySessionStore
+from src.models.chat_models import ChatMessage
+
+from .common import format_table, latency_stats
+
+
+def fill_session(manager, session_id, count, rng):
+    messages = [
+        ChatMessage(
+            content=f"Message {number} about the claims workflow and the policy admin system " * rng.randint(1, 4),
+            sender="user" if number % 2 == 0 else "bot",
+            session_id=session_id,
+            metadata={} if number % 2 == 0 else {"intent": "project", "confidence": 0.8, "response_time_ms": 2.1}
+        )
+        for number in range(count)
+    ]
+    asyncio.run(manager.add_messages(session_id, messages, "user-1"))
+    return [message.id for message in messages]
+
+
+def full_response(manager, session_id):
+    """The previous endpoint: every message in one JSON body"""
+    session = asyncio.run(manager.get_session(session_id))
+    return JSONResponse(jsonable_encoder({
+        "session_id": session_id,
+        "messages": asyncio.run(manager.get_messages(session_id)),
+        "created_at": session.created_at,
+        "updated_at": session.updated_at
+    })).body
+
+
+def page_response(session_id, before):
+    # Called directly, so parameters declared with Query() are passed explicitly
+    return JSONResponse(jsonable_encoder(asyncio.run(api.get_session_history(session_id, before=before, limit=None)))).body
+
+
+def stream_response(session_id):
+    async def consume():
+        response = await api.get_session_history(session_id, limit=None, stream=True)
+        size = 0
+        async for chunk in response.body_iterator:
+            size += len(chunk)
+        return size
+    return asyncio.run(consume())
+
+
+def measure(call):
+    """Seconds, peak bytes allocated (in a second, traced call), and response size"""
+    started = time.perf_counter()
+    body = call()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, body if isinstance(body, int) else len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, nargs="+", default=[10000, 100000], help="Session sizes")
+    args = parser.parse_args()
+    
+    rng = random.Random(25)
+    api.session_manager = manager = SessionManager(InMemorySessionStore())
+    rows = []
+    seek_rows = []
+    for count in args.messages:
+        session_id = f"session-{count}"
+        asyncio.run(manager.get_or_create_session(session_id, "user-1"))
+        ids = fill_session(manager, session_id, count, rng)
+        
+        cursor = rng.choice(ids[settings.HISTORY_PAGE_SIZE:])
+        for label, call in [
+            ("full JSON (previous)", lambda: full_response(manager, session_id)),
+            (f"page of {settings.HISTORY_PAGE_SIZE}", lambda: page_response(session_id, cursor)),
+            ("NDJSON stream", lambda: stream_response(session_id)),
+        ]:
+            elapsed, peak, size = measure(call)
+            rows.append([count, label, f"{size / 2**20:.2f}", f"{elapsed * 1e3:.1f}", f"{peak / 2**20:.2f}"])
+        
+        log = manager.store.messages[session_id]
+        cursors = rng.sample(ids, 200)
+        bisected = latency_stats(log.position, cursors)
+        log._ordered = False
+        scanned = latency_stats(log.position, cursors, rounds=1, warmup=0)
+        log._ordered = True
+        seek_rows.append([count, f"{bisected['p50_us']:.1f}", f"{scanned['p50_us']:.1f}"])
+        asyncio.run(manager.delete_session(session_id, "user-1"))
+    
+    print(format_table(["messages", "request", "body MiB", "ms", "peak MiB allocated"], rows))
+    print()
+    print(format_table(["messages", "seek by bisect p50 us", "seek by scan p50 us"], seek_rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
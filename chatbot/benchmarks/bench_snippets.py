@@ -0,0 +1,84 @@
+"""
+Benchmark: best-window snippets from postings positions vs. regex re-scan
+
+Times building one search hit's snippet and highlights on documents of
+several kilobytes: looking the query terms' content offsets up in the
+postings, against finding them by scanning the content with a regex per
+request. Both choose the same densest window; only how the term offsets
+are found differs.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_snippets
+    python -m benchmarks.bench_snippets --sizes 1000 4000 16000 --hits 2000
+"""
+
+import argparse
+import random
+import re
+
+import numpy as np
+
+from src.knowledge.inverted_index import InvertedIndex
+from src.knowledge.snippets import best_window_snippet
+from src.knowledge.tokenizer import tokenize
+
+from .common import format_table, latency_stats
+from .corpus import build_knowledge_entries
+
+
+def long_entries(count, size):
+    """``count`` entries whose content is about ``size`` characters"""
+    base = build_knowledge_entries(count * 4)
+    entries = []
+    for number in range(count):
+        parts = []
+        while sum(len(part) for part in parts) < size:
+            parts.append(base[(number * 4 + len(parts)) % len(base)]["content"])
+        entries.append({**base[number], "content": " ".join(parts)[:size]})
+    return entries
+
+
+def regex_positions(content, terms):
+    """Offsets of each term in the content, by scanning it"""
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE)
+    positions = {}
+    for match in pattern.finditer(content):
+        positions.setdefault(match.group(1).lower(), []).append(match.start())
+    return {term: np.asarray(offsets) for term, offsets in positions.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000], help="Content characters")
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--hits", type=int, default=2000)
+    args = parser.parse_args()
+    
+    rng = random.Random(19)
+    rows = []
+    for size in args.sizes:
+        entries = long_entries(args.entries, size)
+        index = InvertedIndex(entries)
+        hits = []
+        for _ in range(args.hits):
+            doc_id = rng.randrange(len(entries))
+            tokens = tokenize(entries[doc_id]["content"])
+            hits.append((doc_id, {rng.choice(tokens), rng.choice(tokens), f"missing{rng.randrange(100)}"}))
+        
+        def from_postings(hit):
+            doc_id, terms = hit
+            return best_window_snippet(entries[doc_id]["content"], index.term_positions(doc_id, terms))
+        
+        def from_regex(hit):
+            doc_id, terms = hit
+            return best_window_snippet(entries[doc_id]["content"], regex_positions(entries[doc_id]["content"], terms))
+        
+        for method, func in [("postings", from_postings), ("regex re-scan", from_regex)]:
+            stats = latency_stats(func, hits)
+            rows.append([size, method, f"{stats['p50_us']:.1f}", f"{stats['p99_us']:.1f}"])
+    
+    print(format_table(["content chars", "offsets from", "p50 us/hit", "p99 us/hit"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,79 @@
+"""
+Benchmark: per-stage text preparation vs. one shared AnalyzedMessage
+
+The previous pipeline lowercased and split each message once per stage:
+classifier preprocessing with one str.replace pass per contraction, entity
+extraction lowering it again, and the message handler splitting and
+lowering it for word count, code/URL detection and sentiment. This
+benchmark times that preparation work against building one AnalyzedMessage.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_text_analysis
+"""
+
+import argparse
+import random
+import re
+
+from src.config import INTENT_CATEGORIES
+from src.nlp.text_analysis import CONTRACTIONS, AnalyzedMessage
+
+from .common import format_table, time_per_call
+
+
+def per_stage_preparation(message: str):
+    """Text preparation as each stage used to do it on its own"""
+    # IntentClassifier._preprocess_message
+    processed = " ".join(message.lower().split())
+    processed = re.sub(r'[^\w\s\-\']', ' ', processed)
+    for contraction, expansion in CONTRACTIONS.items():
+        processed = processed.replace(contraction, expansion)
+    processed = processed.strip()
+    
+    # IntentClassifier.analyze_message_entities
+    entities_lower = message.lower()
+    
+    # MessageHandler._process_text_message and its helpers
+    cleaned = " ".join(message.split()).strip()
+    word_count = len(cleaned.split())
+    code_lower, urls_lower, sentiment_lower = cleaned.lower(), cleaned.lower(), cleaned.lower()
+    return processed, entities_lower, word_count, code_lower, urls_lower, sentiment_lower
+
+
+def build_messages(length: int, count: int = 200, seed: int = 3):
+    """Messages of roughly ``length`` characters built from intent examples"""
+    rng = random.Random(seed)
+    pool = [example for config in INTENT_CATEGORIES.values() for example in config["examples"]]
+    pool += ["I can't find it, don't know why.", "I'm stuck - it doesn't build!"]
+    messages = []
+    for _ in range(count):
+        parts = []
+        while sum(len(part) + 1 for part in parts) < length:
+            parts.append(rng.choice(pool))
+        messages.append(" ".join(parts)[:length])
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[40, 200, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    
+    rows = []
+    for length in args.lengths:
+        messages = build_messages(length)
+        before = time_per_call(per_stage_preparation, messages, args.repeat)
+        after = time_per_call(AnalyzedMessage, messages, args.repeat)
+        rows.append([
+            length,
+            f"{before * 1e6:.1f}",
+            f"{after * 1e6:.1f}",
+            f"{(before - after) * 1e6:.1f}",
+        ])
+    
+    print(format_table(["chars", "per-stage us/msg", "shared us/msg", "saved us/msg"], rows))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Benchmark: exact vector search over float32 and int8 entry matrices
+
+Embeds a synthetic knowledge corpus with the hashing embedder and times
+VectorIndex top-k queries (one matrix-vector product plus argpartition)
+for float32 and int8-quantized storage, reporting memory per index and
+how many of the float32 top-k results the int8 index reproduces.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.bench_vector_search
+    python -m benchmarks.bench_vector_search --entries 100000 --dimension 384
+"""
+
+import argparse
+import random
+import time
+
+from src.knowledge.embedder import HashingEmbedder
+from src.knowledge.snapshot import entry_text
+from src.knowledge.vector_index import VectorIndex
+
+from .common import format_table, time_per_call
+from .corpus import KNOWLEDGE_TERMS, build_knowledge_entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    rng = random.Random(12)
+    embedder = HashingEmbedder(args.dimension)
+    queries = [
+        f"{rng.choice(KNOWLEDGE_TERMS)} {rng.choice(KNOWLEDGE_TERMS)} term{rng.randrange(2000)}"
+        for _ in range(args.queries)
+    ]
+    query_vectors = list(embedder.embed(queries))
+    
+    rows = []
+    for count in args.entries:
+        entries = build_knowledge_entries(count)
+        started = time.perf_counter()
+        vectors = embedder.embed([entry_text(entry) for entry in entries])
+        print(f"{count} entries embedded in {time.perf_counter() - started:.2f}s")
+        
+        exact = VectorIndex(vectors)
+        quantized = VectorIndex(vectors, quantize=True)
+        expected = [{row for row, _ in exact.search(vector, args.limit)} for vector in query_vectors]
+        for name, index in (("float32", exact), ("int8", quantized)):
+            query_time = time_per_call(lambda vector: index.search(vector, args.limit), query_vectors, args.repeat)
+            overlap = sum(
+                len(expected_rows & {row for row, _ in index.search(vector, args.limit)})
+                for vector, expected_rows in zip(query_vectors, expected)
+            ) / (args.limit * len(query_vectors))
+            rows.append([
+                count, name,
+                f"{index.nbytes / 2 ** 20:.1f}",
+                f"{query_time * 1e3:.3f}",
+                f"{1 / query_time:.0f}",
+                f"{overlap:.3f}",
+            ])
+    
+    print()
+    print(format_table(
+        ["entries", "storage", "MiB", "ms/query", "queries/sec", f"top-{args.limit} overlap"], rows
+    ))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Shared timing helpers for benchmarks
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable, Coroutine, Dict, Iterable, List
+
+import numpy as np
+
+
+def time_per_call(func: Callable, inputs: Iterable, repeat: int = 5) -> float:
+    """
+    Time ``func`` over every input and return the best mean seconds per call
+    
+    Args:
+        func: Callable taking a single input
+        inputs: Inputs to feed through ``func``
+        repeat: Number of rounds; the fastest round is reported
+    """
+    inputs: List = list(inputs)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            func(item)
+        best = min(best, time.perf_counter() - start)
+    return best / max(len(inputs), 1)
+
+
+def format_table(headers: List[str], rows: List[List]) -> str:
+    """Render rows as a fixed-width text table"""
+    cells = [headers] + [[str(value) for value in row] for row in rows]
+    widths = [max(len(row[col]) for row in cells) for col in range(len(headers))]
+    lines = [
+        "  ".join(value.rjust(width) for value, width in zip(row, widths))
+        for row in cells
+    ]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def run_coroutine(coroutine: Coroutine) -> Any:
+    """
+    Run a coroutine that never suspends, without an event loop
+    
+    The NLP entry points are ``async`` but do not await anything, so
+    driving them directly keeps event loop overhead out of the timings.
+    """
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("Coroutine suspended; benchmark it with an event loop")
+
+
+def latency_stats(func: Callable, inputs: Iterable, rounds: int = 3, warmup: int = 50) -> Dict[str, float]:
+    """
+    Time every call of ``func`` over ``inputs``
+    
+    Returns:
+        Calls per second and mean/p50/p95/p99 latency in microseconds
+    """
+    inputs: List = list(inputs)
+    for item in inputs[:warmup]:
+        func(item)
+    
+    latencies = np.empty(len(inputs) * rounds, dtype=np.int64)
+    clock = time.perf_counter_ns
+    index = 0
+    for _ in range(rounds):
+        for item in inputs:
+            start = clock()
+            func(item)
+            latencies[index] = clock() - start
+            index += 1
+    
+    micros = latencies / 1e3
+    p50, p95, p99 = np.percentile(micros, [50, 95, 99])
+    mean = float(micros.mean())
+    return {
+        "calls": int(len(latencies)),
+        "ops_per_sec": 1e6 / mean if mean > 0 else float("inf"),
+        "mean_us": mean,
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+    }
+
+
+def allocation_stats(func: Callable, inputs: Iterable) -> Dict[str, float]:
+    """
+    Measure memory allocated by each call of ``func`` with tracemalloc
+    
+    Returns:
+        Mean peak bytes allocated during a call, and mean bytes still
+        allocated after it (caches and leaks show up there)
+    """
+    inputs: List = list(inputs)
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        retained_total = 0
+        for item in inputs:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            func(item)
+            after, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+            retained_total += after - before
+    finally:
+        tracemalloc.stop()
+    
+    count = max(len(inputs), 1)
+    return {
+        "alloc_peak_bytes": peak_total / count,
+        "retained_bytes": retained_total / count,
+    }
\ No newline at end of file
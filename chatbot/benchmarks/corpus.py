@@ -0,0 +1,117 @@
+"""
+Synthetic message corpus built from INTENT_CATEGORIES examples, and a
+synthetic knowledge base corpus
+"""
+
+import itertools
+import random
+from typing import Dict, List, Optional
+
+from src.config import INTENT_CATEGORIES, KNOWLEDGE_CATEGORIES, TECH_KEYWORDS
+
+CONTRACTIONS = ["I'm", "I've", "don't", "can't", "doesn't", "won't", "haven't"]
+
+SNIPPETS = [
+    "see https://wiki.example.com/onboarding?step=2",
+    "email jane.doe@example.com",
+    "by 12/05/2024",
+    "within 3 days",
+    "`npm install` fails with error",
+    "def setup(): return True",
+    "thanks, this is great",
+    "this is confusing and I'm stuck",
+]
+
+
+def perturb(message: str, rng: random.Random) -> str:
+    """Apply the kinds of noise real chat messages carry"""
+    words = message.split()
+    perturbed = []
+    for word in words:
+        roll = rng.random()
+        if roll < 0.05 and len(word) > 3:
+            index = rng.randrange(len(word) - 1)
+            word = word[:index] + word[index + 1] + word[index] + word[index + 2:]  # Typo
+        elif roll < 0.10:
+            word = word.upper()
+        elif roll < 0.15:
+            word = word.capitalize()
+        perturbed.append(word)
+        if rng.random() < 0.05:
+            perturbed.append(rng.choice(CONTRACTIONS))
+        if rng.random() < 0.03:
+            perturbed.append(rng.choice(TECH_KEYWORDS))
+    
+    text = (" " * rng.randint(1, 2)).join(perturbed)
+    if rng.random() < 0.3:
+        text += rng.choice(["?", "!", "...", "??", " :)"])
+    if rng.random() < 0.2:
+        text = f"{text} {rng.choice(SNIPPETS)}"
+    return text
+
+
+def build_corpus(
+    length: int,
+    count: int,
+    seed: int = 42,
+    categories: Optional[Dict[str, Dict]] = None
+) -> List[str]:
+    """
+    Build ``count`` perturbed messages of roughly ``length`` characters
+    
+    Each message starts from an intent example; longer messages append
+    further perturbed examples until the target length is reached and are
+    then cut to ``length`` characters.
+    """
+    rng = random.Random(f"{seed}:{length}")
+    examples = [
+        example
+        for config in (categories or INTENT_CATEGORIES).values()
+        for example in config.get("examples", [])
+    ]
+    
+    corpus = []
+    for _ in range(count):
+        parts = [perturb(rng.choice(examples), rng)]
+        total = len(parts[0])
+        while total < length:
+            parts.append(perturb(rng.choice(examples), rng))
+            total += len(parts[-1]) + 1
+        corpus.append(" ".join(parts)[:length] if total > length else " ".join(parts))
+    return corpus
+
+
+KNOWLEDGE_TERMS = (
+    "claims processing approval policy premium underwriting renewal risk assessment "
+    "customer payment gateway api rest graphql authentication token database migration "
+    "deployment docker kubernetes testing coverage security encryption compliance gdpr "
+    "onboarding team training mentor checklist project setup repository review release "
+    "manager deadline incident monitoring logging performance latency cache queue"
+).split()
+
+
+def build_knowledge_entries(count: int, seed: int = 42, vocabulary_size: int = 20000) -> List[Dict]:
+    """
+    Build ``count`` synthetic knowledge entries
+    
+    Words follow a Zipf-like distribution over KNOWLEDGE_TERMS (the head)
+    and ``vocabulary_size`` generated terms (the tail), so common terms
+    have long postings and rare ones short postings, as in real text.
+    """
+    rng = random.Random(seed)
+    vocabulary = KNOWLEDGE_TERMS + [f"term{index}" for index in range(vocabulary_size)]
+    cumulative = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(vocabulary))))
+    
+    def words(count: int) -> List[str]:
+        return rng.choices(vocabulary, cum_weights=cumulative, k=count)
+    
+    return [
+        {
+            "id": f"entry-{index}",
+            "title": " ".join(words(rng.randint(3, 8))).title(),
+            "content": " ".join(words(rng.randint(40, 160))).capitalize() + ".",
+            "category": rng.choice(KNOWLEDGE_CATEGORIES),
+            "tags": words(rng.randint(2, 5)),
+        }
+        for index in range(count)
+    ]
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""
+NLP hot-path benchmark suite with a JSON regression gate
+
+Drives the per-message entry points over a synthetic corpus (perturbed
+INTENT_CATEGORIES examples, swept over message lengths) and reports
+ops/sec, p50/p95/p99 latency and tracemalloc allocations per call.
+
+Usage (from the chatbot directory):
+    python -m benchmarks.suite --output bench-results.json
+    python -m benchmarks.suite --baseline bench-results.json --max-regression 0.15
+
+With --baseline, the run exits with status 1 when any target's gated
+metric is worse than the baseline by more than --max-regression.
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from src.handlers.message_handler import MessageHandler
+from src.nlp.intent_classifier import IntentClassifier
+
+from .common import allocation_stats, format_table, latency_stats, run_coroutine
+from .corpus import build_corpus
+
+RESULTS_FORMAT_VERSION = 1
+
+TARGETS = (
+    "preprocess_message",
+    "classify_intent",
+    "classify_intent_cached",
+    "analyze_message_entities",
+    "process_message",
+)
+
+# Metrics where a larger value is an improvement
+HIGHER_IS_BETTER = {"ops_per_sec"}
+
+
+def build_targets() -> Dict[str, Callable[[str], object]]:
+    """Benchmarked callables, each taking one message"""
+    classifier = IntentClassifier(cache_size=0)
+    cached_classifier = IntentClassifier()
+    handler = MessageHandler()
+    
+    return {
+        "preprocess_message": classifier._preprocess_message,
+        "classify_intent": lambda message: run_coroutine(classifier.classify_intent(message)),
+        "classify_intent_cached": lambda message: run_coroutine(cached_classifier.classify_intent(message)),
+        "analyze_message_entities": classifier.analyze_message_entities,
+        "process_message": lambda message: run_coroutine(handler.process_message(message)),
+    }
+
+
+def git_commit() -> str:
+    """Commit the benchmarked tree is at, if it is a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_suite(lengths: List[int], messages: int, rounds: int, seed: int, targets: List[str]) -> Dict:
+    """Benchmark every target at every message length"""
+    available = build_targets()
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name in targets:
+        func = available[name]
+        results[name] = {}
+        for length in lengths:
+            corpus = build_corpus(length, messages, seed)
+            if name == "classify_intent_cached":
+                # A small working set that fits the cache, as repeat questions do
+                corpus = corpus[:50] * (len(corpus) // 50 or 1)
+            stats = latency_stats(func, corpus, rounds=rounds)
+            stats.update(allocation_stats(func, corpus[:200]))
+            results[name][str(length)] = stats
+    
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "lengths": lengths,
+            "messages": messages,
+            "rounds": rounds,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, metric: str, max_regression: float) -> List[List]:
+    """
+    Compare a run with a baseline run
+    
+    Returns:
+        One row per target and length present in both runs:
+        [target, length, baseline, current, change, regressed]
+    """
+    rows = []
+    for name, by_length in current["results"].items():
+        for length, stats in by_length.items():
+            previous = baseline.get("results", {}).get(name, {}).get(length)
+            if previous is None or not previous.get(metric):
+                continue
+            change = stats[metric] / previous[metric] - 1
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            rows.append([name, length, previous[metric], stats[metric], change, worse > max_regression])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[40, 200, 1000, 5000])
+    parser.add_argument("--messages", type=int, default=500, help="Corpus size per length")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare with")
+    parser.add_argument("--metric", default="p50_us",
+                        help="Metric gated against the baseline (e.g. p50_us, p99_us, ops_per_sec)")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="Allowed relative slowdown before the gate fails")
+    args = parser.parse_args()
+    
+    run = run_suite(args.lengths, args.messages, args.rounds, args.seed, args.targets)
+    
+    rows = [
+        [
+            name, length,
+            f"{stats['ops_per_sec']:.0f}",
+            f"{stats['p50_us']:.1f}",
+            f"{stats['p95_us']:.1f}",
+            f"{stats['p99_us']:.1f}",
+            f"{stats['alloc_peak_bytes']:.0f}",
+        ]
+        for name, by_length in run["results"].items()
+        for length, stats in by_length.items()
+    ]
+    print(format_table(
+        ["target", "chars", "ops/sec", "p50 us", "p95 us", "p99 us", "peak alloc B"], rows
+    ))
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(run, handle, indent=2)
+        print(f"\nWrote {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        comparison = compare(run, baseline, args.metric, args.max_regression)
+        print(f"\n{args.metric} vs. baseline {baseline.get('meta', {}).get('commit', '?')}")
+        print(format_table(
+            ["target", "chars", "baseline", "current", "change", ""],
+            [
+                [name, length, f"{old:.1f}", f"{new:.1f}", f"{change:+.1%}", "REGRESSION" if regressed else ""]
+                for name, length, old, new, change, regressed in comparison
+            ]
+        ))
+        if any(row[-1] for row in comparison):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
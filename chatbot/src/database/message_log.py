@@ -0,0 +1,217 @@
+"""
+Compact in-memory storage of a session's messages
+"""
+
+import bisect
+import json
+import uuid
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..models.chat_models import ChatMessage
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_NO_ID = bytes(16)
+
+# (sender, message_type) pairs, interned process-wide; a message stores its pair's code
+_KINDS: List[Tuple[str, str]] = []
+_KIND_CODES: Dict[Tuple[str, str], int] = {}
+
+
+def _kind_code(sender: str, message_type: str) -> int:
+    kind = (sender, message_type)
+    code = _KIND_CODES.get(kind)
+    if code is None:
+        code = _KIND_CODES[kind] = len(_KINDS)
+        _KINDS.append(kind)
+    return code
+
+
+def _pack_timestamp(timestamp: datetime) -> int:
+    """Microseconds since the epoch of a naive UTC (or aware) datetime"""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return (timestamp - _EPOCH) // _MICROSECOND
+
+
+class MessageRow:
+    """
+    View of one message in a MessageLog
+    
+    Fields are decoded when read; ``to_message`` builds the ChatMessage.
+    """
+    
+    __slots__ = ("log", "index")
+    
+    def __init__(self, log: "MessageLog", index: int):
+        self.log = log
+        self.index = index
+    
+    @property
+    def id(self) -> str:
+        return self.log._id(self.index)
+    
+    @property
+    def content(self) -> str:
+        start, end = self.log._offsets[2 * self.index], self.log._offsets[2 * self.index + 1]
+        return self.log._data[start:end].decode()
+    
+    @property
+    def sender(self) -> str:
+        return _KINDS[self.log._kinds[self.index]][0]
+    
+    @property
+    def message_type(self) -> str:
+        return _KINDS[self.log._kinds[self.index]][1]
+    
+    @property
+    def timestamp(self) -> datetime:
+        return _EPOCH + timedelta(microseconds=self.log._timestamps[self.index])
+    
+    @property
+    def session_id(self) -> str:
+        return self.log.session_id
+    
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        start, end = self.log._offsets[2 * self.index + 1], self.log._offsets[2 * self.index + 2]
+        return json.loads(self.log._data[start:end]) if end > start else {}
+    
+    def to_message(self) -> ChatMessage:
+        """The message as a ChatMessage (already validated when appended)"""
+        return ChatMessage.model_construct(
+            id=self.id,
+            content=self.content,
+            sender=self.sender,
+            timestamp=self.timestamp,
+            session_id=self.log.session_id,
+            message_type=self.message_type,
+            metadata=self.metadata
+        )
+    
+    def __repr__(self) -> str:
+        return f"MessageRow({self.log.session_id!r}, {self.index})"
+
+
+class MessageLog(Sequence):
+    """
+    Append-only messages of one session, packed into a few flat buffers
+    
+    Per message this keeps 16 bytes of UUID, a 2-byte interned
+    (sender, message_type) code, an 8-byte timestamp (microseconds, UTC),
+    and the UTF-8 content followed by compact JSON metadata (empty for
+    ``{}``) in one contiguous buffer, delimited by two 4-byte offsets.
+    The session id is stored once. Ids that are not canonical UUID
+    strings are kept aside in a dict.
+    
+    While every id sorts after the previous one, as time-ordered ids
+    made by one process do, ``position`` finds a message by binary
+    search over the packed ids; otherwise it scans them.
+    
+    Indexing returns MessageRow views; ChatMessage objects are only
+    built by ``to_messages`` (or ``MessageRow.to_message``), for API
+    responses. Metadata goes through JSON, so non-JSON values come back
+    as strings, as they do from the Redis store and the database.
+    """
+    
+    __slots__ = ("session_id", "_ids", "_kinds", "_timestamps", "_data", "_offsets", "_other_ids", "_ordered")
+    
+    def __init__(self, session_id: str, messages: Iterable[ChatMessage] = ()):
+        self.session_id = session_id
+        self._ids = bytearray()
+        self._kinds = array("H")
+        self._timestamps = array("q")
+        self._data = bytearray()
+        self._offsets = array("I", [0])  # Content start, metadata start, ... end
+        self._other_ids: Optional[Dict[int, str]] = None
+        self._ordered = True  # Packed ids strictly increasing
+        self.extend(messages)
+    
+    def __len__(self) -> int:
+        return len(self._timestamps)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[MessageRow, List[MessageRow]]:
+        if isinstance(index, slice):
+            return [MessageRow(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return MessageRow(self, index)
+    
+    def _packed_id(self, index: int) -> bytes:
+        return bytes(self._ids[16 * index:16 * index + 16])
+    
+    def _id(self, index: int) -> str:
+        packed = self._packed_id(index)
+        if packed == _NO_ID and self._other_ids is not None and index in self._other_ids:
+            return self._other_ids[index]
+        return str(uuid.UUID(bytes=packed))
+    
+    def append(self, message: ChatMessage):
+        """Append a message of this session"""
+        if message.session_id != self.session_id:
+            raise ValueError(f"Message {message.id} belongs to session {message.session_id}, not {self.session_id}")
+        try:
+            parsed = uuid.UUID(message.id)
+        except ValueError:
+            parsed = None
+        packed = parsed.bytes if parsed is not None and str(parsed) == message.id else _NO_ID
+        if packed == _NO_ID:
+            if self._other_ids is None:
+                self._other_ids = {}
+            self._other_ids[len(self)] = message.id
+        if self._ordered and (packed == _NO_ID or (len(self) and packed <= self._ids[-16:])):
+            self._ordered = False
+        
+        self._ids += packed
+        self._kinds.append(_kind_code(message.sender, message.message_type))
+        self._timestamps.append(_pack_timestamp(message.timestamp))
+        self._data += message.content.encode()
+        self._offsets.append(len(self._data))
+        if message.metadata != {}:
+            self._data += json.dumps(message.metadata, default=str, separators=(",", ":")).encode()
+        self._offsets.append(len(self._data))
+    
+    def extend(self, messages: Iterable[ChatMessage]):
+        for message in messages:
+            self.append(message)
+    
+    def position(self, message_id: str) -> Optional[int]:
+        """Index of the message with this id, or None if it is not in the log"""
+        try:
+            parsed = uuid.UUID(message_id)
+        except ValueError:
+            parsed = None
+        if parsed is None or str(parsed) != message_id or parsed.bytes == _NO_ID:
+            for index, other_id in (self._other_ids or {}).items():
+                if other_id == message_id:
+                    return index
+            return None
+        
+        packed = parsed.bytes
+        if self._ordered:
+            index = bisect.bisect_left(range(len(self)), packed, key=self._packed_id)
+            return index if index < len(self) and self._packed_id(index) == packed else None
+        offset = self._ids.find(packed)
+        while offset != -1 and offset % 16:
+            offset = self._ids.find(packed, offset + 1)
+        return offset // 16 if offset != -1 else None
+    
+    def to_messages(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[ChatMessage]:
+        """ChatMessages of ``log[start:stop]``"""
+        return [MessageRow(self, row).to_message() for row in range(*slice(start, stop).indices(len(self)))]
+    
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the buffers (excluding over-allocation and ids kept aside)"""
+        return (
+            len(self._ids)
+            + self._kinds.itemsize * len(self._kinds)
+            + self._timestamps.itemsize * len(self._timestamps)
+            + len(self._data)
+            + self._offsets.itemsize * len(self._offsets)
+        )
\ No newline at end of file
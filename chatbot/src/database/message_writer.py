@@ -0,0 +1,211 @@
+"""
+Write-behind persistence of chat messages to a SQL database
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import JSON, Column, DateTime, Engine, Index, MetaData, String, Table, Text, create_engine, insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+
+from ..config import settings
+from ..models.chat_models import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_METADATA = MetaData()
+
+chat_messages = Table(
+    "chat_messages",
+    MESSAGE_METADATA,
+    Column("id", String(64), primary_key=True),
+    Column("session_id", Text, nullable=False),  # Client-chosen, of any length
+    Column("sender", String(8), nullable=False),
+    Column("message_type", String(32), nullable=False),
+    Column("content", Text, nullable=False),
+    Column("metadata", JSON),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_chat_messages_session_created", "session_id", "created_at"),
+)
+
+
+def create_database_engine(url: str, pool_size: int = 20, max_overflow: int = 30) -> Engine:
+    """
+    Engine for DATABASE_URL with the configured connection pool
+    
+    SQLite (e.g. ``sqlite:///./data/chatbot.db``) works as a local stand-in
+    for PostgreSQL; it ignores the pool settings.
+    """
+    options: Dict[str, Any] = {"json_serializer": lambda value: json.dumps(value, default=str)}
+    if make_url(url).get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    else:
+        options.update(pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+    return create_engine(url, **options)
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Whether a failed write may succeed if retried: the database is unreachable or the connection dropped"""
+    return isinstance(error, OperationalError) or (isinstance(error, DBAPIError) and error.connection_invalidated)
+
+
+class MessageWriter:
+    """
+    Queue of chat messages inserted into ``chat_messages`` in batches
+    
+    ``enqueue`` only appends to an in-process buffer, so requests never
+    wait on the database. A background task inserts the buffer once it
+    holds ``batch_size`` messages or every ``flush_interval`` seconds,
+    whichever comes first, as multi-row INSERTs in one transaction per
+    batch on a pooled connection from a worker thread. A batch that fails
+    because the database is unreachable is put back and retried on the
+    next flush. One the database rejects (e.g. a DataError or
+    IntegrityError) is split in halves until the rejected rows are
+    isolated, and those are dropped and counted. Messages beyond
+    ``max_pending`` are dropped too rather than growing without bound
+    while the database is unreachable.
+    """
+    
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 100000
+    ):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+        self.dropped = 0
+        self._pending: List[ChatMessage] = []
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+        self._table_ready = False
+    
+    async def start(self):
+        """Start the background flusher"""
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._flush_loop())
+    
+    def enqueue(self, messages: Sequence[ChatMessage]):
+        """Queue messages for insertion without waiting for it"""
+        if len(self._pending) + len(messages) > self.max_pending:
+            self.dropped += len(messages)
+            logger.error(f"Chat message queue full ({len(self._pending)} pending); dropped {len(messages)} messages")
+            return
+        self._pending.extend(messages)
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+    
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            if self._closing:
+                return
+    
+    async def flush(self) -> int:
+        """
+        Insert every pending message, ``batch_size`` at a time
+        
+        Returns:
+            Number of messages written (stops at the first transient failure)
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                # Stack of parts of the batch still to insert, next part last
+                parts = [self._pending[:self.batch_size]]
+                del self._pending[:self.batch_size]
+                while parts:
+                    part = parts.pop()
+                    try:
+                        await asyncio.to_thread(self._insert, part)
+                    except Exception as e:
+                        self.failures += 1
+                        if is_transient_error(e):
+                            self._pending[:0] = [message for unwritten in [part, *reversed(parts)] for message in unwritten]
+                            logger.error(f"Error writing {len(part)} chat messages, retrying on the next flush: {str(e)}")
+                            return written
+                        if len(part) == 1:
+                            self.dropped += 1
+                            # The driver's error only: the statement would repeat the message content
+                            reason = getattr(e, "orig", None) or e
+                            logger.error(f"Dropped chat message {part[0].id} rejected by the database: {reason!r}")
+                        else:
+                            middle = len(part) // 2
+                            parts += [part[middle:], part[:middle]]
+                        continue
+                    written += len(part)
+                    self.written += len(part)
+                    self.batches += 1
+        return written
+    
+    def _insert(self, messages: List[ChatMessage]):
+        rows = [
+            {
+                "id": message.id,
+                "session_id": message.session_id,
+                "sender": message.sender,
+                "message_type": message.message_type,
+                "content": message.content,
+                "metadata": message.metadata,
+                "created_at": message.timestamp,
+            }
+            for message in messages
+        ]
+        with self.engine.begin() as connection:
+            if not self._table_ready:
+                # Created on first write, so a database down at startup is retried like any write
+                MESSAGE_METADATA.create_all(connection)
+                self._table_ready = True
+            connection.execute(insert(chat_messages), rows)
+    
+    async def close(self):
+        """Stop the flusher after draining the queue, and close the pool"""
+        if self._task is not None:
+            self._closing = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._pending:
+            logger.error(f"{len(self._pending)} chat messages could not be persisted before shutdown")
+        await asyncio.to_thread(self.engine.dispose)
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Get message write queue statistics"""
+        return {
+            "pending": len(self._pending),
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped
+        }
+
+
+def create_message_writer() -> MessageWriter:
+    """Message writer for DATABASE_URL with the configured pool, batch and queue settings"""
+    engine = create_database_engine(
+        settings.DATABASE_URL, settings.DATABASE_POOL_SIZE, settings.DATABASE_MAX_OVERFLOW
+    )
+    return MessageWriter(
+        engine,
+        batch_size=settings.MESSAGE_BATCH_SIZE,
+        flush_interval=settings.MESSAGE_FLUSH_INTERVAL,
+        max_pending=settings.MESSAGE_QUEUE_LIMIT
+    )
\ No newline at end of file
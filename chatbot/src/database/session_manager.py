@@ -2,12 +2,17 @@
 Session Manager for handling chat sessions and message persistence
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, AsyncIterator, List, Optional, Sequence, Tuple
 from datetime import datetime, timedelta
-import uuid
 
+from ..config import settings
 from ..models.chat_models import ChatSession, ChatMessage
+from .session_store import SessionStore, create_session_store
+
+if TYPE_CHECKING:
+    from .message_writer import MessageWriter
 
 logger = logging.getLogger(__name__)
 
@@ -15,16 +20,38 @@ logger = logging.getLogger(__name__)
 class SessionManager:
     """Manages chat sessions and message persistence"""
     
-    def __init__(self):
-        # In-memory storage for development (use database in production)
-        self.sessions: Dict[str, ChatSession] = {}
-        self.user_sessions: Dict[str, List[str]] = {}  # user_id -> [session_ids]
+    def __init__(self, store: Optional[SessionStore] = None, message_writer: Optional["MessageWriter"] = None):
+        # In-memory unless SESSION_STORE selects a shared store (e.g. redis for API_WORKERS > 1)
+        self.store = store or create_session_store(settings.SESSION_STORE)
+        if message_writer is None and settings.PERSIST_MESSAGES:
+            from .message_writer import create_message_writer
+            
+            message_writer = create_message_writer()
+        # Durable copy of every message, written behind the session store
+        self.message_writer = message_writer
+        self._expiry_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Start expiring idle sessions, and writing messages to the database if enabled"""
+        if self.message_writer is not None:
+            await self.message_writer.start()
+        if settings.SESSION_EXPIRY_INTERVAL > 0 and self._expiry_task is None:
+            self._expiry_task = asyncio.create_task(self._expiry_loop(settings.SESSION_EXPIRY_INTERVAL))
+    
+    async def _expiry_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.cleanup()
+            except Exception as e:
+                logger.error(f"Error expiring sessions: {str(e)}")
     
     async def get_or_create_session(self, session_id: str, user_id: str) -> ChatSession:
         """Get existing session or create new one"""
-        if session_id in self.sessions:
-            session = self.sessions[session_id]
+        session = await self.store.get(session_id)
+        if session is not None:
             session.updated_at = datetime.utcnow()
+            await self.store.touch(session_id, session.user_id, session.updated_at)
             return session
         
         # Create new session
@@ -34,72 +61,140 @@ class SessionManager:
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow()
         )
-        
-        self.sessions[session_id] = session
-        
-        # Track user sessions
-        if user_id not in self.user_sessions:
-            self.user_sessions[user_id] = []
-        self.user_sessions[user_id].append(session_id)
+        await self.store.create(session)
         
         logger.info(f"Created new session {session_id} for user {user_id}")
         return session
     
     async def get_session(self, session_id: str) -> Optional[ChatSession]:
         """Get session by ID"""
-        return self.sessions.get(session_id)
+        return await self.store.get(session_id)
+    
+    async def get_messages(self, session_id: str, start: int = 0, stop: Optional[int] = None) -> List[ChatMessage]:
+        """
+        Get messages ``[start:stop]`` of a session
+        
+        Args:
+            session_id: Session to read
+            start: First message (negative: counted from the end)
+            stop: End of the range, exclusive (None: through the last message)
+        """
+        return await self.store.get_messages(session_id, start, stop)
     
-    async def add_message(self, session_id: str, message: ChatMessage):
+    async def locate_messages(
+        self,
+        session_id: str,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Tuple[int, int, int]:
+        """
+        Find a page of a session's messages by cursor
+        
+        Args:
+            session_id: Session to read
+            before: Only messages older than this message id
+            after: Only messages newer than this message id
+            limit: Most messages in the page: the newest ones in range,
+                or the oldest when paging forward with ``after``
+        
+        Returns:
+            ``start`` and ``stop`` of the page (messages ``[start:stop]``),
+            and the number of messages in the session
+        
+        Raises:
+            ValueError: A cursor is not a message of the session
+        """
+        total = await self.store.count_messages(session_id)
+        start, stop = 0, total
+        if after is not None:
+            start = await self._cursor_position(session_id, after) + 1
+        if before is not None:
+            stop = max(await self._cursor_position(session_id, before), start)
+        if limit is not None:
+            if after is not None:
+                stop = min(stop, start + limit)
+            else:
+                start = max(start, stop - limit)
+        return start, stop, total
+    
+    async def _cursor_position(self, session_id: str, message_id: str) -> int:
+        position = await self.store.find_message(session_id, message_id)
+        if position is None:
+            raise ValueError(f"Message {message_id} is not in session {session_id}")
+        return position
+    
+    async def iter_messages(
+        self, session_id: str, start: int, stop: int, chunk_size: int = 500
+    ) -> AsyncIterator[List[ChatMessage]]:
+        """
+        Messages ``[start:stop]`` of a session, ``chunk_size`` at a time
+        
+        Only one chunk is materialized at once, so exporting a long
+        session takes constant memory. Stops early if the session is
+        deleted meanwhile.
+        """
+        for chunk_start in range(start, stop, chunk_size):
+            messages = await self.store.get_messages(session_id, chunk_start, min(chunk_start + chunk_size, stop))
+            if not messages:
+                return
+            yield messages
+    
+    async def get_recent_messages(self, session_id: str, count: int) -> List[ChatMessage]:
+        """Get the last ``count`` messages of a session"""
+        if count <= 0:
+            return []
+        return await self.store.get_messages(session_id, -count)
+    
+    async def add_message(self, session_id: str, message: ChatMessage, user_id: Optional[str] = None):
         """Add message to session"""
-        if session_id in self.sessions:
-            self.sessions[session_id].messages.append(message)
-            self.sessions[session_id].updated_at = datetime.utcnow()
+        await self.add_messages(session_id, [message], user_id)
+    
+    async def add_messages(self, session_id: str, messages: Sequence[ChatMessage], user_id: Optional[str] = None):
+        """
+        Add messages to a session in one store write (e.g. a user turn and its reply)
+        
+        Args:
+            session_id: Session to append to
+            messages: Messages, in order
+            user_id: Owner of the session, saving a store lookup when known
+        """
+        user_id = user_id or await self.store.owner(session_id)
+        if user_id is None:
+            return
+        await self.store.append_messages(session_id, user_id, messages, datetime.utcnow())
+        if self.message_writer is not None:
+            self.message_writer.enqueue(messages)
     
     async def get_user_sessions(self, user_id: str, limit: int = 10) -> List[ChatSession]:
         """Get user's recent sessions"""
-        session_ids = self.user_sessions.get(user_id, [])
-        sessions = [self.sessions[sid] for sid in session_ids if sid in self.sessions]
-        
-        # Sort by updated time
-        sessions.sort(key=lambda s: s.updated_at, reverse=True)
-        
-        return sessions[:limit]
+        return await self.store.get_user_sessions(user_id, limit)
     
     async def delete_session(self, session_id: str, user_id: str) -> bool:
         """Delete a session"""
-        if session_id in self.sessions and self.sessions[session_id].user_id == user_id:
-            del self.sessions[session_id]
-            
-            # Remove from user sessions
-            if user_id in self.user_sessions:
-                self.user_sessions[user_id] = [
-                    sid for sid in self.user_sessions[user_id] if sid != session_id
-                ]
-            
+        if await self.store.delete(session_id, user_id):
             logger.info(f"Deleted session {session_id} for user {user_id}")
             return True
         
         return False
     
     async def cleanup(self):
-        """Cleanup old sessions"""
-        cutoff_time = datetime.utcnow() - timedelta(hours=24)  # 24 hours
-        
-        expired_sessions = [
-            sid for sid, session in self.sessions.items()
-            if session.updated_at < cutoff_time
-        ]
-        
-        for session_id in expired_sessions:
-            session = self.sessions[session_id]
-            user_id = session.user_id
-            
-            del self.sessions[session_id]
-            
-            if user_id in self.user_sessions:
-                self.user_sessions[user_id] = [
-                    sid for sid in self.user_sessions[user_id] if sid != session_id
-                ]
+        """Delete sessions idle for longer than SESSION_TIMEOUT"""
+        cutoff_time = datetime.utcnow() - timedelta(seconds=settings.SESSION_TIMEOUT)
         
-        if expired_sessions:
-            logger.info(f"Cleaned up {len(expired_sessions)} expired sessions") 
\ No newline at end of file
+        expired = await self.store.expire(cutoff_time)
+        if expired:
+            logger.info(f"Cleaned up {expired} expired sessions")
+    
+    async def close(self):
+        """Stop expiring sessions, write out queued messages and release the stores' connections"""
+        if self._expiry_task is not None:
+            self._expiry_task.cancel()
+            try:
+                await self._expiry_task
+            except asyncio.CancelledError:
+                pass
+            self._expiry_task = None
+        if self.message_writer is not None:
+            await self.message_writer.close()
+        await self.store.close()
\ No newline at end of file
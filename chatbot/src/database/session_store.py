@@ -0,0 +1,442 @@
+"""
+Pluggable storage backends for chat sessions
+"""
+
+import heapq
+import json
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from ..config import settings
+from ..models.chat_models import ChatMessage, ChatSession
+from .message_log import MessageLog
+
+logger = logging.getLogger(__name__)
+
+SESSION_STORES = ("memory", "redis")
+
+# RPUSH messages (the first half of ARGV) to KEYS[1] and record each id (the
+# second half) with its list index in the hash KEYS[2]; returns the new length
+_APPEND_MESSAGES_SCRIPT = """
+local count = #ARGV / 2
+local length = redis.call('LLEN', KEYS[1])
+for i = 1, count do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+    redis.call('HSET', KEYS[2], ARGV[count + i], length + i - 1)
+end
+return length + count
+"""
+
+
+class SessionStore(ABC):
+    """Where SessionManager keeps sessions and their messages"""
+    
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[ChatSession]:
+        """Session without its messages (see get_messages), or None if it does not exist (or expired)"""
+    
+    @abstractmethod
+    async def owner(self, session_id: str) -> Optional[str]:
+        """User id of a session, without loading its messages"""
+    
+    @abstractmethod
+    async def get_messages(self, session_id: str, start: int = 0, stop: Optional[int] = None) -> List[ChatMessage]:
+        """Messages ``[start:stop]`` of a session (negative indexes count from the end)"""
+    
+    @abstractmethod
+    async def count_messages(self, session_id: str) -> int:
+        """Number of messages in a session"""
+    
+    @abstractmethod
+    async def find_message(self, session_id: str, message_id: str) -> Optional[int]:
+        """Index of a message in its session, or None if the session has no such message"""
+    
+    @abstractmethod
+    async def create(self, session: ChatSession):
+        """Store a new session and index it under its user"""
+    
+    @abstractmethod
+    async def touch(self, session_id: str, user_id: str, updated_at: datetime):
+        """Mark a session as used at ``updated_at``"""
+    
+    @abstractmethod
+    async def append_messages(self, session_id: str, user_id: str, messages: Sequence[ChatMessage], updated_at: datetime):
+        """Append messages to a session, in order"""
+    
+    @abstractmethod
+    async def get_user_sessions(self, user_id: str, limit: int) -> List[ChatSession]:
+        """A user's sessions with their messages, most recently updated first"""
+    
+    @abstractmethod
+    async def delete(self, session_id: str, user_id: str) -> bool:
+        """Delete a session if it belongs to ``user_id``"""
+    
+    async def expire(self, cutoff: datetime) -> int:
+        """
+        Delete sessions last updated before ``cutoff``
+        
+        Returns:
+            Number of sessions deleted (stores with native expiry delete none)
+        """
+        return 0
+    
+    async def close(self):
+        """Release connections"""
+
+
+class InMemorySessionStore(SessionStore):
+    """
+    Process-local sessions (development and single-worker deployments)
+    
+    Sessions are returned by reference, with an empty ``messages`` list:
+    each session's messages are kept in a MessageLog, and ChatMessage
+    objects are only built for the messages a caller asks for.
+    
+    Expiry keeps a min-heap of (updated_at, session id) with lazy
+    rescheduling: every session has one heap entry, which may be older
+    than its current updated_at. An expiry pass pops only the entries
+    older than the cutoff, deleting the sessions that really are idle and
+    pushing the others back at their current updated_at, so it touches
+    only sessions that are due instead of scanning all of them.
+    """
+    
+    def __init__(self, max_sessions_per_user: int = 0):
+        """
+        Args:
+            max_sessions_per_user: Sessions kept per user; creating one more
+                evicts the least recently used (0: unlimited)
+        """
+        self.max_sessions_per_user = max_sessions_per_user
+        self.sessions: Dict[str, ChatSession] = {}
+        self.messages: Dict[str, MessageLog] = {}
+        self.user_sessions: Dict[str, OrderedDict] = {}  # user_id -> session ids, least recently used first
+        self.evicted = 0
+        self._expiry: List[Tuple[datetime, str]] = []
+        self._scheduled: Set[str] = set()  # Session ids with an entry in _expiry
+    
+    async def get(self, session_id: str) -> Optional[ChatSession]:
+        return self.sessions.get(session_id)
+    
+    async def get_messages(self, session_id: str, start: int = 0, stop: Optional[int] = None) -> List[ChatMessage]:
+        log = self.messages.get(session_id)
+        return log.to_messages(start, stop) if log is not None else []
+    
+    async def count_messages(self, session_id: str) -> int:
+        log = self.messages.get(session_id)
+        return len(log) if log is not None else 0
+    
+    async def find_message(self, session_id: str, message_id: str) -> Optional[int]:
+        log = self.messages.get(session_id)
+        return log.position(message_id) if log is not None else None
+    
+    async def owner(self, session_id: str) -> Optional[str]:
+        session = self.sessions.get(session_id)
+        return session.user_id if session is not None else None
+    
+    async def create(self, session: ChatSession):
+        if session.id in self.sessions:
+            self._remove(session.id)
+        user_sessions = self.user_sessions.setdefault(session.user_id, OrderedDict())
+        while self.max_sessions_per_user and len(user_sessions) >= self.max_sessions_per_user:
+            evicted_id, _ = user_sessions.popitem(last=False)
+            del self.sessions[evicted_id]
+            del self.messages[evicted_id]
+            self.evicted += 1
+            logger.debug(f"Evicted least recently used session {evicted_id} of user {session.user_id}")
+        
+        self.messages[session.id] = MessageLog(session.id, session.messages)
+        session.messages = []
+        self.sessions[session.id] = session
+        user_sessions[session.id] = None
+        if session.id not in self._scheduled:
+            # An id still in the heap from a deleted session is rescheduled when popped
+            heapq.heappush(self._expiry, (session.updated_at, session.id))
+            self._scheduled.add(session.id)
+    
+    async def touch(self, session_id: str, user_id: str, updated_at: datetime):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            session.updated_at = updated_at
+            self.user_sessions[session.user_id].move_to_end(session_id)
+    
+    async def append_messages(self, session_id: str, user_id: str, messages: Sequence[ChatMessage], updated_at: datetime):
+        session = self.sessions.get(session_id)
+        if session is not None:
+            self.messages[session_id].extend(messages)
+            session.updated_at = updated_at
+            self.user_sessions[session.user_id].move_to_end(session_id)
+    
+    async def get_user_sessions(self, user_id: str, limit: int) -> List[ChatSession]:
+        session_ids = self.user_sessions.get(user_id, {})
+        return [
+            self.sessions[sid].model_copy(update={"messages": self.messages[sid].to_messages()})
+            for sid in islice(reversed(session_ids), limit)
+        ]
+    
+    async def delete(self, session_id: str, user_id: str) -> bool:
+        if session_id not in self.sessions or self.sessions[session_id].user_id != user_id:
+            return False
+        self._remove(session_id)
+        return True
+    
+    async def expire(self, cutoff: datetime) -> int:
+        expired = 0
+        while self._expiry and self._expiry[0][0] < cutoff:
+            _, session_id = heapq.heappop(self._expiry)
+            session = self.sessions.get(session_id)
+            if session is not None and session.updated_at >= cutoff:
+                heapq.heappush(self._expiry, (session.updated_at, session_id))
+                continue
+            self._scheduled.discard(session_id)
+            if session is not None:
+                self._remove(session_id)
+                expired += 1
+        return expired
+    
+    def _remove(self, session_id: str):
+        """Forget a session; its heap entry goes stale and is dropped when popped"""
+        user_id = self.sessions.pop(session_id).user_id
+        del self.messages[session_id]
+        user_sessions = self.user_sessions.get(user_id)
+        if user_sessions is not None:
+            user_sessions.pop(session_id, None)
+            if not user_sessions:
+                del self.user_sessions[user_id]
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions shared by every API worker through Redis
+    
+    Per session, metadata is a hash, messages an append-only list of
+    JSON documents and a second hash maps message ids to list indexes, so
+    a history cursor is found with one HGET; each user has a sorted set
+    of session ids scored by last update. Every write refreshes a sliding
+    TTL on the keys it touches, so idle sessions expire in Redis itself.
+    Writes that belong together (a turn's messages plus the metadata
+    update) are sent as one pipeline: a single round-trip.
+    
+    Any ``redis.asyncio``-compatible client works, e.g.
+    ``fakeredis.aioredis.FakeRedis(decode_responses=True)`` in tests.
+    """
+    
+    def __init__(
+        self,
+        url: str = "redis://localhost:6379/0",
+        password: Optional[str] = None,
+        ttl: int = 3600,
+        max_sessions_per_user: int = 0,
+        prefix: str = "chatbot:",
+        client: Any = None
+    ):
+        """
+        Args:
+            url: Redis URL (ignored when ``client`` is given)
+            password: Redis password, if not in the URL
+            ttl: Seconds an untouched session is kept
+            max_sessions_per_user: Sessions kept per user; creating one more
+                evicts the least recently used (0: unlimited)
+            prefix: Key namespace
+            client: Existing client, which must decode responses to str
+        """
+        if client is None:
+            import redis.asyncio as redis
+            
+            client = redis.from_url(url, password=password or None, decode_responses=True)
+        self.client = client
+        self.ttl = ttl
+        self.max_sessions_per_user = max_sessions_per_user
+        self.prefix = prefix
+    
+    def _session_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}"
+    
+    def _messages_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}:messages"
+    
+    def _positions_key(self, session_id: str) -> str:
+        return f"{self.prefix}session:{session_id}:positions"
+    
+    def _session_keys(self, session_id: str) -> Tuple[str, str, str]:
+        """Every key of a session"""
+        return self._session_key(session_id), self._messages_key(session_id), self._positions_key(session_id)
+    
+    def _user_key(self, user_id: str) -> str:
+        return f"{self.prefix}user:{user_id}:sessions"
+    
+    async def get(self, session_id: str) -> Optional[ChatSession]:
+        metadata = await self.client.hgetall(self._session_key(session_id))
+        return _session_from_redis(session_id, metadata) if metadata else None
+    
+    async def get_messages(self, session_id: str, start: int = 0, stop: Optional[int] = None) -> List[ChatMessage]:
+        if stop == 0:
+            return []
+        # LRANGE includes its end index
+        messages = await self.client.lrange(self._messages_key(session_id), start, -1 if stop is None else stop - 1)
+        return [ChatMessage.model_validate_json(message) for message in messages]
+    
+    async def count_messages(self, session_id: str) -> int:
+        return await self.client.llen(self._messages_key(session_id))
+    
+    async def find_message(self, session_id: str, message_id: str, chunk_size: int = 1000) -> Optional[int]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hget(self._positions_key(session_id), message_id)
+        pipe.hlen(self._positions_key(session_id))
+        pipe.llen(self._messages_key(session_id))
+        position, indexed, length = await pipe.execute()
+        if position is not None:
+            return int(position)
+        
+        # Messages stored before ids were indexed come first and have no
+        # positions, even once later appends are indexed: scan those only,
+        # in the stored JSON, which starts with the id
+        unindexed = length - indexed
+        prefix = '{"id":' + json.dumps(message_id) + ","
+        for start in range(0, unindexed, chunk_size):
+            stop = min(start + chunk_size, unindexed)
+            messages = await self.client.lrange(self._messages_key(session_id), start, stop - 1)
+            for index, message in enumerate(messages, start):
+                if message.startswith(prefix):
+                    return index
+        return None
+    
+    async def owner(self, session_id: str) -> Optional[str]:
+        return await self.client.hget(self._session_key(session_id), "user_id")
+    
+    async def create(self, session: ChatSession):
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._session_key(session.id), mapping=_session_to_redis(session))
+        pipe.expire(self._session_key(session.id), self.ttl)
+        if session.messages:
+            self._append(pipe, session.id, session.messages)
+            pipe.expire(self._messages_key(session.id), self.ttl)
+            pipe.expire(self._positions_key(session.id), self.ttl)
+        self._index(pipe, session.id, session.user_id, session.updated_at)
+        if self.max_sessions_per_user:
+            # Sessions past the cap, least recently used last
+            pipe.zrevrange(self._user_key(session.user_id), self.max_sessions_per_user, -1)
+        replies = await pipe.execute()
+        
+        if self.max_sessions_per_user and replies[-1]:
+            pipe = self.client.pipeline(transaction=True)
+            for session_id in replies[-1]:
+                pipe.delete(*self._session_keys(session_id))
+            pipe.zrem(self._user_key(session.user_id), *replies[-1])
+            await pipe.execute()
+    
+    async def touch(self, session_id: str, user_id: str, updated_at: datetime):
+        pipe = self.client.pipeline(transaction=True)
+        self._update(pipe, session_id, user_id, updated_at)
+        await pipe.execute()
+    
+    async def append_messages(self, session_id: str, user_id: str, messages: Sequence[ChatMessage], updated_at: datetime):
+        pipe = self.client.pipeline(transaction=True)
+        if messages:
+            self._append(pipe, session_id, messages)
+        self._update(pipe, session_id, user_id, updated_at)
+        await pipe.execute()
+    
+    def _append(self, pipe, session_id: str, messages: Sequence[ChatMessage]):
+        """Queue appending messages and indexing their ids"""
+        pipe.eval(
+            _APPEND_MESSAGES_SCRIPT,
+            2,
+            self._messages_key(session_id),
+            self._positions_key(session_id),
+            *(message.model_dump_json() for message in messages),
+            *(message.id for message in messages)
+        )
+    
+    def _update(self, pipe, session_id: str, user_id: str, updated_at: datetime):
+        """Queue an updated_at change and TTL refresh"""
+        # A session that expired meanwhile comes back with the fields ChatSession requires
+        pipe.hsetnx(self._session_key(session_id), "user_id", user_id)
+        pipe.hset(self._session_key(session_id), "updated_at", updated_at.isoformat())
+        pipe.expire(self._session_key(session_id), self.ttl)
+        pipe.expire(self._messages_key(session_id), self.ttl)
+        pipe.expire(self._positions_key(session_id), self.ttl)
+        self._index(pipe, session_id, user_id, updated_at)
+    
+    def _index(self, pipe, session_id: str, user_id: str, updated_at: datetime):
+        pipe.zadd(self._user_key(user_id), {session_id: updated_at.timestamp()})
+        pipe.expire(self._user_key(user_id), self.ttl)
+    
+    async def get_user_sessions(self, user_id: str, limit: int) -> List[ChatSession]:
+        session_ids = await self.client.zrevrange(self._user_key(user_id), 0, limit - 1)
+        if not session_ids:
+            return []
+        pipe = self.client.pipeline(transaction=False)
+        for session_id in session_ids:
+            pipe.hgetall(self._session_key(session_id))
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+        replies = await pipe.execute()
+        
+        sessions, expired = [], []
+        for number, session_id in enumerate(session_ids):
+            metadata, messages = replies[2 * number], replies[2 * number + 1]
+            if metadata:
+                sessions.append(_session_from_redis(session_id, metadata, messages))
+            else:
+                expired.append(session_id)
+        if expired:
+            # Sessions expire on their own; drop them from the user's index lazily
+            await self.client.zrem(self._user_key(user_id), *expired)
+        return sessions
+    
+    async def delete(self, session_id: str, user_id: str) -> bool:
+        if await self.owner(session_id) != user_id:
+            return False
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*self._session_keys(session_id))
+        pipe.zrem(self._user_key(user_id), session_id)
+        await pipe.execute()
+        return True
+    
+    async def close(self):
+        await self.client.aclose()
+
+
+def _session_to_redis(session: ChatSession) -> Dict[str, str]:
+    """Hash fields of a session's metadata"""
+    return {
+        "user_id": session.user_id,
+        "created_at": session.created_at.isoformat(),
+        "updated_at": session.updated_at.isoformat(),
+        "is_active": "1" if session.is_active else "0",
+        "session_type": session.session_type,
+        "context": json.dumps(session.context, default=str),
+    }
+
+
+def _session_from_redis(session_id: str, metadata: Dict[str, str], messages: Sequence[str] = ()) -> ChatSession:
+    return ChatSession(
+        id=session_id,
+        user_id=metadata["user_id"],
+        messages=[ChatMessage.model_validate_json(message) for message in messages],
+        context=json.loads(metadata.get("context") or "{}"),
+        created_at=datetime.fromisoformat(metadata.get("created_at") or metadata["updated_at"]),
+        updated_at=datetime.fromisoformat(metadata["updated_at"]),
+        is_active=metadata.get("is_active", "1") == "1",
+        session_type=metadata.get("session_type", "chat")
+    )
+
+
+def create_session_store(backend: str) -> SessionStore:
+    """
+    Session store for a SESSION_STORE setting
+    
+    "redis" connects to REDIS_URL, falling back to in-memory sessions when
+    the redis library is unavailable; anything else keeps sessions in memory.
+    """
+    if backend == "redis":
+        try:
+            return RedisSessionStore(
+                settings.REDIS_URL, settings.REDIS_PASSWORD, settings.REDIS_TTL, settings.MAX_SESSIONS_PER_USER
+            )
+        except ImportError as e:
+            logger.warning(f"Could not use the Redis session store ({e}); keeping sessions in memory")
+    return InMemorySessionStore(settings.MAX_SESSIONS_PER_USER)
\ No newline at end of file
@@ -3,9 +3,11 @@ Message Handler for processing and routing chat messages
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
 from datetime import datetime
 
+from ..nlp.text_analysis import AnalyzedMessage
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +24,7 @@ class MessageHandler:
     
     async def process_message(
         self, 
-        message: str, 
+        message: Union[str, AnalyzedMessage], 
         message_type: str = "text",
         context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
@@ -30,51 +32,54 @@ class MessageHandler:
         Process incoming message based on type
         
         Args:
-            message: The message content
+            message: The message content, or the request's AnalyzedMessage
             message_type: Type of message (text, code, suggestion, error)
             context: Additional context information
             
         Returns:
             Processed message data
         """
+        analyzed = AnalyzedMessage.of(message)
         try:
             processor = self.message_processors.get(message_type, self._process_text_message)
-            return await processor(message, context or {})
+            return await processor(analyzed, context or {})
         except Exception as e:
             logger.error(f"Error processing message: {str(e)}")
             return {
-                "processed_message": message,
+                "processed_message": analyzed.text,
                 "message_type": "error",
                 "error": str(e),
                 "timestamp": datetime.utcnow().isoformat()
             }
     
-    async def _process_text_message(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_text_message(self, message: AnalyzedMessage, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process regular text messages"""
-        # Clean and validate message
-        cleaned_message = self._clean_message(message)
+        # Cleaned and lowercased forms come from the shared analysis
+        cleaned_message = message.cleaned
         
         # Extract metadata
         metadata = {
-            "word_count": len(cleaned_message.split()),
+            "word_count": len(message.words),
             "character_count": len(cleaned_message),
-            "contains_code": self._contains_code(cleaned_message),
-            "contains_urls": self._contains_urls(cleaned_message),
+            "contains_code": self._contains_code(message.lowered),
+            "contains_urls": self._contains_urls(message.lowered),
             "language": self._detect_language(cleaned_message),
-            "sentiment": self._analyze_sentiment(cleaned_message)
+            "sentiment": self._analyze_sentiment(message.lowered)
         }
         
         return {
             "processed_message": cleaned_message,
-            "original_message": message,
+            "original_message": message.text,
             "message_type": "text",
             "metadata": metadata,
             "context": context,
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    async def _process_code_message(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_code_message(self, message: AnalyzedMessage, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process code-related messages"""
+        message = message.text
+        
         # Extract code blocks
         code_blocks = self._extract_code_blocks(message)
         
@@ -93,8 +98,9 @@ class MessageHandler:
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    async def _process_suggestion_message(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_suggestion_message(self, message: AnalyzedMessage, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process suggestion messages"""
+        message = message.text
         suggestions = self._parse_suggestions(message)
         
         metadata = {
@@ -111,8 +117,9 @@ class MessageHandler:
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    async def _process_error_message(self, message: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def _process_error_message(self, message: AnalyzedMessage, context: Dict[str, Any]) -> Dict[str, Any]:
         """Process error messages"""
+        message = message.text
         error_info = self._parse_error(message)
         
         metadata = {
@@ -130,40 +137,29 @@ class MessageHandler:
             "timestamp": datetime.utcnow().isoformat()
         }
     
-    def _clean_message(self, message: str) -> str:
-        """Clean and sanitize message content"""
-        # Remove excessive whitespace
-        cleaned = " ".join(message.split())
-        
-        # Remove potentially harmful content
-        # (In production, implement proper sanitization)
-        
-        return cleaned.strip()
-    
-    def _contains_code(self, message: str) -> bool:
-        """Check if message contains code"""
+    def _contains_code(self, message_lower: str) -> bool:
+        """Check if lowercased message contains code"""
         code_indicators = [
             "```", "def ", "function ", "class ", "import ", "from ",
             "if __name__", "console.log", "println", "{", "}", "[", "]"
         ]
-        return any(indicator in message.lower() for indicator in code_indicators)
+        return any(indicator in message_lower for indicator in code_indicators)
     
-    def _contains_urls(self, message: str) -> bool:
-        """Check if message contains URLs"""
+    def _contains_urls(self, message_lower: str) -> bool:
+        """Check if lowercased message contains URLs"""
         url_indicators = ["http://", "https://", "www.", ".com", ".org", ".net"]
-        return any(indicator in message.lower() for indicator in url_indicators)
+        return any(indicator in message_lower for indicator in url_indicators)
     
     def _detect_language(self, message: str) -> str:
         """Detect message language (simplified)"""
         # In production, use proper language detection library
         return "en"  # Default to English
     
-    def _analyze_sentiment(self, message: str) -> str:
-        """Analyze message sentiment (simplified)"""
+    def _analyze_sentiment(self, message_lower: str) -> str:
+        """Analyze lowercased message sentiment (simplified)"""
         positive_words = ["good", "great", "excellent", "thanks", "helpful", "awesome"]
         negative_words = ["bad", "terrible", "awful", "hate", "problem", "error", "issue"]
         
-        message_lower = message.lower()
         positive_count = sum(1 for word in positive_words if word in message_lower)
         negative_count = sum(1 for word in negative_words if word in message_lower)
         
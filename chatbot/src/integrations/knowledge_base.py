@@ -2,118 +2,563 @@
 Knowledge Base integration for semantic search and information retrieval
 """
 
+import asyncio
+import itertools
+import json
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import List, Dict, Any, AsyncIterator, Callable, Hashable, Optional, Set, Tuple
+
+from ..config import settings, KNOWLEDGE_CATEGORIES
+from ..knowledge.bulk_import import read_entry_batches
+from ..knowledge.documents import DocumentState, content_hash
+from ..knowledge.embedder import Embedder, HashingEmbedder, create_embedder
+from ..knowledge.index_store import IndexFormatError, open_shards, read_sources
+from ..knowledge.refresher import DocumentChanges, KnowledgeRefresher
+from ..knowledge.result_cache import SearchResultCache, normalize_query
+from ..knowledge.shards import ShardHit, combine_statistics, group_by_category, merge_top_k
+from ..knowledge.snapshot import KnowledgeSnapshot, Segment
+from ..knowledge.tokenizer import tokenize
 
 logger = logging.getLogger(__name__)
 
+SEARCH_MODES = ("semantic", "lexical", "hybrid")
+
+# Reciprocal rank fusion: candidates taken from each ranking, and rank offset
+HYBRID_CANDIDATES = 4
+RRF_K = 60
+
+# On-disk index directory inside KNOWLEDGE_BASE_PATH
+INDEX_DIRECTORY = ".index"
+
+# Directory inside KNOWLEDGE_BASE_PATH where bulk-imported batches are saved as NDJSON documents
+IMPORT_DIRECTORY = "imports"
+
+# Sample knowledge entries, indexed when no built index exists under KNOWLEDGE_BASE_PATH
+SAMPLE_KNOWLEDGE_ENTRIES = [
+    {
+        "id": "onboarding-basics",
+        "title": "ElevateHub Onboarding Process",
+        "content": "The onboarding process consists of 6 phases: Account Setup, Team Introduction, Project Assignment, Technical Training, Domain Knowledge, and Final Assessment.",
+        "category": "onboarding_process",
+        "tags": ["onboarding", "process", "phases"]
+    },
+    {
+        "id": "insurance-concepts",
+        "title": "Insurance Industry Fundamentals",
+        "content": "Key insurance concepts include policy management, claims processing, underwriting, risk assessment, and regulatory compliance.",
+        "category": "insurance_domain",
+        "tags": ["insurance", "domain", "concepts"]
+    },
+    {
+        "id": "tech-stack",
+        "title": "Technical Stack Overview",
+        "content": "Our technology stack includes React, TypeScript, Node.js, PostgreSQL, AWS services, and Salesforce integration.",
+        "category": "technical_standards",
+        "tags": ["technology", "stack", "tools"]
+    },
+    # ADD YOUR PROJECT-SPECIFIC ENTRIES HERE:
+    {
+        "id": "project-specific-setup",
+        "title": "Project Setup Guidelines",
+        "content": "For the Insurance Claims Platform project: 1) Install Docker and Node.js 18+, 2) Clone the main repository, 3) Set up local PostgreSQL database, 4) Configure environment variables, 5) Run `npm install` and `docker-compose up`",
+        "category": "technical_standards",
+        "tags": ["setup", "installation", "docker", "database"]
+    },
+    {
+        "id": "business-rules",
+        "title": "Insurance Business Rules",
+        "content": "Critical business rules: Claims must be processed within 48 hours, Premium calculations use age+location+vehicle factors, Policy renewals require 30-day notice, High-value claims (>$50K) need manager approval",
+        "category": "insurance_domain",
+        "tags": ["business-rules", "claims", "policy", "premium"]
+    },
+    {
+        "id": "api-documentation",
+        "title": "API Integration Guide",
+        "content": "Main APIs: Customer API (REST), Policy Management API (GraphQL), Claims Processing API (REST), Payment Gateway (Stripe), External data from MVR/CLUE databases. All APIs use JWT authentication.",
+        "category": "technical_standards",
+        "tags": ["api", "integration", "authentication", "database"]
+    },
+    {
+        "id": "compliance-requirements",
+        "title": "Compliance and Security",
+        "content": "Must comply with: GDPR for EU customers, CCPA for California residents, SOX for financial reporting, PCI DSS for payment processing. All customer data must be encrypted at rest and in transit.",
+        "category": "compliance",
+        "tags": ["compliance", "security", "gdpr", "encryption"]
+    },
+    {
+        "id": "testing-procedures",
+        "title": "Testing Standards",
+        "content": "Testing requirements: 80% code coverage minimum, End-to-end tests for critical user flows, Load testing for 1000+ concurrent users, Security penetration testing quarterly",
+        "category": "technical_standards",
+        "tags": ["testing", "coverage", "security", "performance"]
+    }
+]
+
 
 class KnowledgeBase:
-    """Manages knowledge base for contextual information retrieval"""
+    """
+    Manages knowledge base for contextual information retrieval
     
-    def __init__(self):
-        self.knowledge_entries = []
+    Entries are indexed in one shard per category, each an immutable
+    KnowledgeSnapshot published by swapping it into ``shards``. A search
+    filtered by category touches only its shard; an unfiltered search runs
+    on every shard in a thread pool and merges their top hits. Each shard
+    has its own writer lock, so rebuilding one never blocks searches, nor
+    updates of the others.
+    """
+    
+    def __init__(self, embedder: Optional[Embedder] = None):
+        self.embedder = embedder
+        self.shards: Dict[str, KnowledgeSnapshot] = {}
+        self.index_manifests: Dict[str, Dict[str, Any]] = {}
+        self.refresher = KnowledgeRefresher(
+            Path(settings.KNOWLEDGE_BASE_PATH), settings.KNOWLEDGE_CHUNK_SIZE, KNOWLEDGE_CATEGORIES
+        )
+        self.result_cache = SearchResultCache(
+            settings.KNOWLEDGE_CACHE_SIZE, settings.KNOWLEDGE_CACHE_MAX_BYTES, settings.KNOWLEDGE_CACHE_TTL
+        )
+        self._versions = itertools.count(1)  # Published shard versions, unique across shards
+        self._shard_locks: Dict[str, asyncio.Lock] = {}
+        self._search_pool: Optional[ThreadPoolExecutor] = None
+        self._refresh_task: Optional[asyncio.Task] = None
         self.initialized = False
     
+    @property
+    def version(self) -> int:
+        """Version of the most recently published shard (0 before any)"""
+        return max((shard.version for shard in self.shards.values()), default=0)
+    
     async def initialize(self):
-        """Initialize knowledge base with sample data"""
+        """
+        Initialize knowledge base
+        
+        Memory-maps the index built under KNOWLEDGE_BASE_PATH when there is
+        one for the configured embedder. Otherwise indexes the documents
+        found there, or the sample entries when there are none.
+        """
         logger.info("Initializing knowledge base...")
         
-        # Sample knowledge entries
-        self.knowledge_entries = [
-            {
-                "id": "onboarding-basics",
-                "title": "ElevateHub Onboarding Process",
-                "content": "The onboarding process consists of 6 phases: Account Setup, Team Introduction, Project Assignment, Technical Training, Domain Knowledge, and Final Assessment.",
-                "category": "onboarding_process",
-                "tags": ["onboarding", "process", "phases"]
-            },
-            {
-                "id": "insurance-concepts",
-                "title": "Insurance Industry Fundamentals",
-                "content": "Key insurance concepts include policy management, claims processing, underwriting, risk assessment, and regulatory compliance.",
-                "category": "insurance_domain",
-                "tags": ["insurance", "domain", "concepts"]
-            },
-            {
-                "id": "tech-stack",
-                "title": "Technical Stack Overview",
-                "content": "Our technology stack includes React, TypeScript, Node.js, PostgreSQL, AWS services, and Salesforce integration.",
-                "category": "technical_standards",
-                "tags": ["technology", "stack", "tools"]
-            },
-            # ADD YOUR PROJECT-SPECIFIC ENTRIES HERE:
-            {
-                "id": "project-specific-setup",
-                "title": "Project Setup Guidelines",
-                "content": "For the Insurance Claims Platform project: 1) Install Docker and Node.js 18+, 2) Clone the main repository, 3) Set up local PostgreSQL database, 4) Configure environment variables, 5) Run `npm install` and `docker-compose up`",
-                "category": "technical_standards",
-                "tags": ["setup", "installation", "docker", "database"]
-            },
-            {
-                "id": "business-rules",
-                "title": "Insurance Business Rules",
-                "content": "Critical business rules: Claims must be processed within 48 hours, Premium calculations use age+location+vehicle factors, Policy renewals require 30-day notice, High-value claims (>$50K) need manager approval",
-                "category": "insurance_domain",
-                "tags": ["business-rules", "claims", "policy", "premium"]
-            },
-            {
-                "id": "api-documentation",
-                "title": "API Integration Guide",
-                "content": "Main APIs: Customer API (REST), Policy Management API (GraphQL), Claims Processing API (REST), Payment Gateway (Stripe), External data from MVR/CLUE databases. All APIs use JWT authentication.",
-                "category": "technical_standards",
-                "tags": ["api", "integration", "authentication", "database"]
-            },
-            {
-                "id": "compliance-requirements",
-                "title": "Compliance and Security",
-                "content": "Must comply with: GDPR for EU customers, CCPA for California residents, SOX for financial reporting, PCI DSS for payment processing. All customer data must be encrypted at rest and in transit.",
-                "category": "compliance",
-                "tags": ["compliance", "security", "gdpr", "encryption"]
-            },
-            {
-                "id": "testing-procedures",
-                "title": "Testing Standards",
-                "content": "Testing requirements: 80% code coverage minimum, End-to-end tests for critical user flows, Load testing for 1000+ concurrent users, Security penetration testing quarterly",
-                "category": "technical_standards",
-                "tags": ["testing", "coverage", "security", "performance"]
+        if self.embedder is None:
+            self.embedder = create_embedder(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSION)
+        if self.load_index():
+            logger.info("Knowledge base initialized from the on-disk index")
+        else:
+            changes = await asyncio.to_thread(self.refresher.scan)
+            await asyncio.to_thread(self.build_index, changes.added or list(SAMPLE_KNOWLEDGE_ENTRIES))
+            self.refresher.commit(changes)
+            source = f"{len(self.refresher.states)} documents" if changes.added else "sample data"
+            logger.info(f"Knowledge base initialized with {source}")
+        self.initialized = True
+    
+    def load_index(self, root: Optional[str] = None) -> bool:
+        """
+        Memory-map a built index instead of building one
+        
+        Returns:
+            Whether a usable index was opened
+        """
+        root = root or index_root()
+        try:
+            opened = open_shards(root, nprobe=settings.KNOWLEDGE_IVF_NPROBE)
+        except IndexFormatError as e:
+            logger.info(f"No on-disk knowledge index opened: {e}")
+            return False
+        for category, (_, _, manifest) in opened.items():
+            if manifest["embedder"] != self.embedder.name:
+                logger.warning(
+                    f"On-disk knowledge shard {category} was built with embedder {manifest['embedder']}, "
+                    f"not {self.embedder.name}; rebuild it with python -m src.knowledge.build_index"
+                )
+                return False
+        
+        self.shards = {
+            category: KnowledgeSnapshot([Segment(index, vector_index)], next(self._versions))
+            for category, (index, vector_index, _) in opened.items()
+        }
+        self.index_manifests = {category: manifest for category, (_, _, manifest) in opened.items()}
+        self.refresher.states = KnowledgeRefresher.states_from_json(read_sources(root))
+        return True
+    
+    def build_index(self, entries: List[Dict[str, Any]]):
+        """Replace the index with shards built over ``entries``"""
+        if self.embedder is None:
+            self.embedder = create_embedder(settings.EMBEDDING_MODEL, settings.EMBEDDING_DIMENSION)
+        
+        shards = {}
+        for category, category_entries in group_by_category(entries).items():
+            shards[category] = self._build_shard(category_entries)
+            shards[category].version = next(self._versions)
+        self.shards = shards
+        self.index_manifests = {}
+        logger.info(
+            f"Indexed {sum(len(shard) for shard in shards.values())} knowledge entries "
+            f"in {len(shards)} category shards"
+        )
+    
+    def _build_shard(self, entries: List[Dict[str, Any]]) -> KnowledgeSnapshot:
+        return KnowledgeSnapshot.build(entries, self.embedder.embed, **self._vector_options())
+    
+    @staticmethod
+    def _vector_options() -> Dict[str, Any]:
+        """Vector index settings for built, added and merged segments"""
+        return dict(
+            vector_index=settings.KNOWLEDGE_VECTOR_INDEX,
+            quantize=settings.KNOWLEDGE_VECTOR_QUANTIZATION,
+            nlist=settings.KNOWLEDGE_IVF_NLIST,
+            nprobe=settings.KNOWLEDGE_IVF_NPROBE
+        )
+    
+    async def apply_changes(self, added: List[Dict[str, Any]], removed_ids: List[str] = ()) -> int:
+        """
+        Add, replace or remove entries and publish the result atomically
+        
+        New shard snapshots are built in worker threads while searches keep
+        using the current ones, and are published together. Writers of the
+        same shard are serialized; shards the changes do not touch are not
+        locked. An entry whose category changed moves to its new shard.
+        
+        Returns:
+            Version of the knowledge base after publishing
+        """
+        by_category = group_by_category(added)
+        entry_ids = [*removed_ids, *(entry["id"] for entry in added)]
+        categories = set(by_category)
+        while True:
+            async with AsyncExitStack() as stack:
+                for category in sorted(categories):
+                    await stack.enter_async_context(self._shard_lock(category))
+                # Looked up under the locks, so no writer moves these entries meanwhile,
+                # and in a thread, as a segment's first lookup decodes all its entries
+                holding = await asyncio.to_thread(self._shards_holding, entry_ids)
+                if holding <= categories:
+                    shards = self.shards
+                    categories = list(categories)
+                    updated = await asyncio.gather(*(
+                        asyncio.to_thread(
+                            shards.get(category, KnowledgeSnapshot([])).with_changes,
+                            by_category.get(category, []),
+                            # Entries now in another category leave this shard
+                            [*removed_ids, *(entry["id"] for entry in added if entry["category"] != category)],
+                            self.embedder.embed,
+                            settings.KNOWLEDGE_MAX_SEGMENTS,
+                            **self._vector_options()
+                        )
+                        for category in categories
+                    ))
+                    self._publish(dict(zip(categories, updated)))
+                    return self.version
+            # Shards we did not lock hold some of the entries: retry holding their locks too
+            categories |= holding
+    
+    def _shards_holding(self, entry_ids: List[str]) -> Set[str]:
+        """Categories whose shards hold a live entry with one of these ids"""
+        return {
+            category for category, shard in self.shards.items()
+            if any(shard.locate(entry_id) is not None for entry_id in entry_ids)
+        }
+    
+    async def rebuild_shard(self, category: str, entries: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Rebuild one category's shard from scratch and publish it
+        
+        Only that shard's writers wait for the rebuild; searches keep using
+        its current snapshot, and other shards update as usual.
+        
+        Args:
+            category: Shard to rebuild
+            entries: Its new entries (default: its live entries, re-indexed
+                into a single segment)
+        
+        Returns:
+            Version of the published shard
+        """
+        if entries is not None and any(entry["category"] != category for entry in entries):
+            raise ValueError(f"Entries of other categories cannot be indexed in the {category} shard")
+        if not self.initialized:
+            await self.initialize()
+        
+        async with self._shard_lock(category):
+            if entries is None:
+                shard = self.shards.get(category, KnowledgeSnapshot([]))
+                entries = [entry for segment in shard.segments for entry in segment.live_entries()[0]]
+            started = time.perf_counter()
+            snapshot = await asyncio.to_thread(self._build_shard, entries)
+            self._publish({category: snapshot})
+        logger.info(
+            f"Rebuilt knowledge shard {category} ({len(snapshot)} entries) "
+            f"in {(time.perf_counter() - started) * 1000:.1f}ms (v{snapshot.version})"
+        )
+        return snapshot.version
+    
+    def _publish(self, updates: Dict[str, KnowledgeSnapshot]):
+        """Swap in new shard snapshots, versioning those that changed"""
+        shards = dict(self.shards)
+        for category, snapshot in updates.items():
+            if snapshot is shards.get(category) or (category not in shards and not len(snapshot)):
+                continue
+            snapshot.version = next(self._versions)
+            shards[category] = snapshot
+        self.shards = shards
+    
+    def _shard_lock(self, category: str) -> asyncio.Lock:
+        lock = self._shard_locks.get(category)
+        if lock is None:
+            lock = self._shard_locks[category] = asyncio.Lock()
+        return lock
+    
+    async def import_entries(
+        self,
+        chunks: AsyncIterator[bytes],
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Index an NDJSON stream of KnowledgeEntry records batch by batch
+        
+        Each batch is published before the next one is read, so its
+        entries are searchable as soon as it is reported and reading the
+        stream waits for indexing. Entries replace live ones with the same id.
+        
+        Each batch is first saved as an NDJSON document under
+        KNOWLEDGE_BASE_PATH/imports, so other workers index it on their next
+        refresh and it is indexed again after a restart. Deleting the file
+        removes its entries at the next refresh.
+        
+        Args:
+            chunks: NDJSON body chunks
+            batch_size: Lines per batch (default KNOWLEDGE_BULK_BATCH_SIZE)
+        
+        Yields:
+            Per batch: line, indexed and failed counts, errors and the knowledge base version
+        """
+        if not self.initialized:
+            await self.initialize()
+        
+        async for batch in read_entry_batches(chunks, batch_size or settings.KNOWLEDGE_BULK_BATCH_SIZE):
+            version = self.version
+            if batch.entries:
+                relative_path, state = await asyncio.to_thread(self._save_import, batch.entries)
+                version = await self.apply_changes([{**entry, "source": relative_path} for entry in batch.entries])
+                # Already indexed here: the refresher need not read the document back
+                self.refresher.commit(DocumentChanges([], [], {relative_path: state}, {}))
+            yield {
+                "batch": batch.number,
+                "lines": batch.lines,
+                "indexed": len(batch.entries),
+                "failed": batch.failed,
+                "errors": batch.errors,
+                "version": version,
             }
-        ]
+    
+    def _save_import(self, entries: List[Dict[str, Any]]) -> Tuple[str, DocumentState]:
+        """
+        Write imported entries as a new NDJSON document under KNOWLEDGE_BASE_PATH
         
-        self.initialized = True
-        logger.info("Knowledge base initialized with sample data")
+        Returns:
+            The document's path relative to KNOWLEDGE_BASE_PATH, and its state for the refresher
+        """
+        relative_path = f"{IMPORT_DIRECTORY}/{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:12]}.ndjson"
+        path = self.refresher.root / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries).encode()
+        # Written under a hidden name, which scans skip, and renamed once complete
+        partial = path.with_name(f".{path.name}.partial")
+        partial.write_bytes(data)
+        os.replace(partial, path)
+        stat = path.stat()
+        return relative_path, DocumentState(
+            stat.st_mtime_ns, stat.st_size, content_hash(data), tuple(entry["id"] for entry in entries)
+        )
+    
+    async def refresh(self) -> Dict[str, Any]:
+        """
+        Index the documents under KNOWLEDGE_BASE_PATH that changed since the last refresh
+        
+        Returns:
+            Counts of added and removed entries, parse errors and the knowledge base version
+        """
+        if not self.initialized:
+            await self.initialize()
+        
+        started = time.perf_counter()
+        changes = await asyncio.to_thread(self.refresher.scan)
+        version = self.version
+        if changes.changed:
+            version = await self.apply_changes(changes.added, changes.removed_ids)
+            logger.info(
+                f"Knowledge refresh: {len(changes.added)} entries added, {len(changes.removed_ids)} removed "
+                f"in {(time.perf_counter() - started) * 1000:.1f}ms (v{version})"
+            )
+        self.refresher.commit(changes)
+        return {
+            "added": len(changes.added),
+            "removed": len(changes.removed_ids),
+            "errors": changes.errors,
+            "version": version,
+        }
     
-    async def search(self, query: str, category: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
-        """Search knowledge base for relevant information"""
+    def start_refresher(self, interval: Optional[float] = None):
+        """Refresh from KNOWLEDGE_BASE_PATH now and then every ``interval`` seconds (0 disables)"""
+        interval = settings.KNOWLEDGE_REFRESH_INTERVAL if interval is None else interval
+        if interval > 0 and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_loop(interval))
+    
+    async def _refresh_loop(self, interval: float):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing knowledge base: {str(e)}")
+            await asyncio.sleep(interval)
+    
+    async def close(self):
+        """Stop the background refresher and the shard search threads"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+            self._refresh_task = None
+        if self._search_pool is not None:
+            self._search_pool.shutdown(wait=False)
+            self._search_pool = None
+    
+    async def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 5,
+        mode: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search knowledge base for relevant information
+        
+        Args:
+            query: Search text
+            category: Only search this category's shard (its BM25F
+                statistics are the shard's own)
+            limit: Maximum number of results
+            mode: "lexical" ranks with BM25F over title, tags and content,
+                "semantic" by embedding cosine similarity, and "hybrid"
+                fuses both rankings; defaults to KNOWLEDGE_SEARCH_MODE
+        
+        Returns:
+            Results best first; relevance_score is relative to the best hit,
+            and highlights are (start, end) offsets of highlighted_terms in
+            the snippet.
+            Results may be shared with other callers through the result
+            cache and must not be modified.
+        """
+        mode = mode or settings.KNOWLEDGE_SEARCH_MODE
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode}")
         if not self.initialized:
             await self.initialize()
         
+        # Cached results stay valid until a shard they came from is republished
+        all_shards = self.shards
+        if category is not None:
+            shard = all_shards.get(category)
+            shards = {category: shard} if shard is not None else {}
+            version = shard.version if shard is not None else 0
+        else:
+            shards = {name: shard for name, shard in all_shards.items() if len(shard)}
+            version = max((shard.version for shard in all_shards.values()), default=0)
+        cache_key = (normalize_query(query), category, limit, mode)
+        cached = self.result_cache.get(cache_key, version)
+        if cached is not None:
+            return cached
+        
+        if mode == "lexical":
+            hits = await self._lexical_hits(shards, query, limit)
+        elif mode == "semantic":
+            hits = await self._semantic_hits(shards, query, limit)
+        else:
+            candidates = max(limit * HYBRID_CANDIDATES, limit)
+            lexical, semantic = await asyncio.gather(
+                self._lexical_hits(shards, query, candidates),
+                self._semantic_hits(shards, query, candidates)
+            )
+            hits = reciprocal_rank_fusion([lexical, semantic])[:limit]
+        if not hits:
+            self.result_cache.put(cache_key, version, [])
+            return []
+        
+        top_score = hits[0][1]
+        terms = list(dict.fromkeys(tokenize(query)))
         results = []
-        query_lower = query.lower()
-        
-        for entry in self.knowledge_entries:
-            # Simple keyword matching
-            content_match = query_lower in entry["content"].lower()
-            title_match = query_lower in entry["title"].lower()
-            tag_match = any(query_lower in tag.lower() for tag in entry["tags"])
-            
-            if content_match or title_match or tag_match:
-                # Calculate simple relevance score
-                score = 0.0
-                if title_match:
-                    score += 0.5
-                if content_match:
-                    score += 0.3
-                if tag_match:
-                    score += 0.2
-                
-                results.append({
-                    "entry": entry,
-                    "relevance_score": score,
-                    "snippet": entry["content"][:200] + "..." if len(entry["content"]) > 200 else entry["content"]
-                })
-        
-        # Sort by relevance score
-        results.sort(key=lambda x: x["relevance_score"], reverse=True)
-        
-        return results[:limit] 
\ No newline at end of file
+        for (shard_category, doc_id), score in hits:
+            shard = shards[shard_category]
+            entry = shard.entry(doc_id)
+            snippet, highlights, highlighted_terms = shard.snippet(doc_id, entry["content"], terms)
+            results.append({
+                "entry": entry,
+                "relevance_score": score / top_score if top_score > 0 else 0.0,
+                "score": score,
+                "snippet": snippet,
+                "highlights": highlights,
+                "highlighted_terms": highlighted_terms
+            })
+        
+        self.result_cache.put(cache_key, version, results)
+        return results
+    
+    async def _lexical_hits(self, shards: Dict[str, KnowledgeSnapshot], query: str, limit: int) -> List[ShardHit]:
+        """Best BM25F hits of the shards, scored with their combined statistics"""
+        statistics = None
+        if len(shards) > 1:
+            statistics = combine_statistics([shard.statistics(query) for shard in shards.values()])
+        rankings = await self._fan_out(
+            shards, lambda shard: shard.search_lexical(query, limit=limit, statistics=statistics)
+        )
+        return merge_top_k(rankings, limit)
+    
+    async def _semantic_hits(self, shards: Dict[str, KnowledgeSnapshot], query: str, limit: int) -> List[ShardHit]:
+        """Entries most similar to the query embedding (positive similarity only)"""
+        if not shards:
+            return []
+        if isinstance(self.embedder, HashingEmbedder):
+            query_vector = self.embedder.embed_one(query)
+        else:
+            # A model forward pass: keep it off the event loop, as other requests wait on it
+            query_vector = await asyncio.to_thread(self.embedder.embed_one, query)
+        rankings = await self._fan_out(shards, lambda shard: shard.search_vectors(query_vector, limit=limit))
+        return [(key, score) for key, score in merge_top_k(rankings, limit) if score > 0]
+    
+    async def _fan_out(
+        self,
+        shards: Dict[str, KnowledgeSnapshot],
+        search: Callable[[KnowledgeSnapshot], List[Tuple[int, float]]]
+    ) -> Dict[str, List[Tuple[int, float]]]:
+        """Rankings of ``search`` on every shard, run in the search pool when there are several"""
+        if len(shards) <= 1 or settings.KNOWLEDGE_SEARCH_WORKERS <= 1:
+            return {category: search(shard) for category, shard in shards.items()}
+        if self._search_pool is None:
+            self._search_pool = ThreadPoolExecutor(
+                settings.KNOWLEDGE_SEARCH_WORKERS, thread_name_prefix="knowledge-search"
+            )
+        loop = asyncio.get_running_loop()
+        rankings = await asyncio.gather(*(
+            loop.run_in_executor(self._search_pool, search, shard) for shard in shards.values()
+        ))
+        return dict(zip(shards, rankings))
+
+
+def index_root() -> Path:
+    """Directory of the on-disk index under KNOWLEDGE_BASE_PATH"""
+    return Path(settings.KNOWLEDGE_BASE_PATH) / INDEX_DIRECTORY
+
+
+def reciprocal_rank_fusion(rankings: List[List[Tuple[Hashable, float]]]) -> List[Tuple[Hashable, float]]:
+    """Merge rankings by summed 1 / (RRF_K + rank) scores, best first"""
+    fused: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        for rank, (key, _) in enumerate(ranking):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+    return sorted(fused.items(), key=lambda item: (-item[1], item[0]))
\ No newline at end of file
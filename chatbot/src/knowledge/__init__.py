@@ -0,0 +1 @@
+# Knowledge indexing and retrieval
\ No newline at end of file
@@ -0,0 +1,83 @@
+"""
+Build the on-disk knowledge index
+
+Indexes the documents under KNOWLEDGE_BASE_PATH (and any entry files
+given) with the configured embedder and publishes a memory-mappable build
+of every category shard there, which KnowledgeBase opens at startup
+instead of indexing in memory. The document states are stored with the
+shards, so the running refresher only re-indexes documents changed after
+it.
+
+Usage (from the chatbot directory):
+    python -m src.knowledge.build_index
+    python -m src.knowledge.build_index --entries export.ndjson more.json --vector-index ivf
+"""
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from ..config import settings
+from ..integrations.knowledge_base import SAMPLE_KNOWLEDGE_ENTRIES, KnowledgeBase, index_root
+from ..models.chat_models import KnowledgeEntry
+from .index_store import remove_shards, shard_root, write_index, write_sources
+
+logger = logging.getLogger(__name__)
+
+
+def read_entries(path: Path) -> Iterator[Dict[str, Any]]:
+    """Validated entries from a JSON array or NDJSON file"""
+    with open(path, encoding="utf-8") as handle:
+        if path.suffix == ".json":
+            records = json.load(handle)
+        else:
+            records = (json.loads(line) for line in handle if line.strip())
+        for record in records:
+            yield KnowledgeEntry(**record).model_dump(mode="json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=Path, nargs="*", default=[],
+                        help="JSON or NDJSON files of KnowledgeEntry records, indexed with the documents "
+                             "(default without either: the sample entries)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Index directory (default: <KNOWLEDGE_BASE_PATH>/.index)")
+    parser.add_argument("--vector-index", choices=["exact", "ivf"], default=settings.KNOWLEDGE_VECTOR_INDEX)
+    parser.add_argument("--quantize", action="store_true", default=settings.KNOWLEDGE_VECTOR_QUANTIZATION,
+                        help="Store exact-index vectors as int8")
+    args = parser.parse_args()
+    logging.basicConfig(level=settings.LOG_LEVEL, format=settings.LOG_FORMAT)
+    
+    entries: List[Dict[str, Any]] = []
+    for path in args.entries:
+        entries.extend(read_entries(path))
+    
+    settings.KNOWLEDGE_VECTOR_INDEX = args.vector_index
+    settings.KNOWLEDGE_VECTOR_QUANTIZATION = args.quantize
+    knowledge_base = KnowledgeBase()
+    changes = knowledge_base.refresher.scan()
+    knowledge_base.refresher.commit(changes)
+    entries.extend(changes.added)
+    
+    started = time.perf_counter()
+    knowledge_base.build_index(entries or list(SAMPLE_KNOWLEDGE_ENTRIES))
+    built = time.perf_counter()
+    root = args.output or index_root()
+    for category, shard in knowledge_base.shards.items():
+        segment = shard.segments[0]
+        write_index(shard_root(root, category), segment.index, segment.vectors, knowledge_base.embedder.name)
+    remove_shards(root, keep=knowledge_base.shards)
+    write_sources(root, knowledge_base.refresher.to_json())
+    print(
+        f"Indexed {sum(len(shard) for shard in knowledge_base.shards.values())} entries "
+        f"from {len(changes.states)} documents in {built - started:.2f}s, "
+        f"wrote {len(knowledge_base.shards)} shards to {root} in {time.perf_counter() - built:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,135 @@
+"""
+Streaming NDJSON import of knowledge entries
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, NamedTuple
+
+from pydantic import ValidationError
+
+from ..models.chat_models import KnowledgeEntry
+
+# Longest NDJSON record accepted; longer lines are skipped, not buffered
+MAX_RECORD_BYTES = 1 << 20
+
+# Invalid lines described per batch; the rest are only counted
+MAX_BATCH_ERRORS = 20
+
+
+class ImportBatch(NamedTuple):
+    """Validated entries and errors of one bounded run of NDJSON lines"""
+    number: int
+    lines: int
+    entries: List[Dict[str, Any]]
+    failed: int
+    errors: List[Dict[str, Any]]  # {"line": number, "error": message}, the first MAX_BATCH_ERRORS
+
+
+async def read_entry_batches(
+    chunks: AsyncIterator[bytes],
+    batch_size: int = 500,
+    max_record_bytes: int = MAX_RECORD_BYTES
+) -> AsyncIterator[ImportBatch]:
+    """
+    Validate an NDJSON byte stream into batches of at most ``batch_size`` lines
+    
+    At most one batch and one partial line are held at a time, and the
+    stream is only read further once the consumer asks for the next batch,
+    so memory stays flat for any upload size and a slow consumer slows the
+    upload down. Blank lines are ignored; a record that repeats an id
+    earlier in its batch replaces it.
+    
+    Args:
+        chunks: Request body chunks, split anywhere
+        batch_size: Non-blank lines per batch
+        max_record_bytes: Longest line accepted
+    """
+    number = 0
+    batch = _Batch()
+    pending = bytearray()
+    line_number = 0
+    skipping = False  # Inside a line that is already too long
+    
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not skipping:
+                    pending += chunk[start:]
+                    if len(pending) > max_record_bytes:
+                        pending.clear()
+                        skipping = True
+                break
+            
+            line_number += 1
+            if skipping:
+                batch.fail(line_number, f"Record longer than {max_record_bytes} bytes")
+                skipping = False
+            else:
+                pending += chunk[start:end]
+                if len(pending) > max_record_bytes:
+                    batch.fail(line_number, f"Record longer than {max_record_bytes} bytes")
+                else:
+                    batch.add(line_number, pending)
+                pending.clear()
+            start = end + 1
+            
+            if batch.lines >= batch_size:
+                number += 1
+                yield batch.finish(number)
+                batch = _Batch()
+    
+    if skipping:
+        batch.fail(line_number + 1, f"Record longer than {max_record_bytes} bytes")
+    elif pending.strip():
+        batch.add(line_number + 1, pending)
+    if batch.lines:
+        yield batch.finish(number + 1)
+
+
+class _Batch:
+    __slots__ = ("lines", "entries", "failed", "errors")
+    
+    def __init__(self):
+        self.lines = 0
+        self.failed = 0
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.errors: List[Dict[str, Any]] = []
+    
+    def add(self, line_number: int, line: bytes):
+        if not line.strip():
+            return
+        self.lines += 1
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Record is not a JSON object")
+            entry = KnowledgeEntry(**record).model_dump(mode="json")
+        except ValidationError as e:
+            self._error(line_number, _validation_message(e))
+            return
+        except ValueError as e:  # Includes JSON and UTF-8 decoding errors
+            self._error(line_number, str(e))
+            return
+        self.entries.pop(entry["id"], None)
+        self.entries[entry["id"]] = entry
+    
+    def fail(self, line_number: int, error: str):
+        self.lines += 1
+        self._error(line_number, error)
+    
+    def _error(self, line_number: int, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_BATCH_ERRORS:
+            self.errors.append({"line": line_number, "error": error})
+    
+    def finish(self, number: int) -> ImportBatch:
+        return ImportBatch(number, self.lines, list(self.entries.values()), self.failed, self.errors)
+
+
+def _validation_message(error: ValidationError) -> str:
+    """First validation problem, as 'field: message'"""
+    detail = error.errors()[0]
+    location = ".".join(str(part) for part in detail.get("loc", ()))
+    return f"{location}: {detail.get('msg')}" if location else str(detail.get("msg"))
\ No newline at end of file
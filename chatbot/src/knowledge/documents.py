@@ -0,0 +1,159 @@
+"""
+Knowledge documents on disk: discovery, parsing and chunking into entries
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+DOCUMENT_SUFFIXES = {".md": "markdown", ".markdown": "markdown", ".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+DEFAULT_CATEGORY = "general"
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$", re.MULTILINE)
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+class DocumentState(NamedTuple):
+    """What was indexed from one document file"""
+    mtime_ns: int
+    size: int
+    sha256: str
+    entry_ids: Tuple[str, ...]
+
+
+def iter_document_paths(root: Path) -> Iterator[Path]:
+    """Document files under ``root``, skipping hidden files and directories"""
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(name for name in subdirectories if not name.startswith("."))
+        for name in sorted(files):
+            if not name.startswith(".") and Path(name).suffix.lower() in DOCUMENT_SUFFIXES:
+                yield Path(directory) / name
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest of a document's bytes"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def parse_document(
+    relative_path: str,
+    data: bytes,
+    chunk_size: int = 1500,
+    known_categories: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Knowledge entries of one document file
+    
+    Markdown is split into one entry per heading section, and sections
+    longer than ``chunk_size`` characters are split further at paragraph
+    breaks. JSON files hold one entry or a list of them, NDJSON files one
+    entry per line. Entries get ids derived from the path (unless JSON
+    provides one), a ``source`` field naming the file, and a category from
+    the front matter or JSON, else from the first directory of the path
+    when it is a known category.
+    
+    Raises:
+        ValueError: The file cannot be parsed
+    """
+    kind = DOCUMENT_SUFFIXES[Path(relative_path).suffix.lower()]
+    text = data.decode("utf-8")
+    parts = Path(relative_path).parts
+    default_category = (
+        parts[0] if len(parts) > 1 and parts[0] in (known_categories or []) else DEFAULT_CATEGORY
+    )
+    
+    if kind == "markdown":
+        entries = _markdown_entries(relative_path, text, chunk_size, default_category)
+    else:
+        if kind == "json":
+            records = json.loads(text) if text.strip() else []
+            records = records if isinstance(records, list) else [records]
+        else:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        entries = []
+        for number, record in enumerate(records):
+            if not isinstance(record, dict):
+                raise ValueError(f"{relative_path}: record {number} is not an object")
+            entry = dict(record)
+            entry.setdefault("id", f"{relative_path}#{number}")
+            entry.setdefault("category", default_category)
+            entry.setdefault("tags", [])
+            entries.append(entry)
+    
+    for entry in entries:
+        entry["source"] = relative_path
+    return entries
+
+
+def _front_matter(text: str) -> Tuple[Dict[str, str], str]:
+    """``key: value`` pairs of a leading ``---`` block, and the text after it"""
+    if not text.startswith("---\n"):
+        return {}, text
+    end = text.find("\n---", 4)
+    if end < 0:
+        return {}, text
+    fields = {}
+    for line in text[4:end].splitlines():
+        key, separator, value = line.partition(":")
+        if separator:
+            fields[key.strip().lower()] = value.strip().strip("\"'")
+    return fields, text[end + 4:].lstrip("-\n")
+
+
+def _markdown_entries(relative_path: str, text: str, chunk_size: int, default_category: str) -> List[Dict[str, Any]]:
+    fields, body = _front_matter(text)
+    document_title = fields.get("title") or Path(relative_path).stem.replace("-", " ").replace("_", " ").title()
+    category = fields.get("category", default_category)
+    tags = [tag.strip() for tag in fields.get("tags", "").strip("[]").split(",") if tag.strip()]
+    
+    # (heading, section text) pairs; text before the first heading belongs to the document title
+    sections = []
+    headings = list(_HEADING.finditer(body))
+    if not headings or headings[0].start() > 0:
+        sections.append((document_title, body[:headings[0].start()] if headings else body))
+    for number, heading in enumerate(headings):
+        end = headings[number + 1].start() if number + 1 < len(headings) else len(body)
+        sections.append((heading.group(2), body[heading.end():end]))
+    
+    entries = []
+    for heading, section in sections:
+        for chunk in _chunks(section.strip(), chunk_size):
+            title = heading if heading == document_title else f"{document_title}: {heading}"
+            entries.append({
+                "id": f"{relative_path}#{len(entries)}",
+                "title": title,
+                "content": chunk,
+                "category": category,
+                "tags": tags,
+            })
+    return entries
+
+
+def _chunks(text: str, chunk_size: int) -> List[str]:
+    """Split text at paragraph breaks into pieces of at most about ``chunk_size`` characters"""
+    if not text:
+        return []
+    if len(text) <= chunk_size:
+        return [text]
+    chunks = []
+    current = ""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        while len(paragraph) > chunk_size:
+            cut = paragraph.rfind(" ", 0, chunk_size)
+            cut = cut if cut > 0 else chunk_size
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut])
+            paragraph = paragraph[cut:].lstrip()
+        if current and len(current) + len(paragraph) + 2 > chunk_size:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""
+Text embedders for semantic knowledge retrieval
+"""
+
+import logging
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .tokenizer import tokenize
+
+logger = logging.getLogger(__name__)
+
+HASHING_EMBEDDER = "hashing"
+
+# Texts per vectorized HashingEmbedder pass, bounding temporary arrays
+_EMBED_BATCH = 2048
+
+
+class Embedder(ABC):
+    """Maps texts to L2-normalized float32 vectors of a fixed dimension"""
+    
+    dimension: int
+    
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Identifies the embedding space: vectors are comparable only under the same name"""
+    
+    @abstractmethod
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts
+        
+        Returns:
+            A (len(texts), dimension) float32 array of unit-length rows
+        """
+    
+    def embed_one(self, text: str) -> np.ndarray:
+        """Embed a single text"""
+        return self.embed([text])[0]
+
+
+class HashingEmbedder(Embedder):
+    """
+    Deterministic embedder that needs no model files
+    
+    Words and their character trigrams are hashed to a signed bucket
+    (a sparse random projection of the bag of features), so texts sharing
+    words or word stems get similar vectors. Hashes are CRC32 with a seed,
+    stable across processes, which keeps vectors reproducible in tests and
+    benchmarks. The features of recently seen words are cached (bounded
+    LRU); each call builds its own feature table from them, so threads
+    can embed concurrently.
+    """
+    
+    def __init__(
+        self,
+        dimension: int = 256,
+        seed: int = 0,
+        trigram_weight: float = 0.25,
+        cache_size: int = 100000
+    ):
+        """
+        Args:
+            dimension: Vector dimension
+            seed: CRC32 seed of the feature hashes
+            trigram_weight: Weight of a character trigram relative to its word
+            cache_size: Words whose hashed features are kept, least
+                recently used evicted first
+        """
+        self.dimension = dimension
+        self.seed = seed
+        self.trigram_weight = trigram_weight
+        self.cache_size = cache_size
+        
+        # word -> its signed buckets and weights; shared by the threads embedding concurrently
+        self._word_features: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @property
+    def name(self) -> str:
+        return f"{HASHING_EMBEDDER}:{self.dimension}:{self.seed}:{self.trigram_weight}"
+    
+    def _hash_word(self, word: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Signed buckets and weights of a word and its trigrams"""
+        padded = f"#{word}#"
+        features = [word] + [padded[i:i + 3] for i in range(len(padded) - 2)] if len(word) > 1 else [word]
+        buckets, weights = [], []
+        for index, feature in enumerate(features):
+            hashed = zlib.crc32(feature.encode("utf-8"), self.seed)
+            weight = 1.0 if index == 0 else self.trigram_weight
+            buckets.append(hashed % self.dimension)
+            weights.append(weight if hashed & 0x80000000 else -weight)
+        return np.array(buckets, dtype=np.int64), np.array(weights, dtype=np.float64)
+    
+    def _features(self, words: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Hashed features of distinct words, from the cache where possible"""
+        cache = self._word_features
+        with self._lock:
+            found = [cache.get(word) for word in words]
+            for word, features in zip(words, found):
+                if features is not None:
+                    cache.move_to_end(word)
+        
+        missing = [number for number, features in enumerate(found) if features is None]
+        if missing:
+            for number in missing:
+                found[number] = self._hash_word(words[number])
+            with self._lock:
+                for number in missing:
+                    cache[words[number]] = found[number]
+                while len(cache) > self.cache_size:
+                    cache.popitem(last=False)
+        return found
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for batch_start in range(0, len(texts), _EMBED_BATCH):
+            batch = texts[batch_start:batch_start + _EMBED_BATCH]
+            # Feature table of this batch's distinct words (word id -> its slice of buckets and weights),
+            # local to the call so concurrent calls share only the word cache
+            word_ids: Dict[str, int] = {}
+            token_words = []
+            token_counts = []
+            for text in batch:
+                tokens = tokenize(text)
+                token_words.extend(word_ids.setdefault(token, len(word_ids)) for token in tokens)
+                token_counts.append(len(tokens))
+            if not word_ids:
+                continue
+            
+            word_features = self._features(list(word_ids))
+            lengths = np.fromiter((len(buckets) for buckets, _ in word_features), np.int64, len(word_features))
+            starts = np.cumsum(lengths) - lengths
+            buckets = np.concatenate([buckets for buckets, _ in word_features])
+            weights = np.concatenate([weights for _, weights in word_features])
+            
+            # Expand every token into its feature slice and sum signed weights per row
+            token_words = np.asarray(token_words, dtype=np.int64)
+            feature_counts = lengths[token_words]
+            features = np.repeat(starts[token_words] - np.cumsum(feature_counts) + feature_counts, feature_counts)
+            features += np.arange(len(features))
+            rows = np.repeat(np.repeat(np.arange(len(batch)), token_counts), feature_counts)
+            vectors[batch_start:batch_start + len(batch)] = np.bincount(
+                rows * self.dimension + buckets[features],
+                weights=weights[features],
+                minlength=len(batch) * self.dimension
+            ).reshape(len(batch), self.dimension)
+        return normalize_rows(vectors)
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Embedder backed by a sentence-transformers model"""
+    
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+        
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+    
+    @property
+    def name(self) -> str:
+        return self.model_name
+    
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), convert_to_numpy=True, normalize_embeddings=True)
+        return np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(texts), self.dimension)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length; all-zero rows stay zero"""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms > 0, norms, 1.0)
+
+
+def create_embedder(model_name: str, dimension: int = 256) -> Embedder:
+    """
+    Embedder for an EMBEDDING_MODEL setting
+    
+    "hashing" selects HashingEmbedder; any other name is loaded with
+    sentence-transformers, falling back to HashingEmbedder when the model
+    or the library is unavailable.
+    """
+    if model_name != HASHING_EMBEDDER:
+        try:
+            return SentenceTransformerEmbedder(model_name)
+        except Exception as e:
+            logger.warning(f"Could not load embedding model {model_name} ({e}); using hashing embedder")
+    return HashingEmbedder(dimension)
\ No newline at end of file
@@ -0,0 +1,395 @@
+"""
+Versioned, memory-mapped on-disk knowledge index
+
+The knowledge index is stored as one shard per entry category, next to
+the state of the documents it was read from:
+    
+    <root>/sources.json                         indexed documents
+    <root>/shards/category-<quoted category>/   one index root per shard
+
+An index root holds one directory per published build and a ``CURRENT``
+file naming the live one:
+    
+    <root>/CURRENT
+    <root>/build-000001/manifest.json
+                       terms.bin, term_offsets.npy      term dictionary
+                       postings_offsets.npy, doc_ids.npy,
+                       field_tfs.npy, field_lengths.npy,
+                       doc_categories.npy               BM25F postings
+                       positions.npy,
+                       position_offsets.npy             content term offsets
+                       vectors.npy [, vector_scales.npy] entry vectors
+                       ivf_*.npy                        IVF lists (optional)
+                       entries.ndjson, entry_offsets.npy entry records
+
+Arrays are ``.npy`` files opened with ``mmap_mode="r"`` and records are
+decoded on access, so opening an index reads only the manifest: startup
+does not grow with the corpus, and every worker process maps the same
+page cache instead of holding a private copy.
+
+A build is written to a temporary directory, renamed into place and
+published by atomically replacing ``CURRENT``; readers never see a
+partial build. Shards are published independently of each other.
+"""
+
+import bisect
+import json
+import logging
+import mmap
+import os
+import shutil
+from collections.abc import Mapping, Sequence
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, Union
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from .inverted_index import FIELDS, InvertedIndex
+from .ivf_index import IVFIndex
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 2
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+SOURCES_FILE = "sources.json"
+SHARDS_DIRECTORY = "shards"
+SHARD_PREFIX = "category-"
+
+# Published builds kept next to the live one, for readers still mapping them
+KEEP_PREVIOUS_BUILDS = 2
+
+
+class IndexFormatError(Exception):
+    """Raised when an on-disk index is missing, partial or of another format version"""
+    pass
+
+
+class MappedBlob:
+    """Read-only memory map of a file (empty files map to empty bytes)"""
+    
+    def __init__(self, path: Path):
+        with open(path, "rb") as handle:
+            size = os.fstat(handle.fileno()).st_size
+            self.data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+    
+    def __getitem__(self, item: slice) -> bytes:
+        return self.data[item]
+
+
+class TermDictionary(Mapping):
+    """
+    Sorted, memory-mapped term -> postings slot mapping
+    
+    Terms are stored as one UTF-8 blob with an offsets array; a lookup is
+    a binary search over the blob, so nothing is loaded up front.
+    """
+    
+    def __init__(self, blob: MappedBlob, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self._count = len(offsets) - 1
+    
+    def _term(self, term_id: int) -> bytes:
+        return self.blob[int(self.offsets[term_id]):int(self.offsets[term_id + 1])]
+    
+    def __getitem__(self, term: str) -> int:
+        key = term.encode("utf-8")
+        term_id = bisect.bisect_left(_LazyKeys(self), key)
+        if term_id < self._count and self._term(term_id) == key:
+            return term_id
+        raise KeyError(term)
+    
+    def __iter__(self) -> Iterator[str]:
+        for term_id in range(self._count):
+            yield self._term(term_id).decode("utf-8")
+    
+    def __len__(self) -> int:
+        return self._count
+
+
+class _LazyKeys:
+    """Sequence view of a TermDictionary's encoded terms, for bisect"""
+    
+    def __init__(self, terms: TermDictionary):
+        self.terms = terms
+    
+    def __getitem__(self, term_id: int) -> bytes:
+        return self.terms._term(term_id)
+    
+    def __len__(self) -> int:
+        return self.terms._count
+
+
+class EntryRecords(Sequence):
+    """Knowledge entries decoded on access from a memory-mapped NDJSON file"""
+    
+    def __init__(self, blob: MappedBlob, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+    
+    def __getitem__(self, doc_id: int) -> Dict[str, Any]:
+        if not 0 <= doc_id < len(self):
+            raise IndexError(doc_id)
+        return json.loads(self.blob[int(self.offsets[doc_id]):int(self.offsets[doc_id + 1])])
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+def write_index(
+    root: Union[str, Path],
+    index: InvertedIndex,
+    vector_index: Union[VectorIndex, IVFIndex],
+    embedder_name: str
+) -> Path:
+    """
+    Write a build of the given indexes under ``root`` and publish it
+    
+    Args:
+        root: Index directory
+        index: Inverted index of the entries
+        vector_index: Vectors of the same entries
+        embedder_name: Name of the embedder the vectors came from
+    
+    Returns:
+        Directory of the published build
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    generation = _current_generation(root) + 1
+    final_dir = root / f"build-{generation:06d}"
+    staging_dir = root / f".build-{generation:06d}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    staging_dir.mkdir()
+    
+    def save(name: str, array: np.ndarray):
+        np.save(staging_dir / f"{name}.npy", np.ascontiguousarray(array))
+    
+    # Term dictionary in sorted order, with postings permuted to match
+    terms = sorted(index.terms)  # Code point order is UTF-8 byte order
+    encoded = [term.encode("utf-8") for term in terms]
+    with open(staging_dir / "terms.bin", "wb") as handle:
+        handle.write(b"".join(encoded))
+    save("term_offsets", _offsets(len(term) for term in encoded))
+    
+    slots = np.fromiter((index.terms[term] for term in terms), dtype=np.int64, count=len(terms))
+    starts, ends = index.offsets[slots], index.offsets[slots + 1]
+    save("postings_offsets", _offsets((ends - starts).tolist()))
+    postings = _ranges(starts, ends)
+    save("doc_ids", index.doc_ids[postings])
+    save("field_tfs", index.field_tfs[postings])
+    position_starts = index.position_offsets[postings]
+    position_ends = index.position_offsets[postings + 1]
+    save("position_offsets", _offsets((position_ends - position_starts).tolist()))
+    save("positions", index.positions[_ranges(position_starts, position_ends)])
+    save("field_lengths", index.field_lengths)
+    save("doc_categories", index.doc_categories)
+    
+    # Entry records, one JSON document per line
+    lengths = []
+    with open(staging_dir / "entries.ndjson", "wb") as handle:
+        for doc_id in range(len(index)):
+            line = json.dumps(index.entries[doc_id], default=str).encode("utf-8") + b"\n"
+            handle.write(line)
+            lengths.append(len(line))
+    save("entry_offsets", _offsets(lengths))
+    
+    vectors: Dict[str, Any] = {"dimension": vector_index.dimension}
+    if isinstance(vector_index, IVFIndex):
+        lists = list(vector_index.lists())
+        save("ivf_centroids", vector_index.centroids)
+        save("ivf_list_offsets", _offsets(len(ids) for ids, _ in lists))
+        save("ivf_ids", np.concatenate([ids for ids, _ in lists]))
+        save("ivf_vectors", np.concatenate([list_vectors for _, list_vectors in lists]))
+        vectors.update(kind="ivf", nprobe=vector_index.nprobe)
+    else:
+        save("vectors", vector_index.matrix)
+        if vector_index.quantized:
+            save("vector_scales", vector_index.scales)
+        vectors.update(kind="exact", quantized=vector_index.quantized)
+    
+    manifest = {
+        "format_version": INDEX_FORMAT_VERSION,
+        "generation": generation,
+        "created_at": datetime.utcnow().isoformat(),
+        "entries": len(index),
+        "terms": len(terms),
+        "postings": int(len(index.doc_ids)),
+        "fields": list(FIELDS),
+        "categories": index.categories,
+        "avg_field_lengths": [float(length) for length in index.avg_field_lengths],
+        "bm25f": {
+            "field_weights": [float(weight) for weight in index.field_weights],
+            "field_b": [float(b) for b in index.field_b],
+            "k1": index.k1,
+        },
+        "embedder": embedder_name,
+        "vectors": vectors,
+    }
+    with open(staging_dir / MANIFEST_FILE, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    
+    os.replace(staging_dir, final_dir)
+    _publish(root, final_dir.name)
+    _remove_old_builds(root, generation)
+    logger.info(f"Published knowledge index build {generation} ({len(index)} entries) to {final_dir}")
+    return final_dir
+
+
+def open_index(
+    root: Union[str, Path],
+    nprobe: Optional[int] = None
+) -> Tuple[InvertedIndex, Union[VectorIndex, IVFIndex], Dict[str, Any]]:
+    """
+    Memory-map the published build under ``root``
+    
+    Returns:
+        The inverted index, the vector index and the build manifest
+    
+    Raises:
+        IndexFormatError: No published build, or one of another format version
+    """
+    root = Path(root)
+    try:
+        build_dir = root / (root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        with open(build_dir / MANIFEST_FILE, encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError) as e:
+        raise IndexFormatError(f"No readable knowledge index under {root}: {e}") from e
+    if manifest.get("format_version") != INDEX_FORMAT_VERSION:
+        raise IndexFormatError(
+            f"Knowledge index format {manifest.get('format_version')} is not {INDEX_FORMAT_VERSION}; rebuild it"
+        )
+    
+    def load(name: str) -> np.ndarray:
+        return np.load(build_dir / f"{name}.npy", mmap_mode="r")
+    
+    bm25f = manifest["bm25f"]
+    index = InvertedIndex.from_arrays(
+        entries=EntryRecords(MappedBlob(build_dir / "entries.ndjson"), load("entry_offsets")),
+        terms=TermDictionary(MappedBlob(build_dir / "terms.bin"), load("term_offsets")),
+        offsets=load("postings_offsets"),
+        doc_ids=load("doc_ids"),
+        field_tfs=load("field_tfs"),
+        field_lengths=load("field_lengths"),
+        doc_categories=load("doc_categories"),
+        categories=manifest["categories"],
+        avg_field_lengths=np.asarray(manifest["avg_field_lengths"], dtype=np.float32),
+        positions=load("positions"),
+        position_offsets=load("position_offsets"),
+        field_weights=tuple(bm25f["field_weights"]),
+        field_b=tuple(bm25f["field_b"]),
+        k1=bm25f["k1"]
+    )
+    
+    vectors = manifest["vectors"]
+    if vectors["kind"] == "ivf":
+        vector_index = IVFIndex.from_lists(
+            load("ivf_centroids"), load("ivf_vectors"), load("ivf_ids"), load("ivf_list_offsets"),
+            nprobe=nprobe or vectors["nprobe"]
+        )
+    else:
+        vector_index = VectorIndex.from_arrays(
+            load("vectors"), load("vector_scales") if vectors["quantized"] else None
+        )
+    
+    logger.info(f"Opened knowledge index build {manifest['generation']} ({manifest['entries']} entries) from {build_dir}")
+    return index, vector_index, manifest
+
+
+def shard_root(root: Union[str, Path], category: str) -> Path:
+    """Index root of a category's shard under the knowledge index ``root``"""
+    return Path(root) / SHARDS_DIRECTORY / (SHARD_PREFIX + quote(category, safe=""))
+
+
+def open_shards(
+    root: Union[str, Path],
+    nprobe: Optional[int] = None
+) -> Dict[str, Tuple[InvertedIndex, Union[VectorIndex, IVFIndex], Dict[str, Any]]]:
+    """
+    Memory-map the published build of every shard under ``root``
+    
+    Returns:
+        (inverted index, vector index, manifest) per category
+    
+    Raises:
+        IndexFormatError: No shards, or a shard that cannot be opened
+    """
+    shards = {}
+    for path in sorted((Path(root) / SHARDS_DIRECTORY).glob(SHARD_PREFIX + "*")):
+        shards[unquote(path.name[len(SHARD_PREFIX):])] = open_index(path, nprobe)
+    if not shards:
+        raise IndexFormatError(f"No knowledge index shards under {root}")
+    return shards
+
+
+def remove_shards(root: Union[str, Path], keep: Iterable[str]):
+    """Delete the shards under ``root`` of categories not in ``keep``"""
+    kept = {shard_root(root, category).name for category in keep}
+    for path in (Path(root) / SHARDS_DIRECTORY).glob(SHARD_PREFIX + "*"):
+        if path.name not in kept:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def write_sources(root: Union[str, Path], sources: Dict[str, Any]):
+    """Atomically replace the document state stored under ``root``"""
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    pending = root / f".{SOURCES_FILE}.tmp"
+    with open(pending, "w", encoding="utf-8") as handle:
+        json.dump(sources, handle)
+    os.replace(pending, root / SOURCES_FILE)
+
+
+def read_sources(root: Union[str, Path]) -> Dict[str, Any]:
+    """Document state stored under ``root`` (empty if none)"""
+    try:
+        with open(Path(root) / SOURCES_FILE, encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+def _offsets(lengths) -> np.ndarray:
+    """Prefix offsets (n + 1 values, starting at 0) of a sequence of lengths"""
+    lengths = np.fromiter(lengths, dtype=np.int64)
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Concatenation of ``arange(start, end)`` for each pair, vectorized"""
+    lengths = ends - starts
+    positions = np.arange(int(lengths.sum()), dtype=np.int64)
+    return positions + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+
+
+def _current_generation(root: Path) -> int:
+    """Highest build generation present under ``root`` (0 if none)"""
+    generations = [
+        int(path.name.split("-")[1]) for path in root.glob("build-*") if path.name.split("-")[1].isdigit()
+    ]
+    return max(generations, default=0)
+
+
+def _publish(root: Path, build_name: str):
+    """Atomically point CURRENT at a build directory"""
+    pending = root / f".{CURRENT_FILE}.tmp"
+    with open(pending, "w", encoding="utf-8") as handle:
+        handle.write(build_name)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(pending, root / CURRENT_FILE)
+
+
+def _remove_old_builds(root: Path, generation: int):
+    """Delete builds older than the last KEEP_PREVIOUS_BUILDS before ``generation``"""
+    for path in root.glob("build-*"):
+        suffix = path.name.split("-")[1]
+        if suffix.isdigit() and int(suffix) < generation - KEEP_PREVIOUS_BUILDS:
+            shutil.rmtree(path, ignore_errors=True)
\ No newline at end of file
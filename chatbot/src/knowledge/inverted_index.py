@@ -0,0 +1,272 @@
+"""
+Inverted index over knowledge entries with BM25F ranking
+"""
+
+import math
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .tokenizer import tokenize, tokenize_with_offsets
+
+FIELDS = ("title", "tags", "content")
+CONTENT_FIELD = FIELDS.index("content")
+
+# BM25F parameters: per-field weight and length normalization
+DEFAULT_FIELD_WEIGHTS = (3.0, 2.0, 1.0)
+DEFAULT_FIELD_B = (0.5, 0.3, 0.75)
+DEFAULT_K1 = 1.2
+
+
+class CorpusStatistics(NamedTuple):
+    """BM25F statistics of a corpus spread over several indexes"""
+    doc_count: int
+    avg_field_lengths: np.ndarray
+    document_frequencies: Dict[str, int]  # Per query term
+
+
+def entry_field_tokens(entry: Dict) -> Tuple[List[str], List[str], List[str], List[int]]:
+    """Tokens of an entry's title, tags and content fields, and the content tokens' offsets"""
+    content_tokens, content_offsets = tokenize_with_offsets(entry.get("content", ""))
+    return (
+        tokenize(entry.get("title", "")),
+        tokenize(" ".join(entry.get("tags", []))),
+        content_tokens,
+        content_offsets,
+    )
+
+
+class InvertedIndex:
+    """
+    Immutable term -> postings index of knowledge entries
+    
+    Postings are stored in CSR form: the postings of term ``t`` are
+    ``doc_ids[offsets[t]:offsets[t + 1]]`` with one row of per-field term
+    frequencies each. A query only reads the postings of its own terms, so
+    its cost grows with the postings it touches, not with the corpus.
+    Posting ``p`` also lists the character offsets of the term in the
+    entry's content, ``positions[position_offsets[p]:position_offsets[p + 1]]``,
+    from which snippets are cut without re-scanning the text.
+    
+    Ranking is BM25F: field frequencies are length-normalized per field,
+    weighted and summed into one pseudo-frequency per document, which is
+    then saturated once with ``k1``.
+    """
+    
+    def __init__(
+        self,
+        entries: Iterable[Dict],
+        field_weights: Tuple[float, ...] = DEFAULT_FIELD_WEIGHTS,
+        field_b: Tuple[float, ...] = DEFAULT_FIELD_B,
+        k1: float = DEFAULT_K1
+    ):
+        self.entries: Sequence[Dict] = [entry for entry in entries if entry.get("is_active", True)]
+        self.field_weights = np.asarray(field_weights, dtype=np.float32)
+        self.field_b = np.asarray(field_b, dtype=np.float32)
+        self.k1 = k1
+        
+        self.categories: List[str] = []
+        self.category_ids: Dict[str, int] = {}
+        terms: Dict[str, int] = {}
+        self.terms: Mapping[str, int] = terms
+        doc_count = len(self.entries)
+        self.doc_categories = np.zeros(doc_count, dtype=np.int32)
+        
+        # One (term, doc, field) key per token occurrence, grouped with NumPy below
+        stride = max(doc_count, 1) * len(FIELDS)
+        token_keys = []
+        content_keys = []
+        content_offsets = []
+        new_term = terms.setdefault
+        for doc_id, entry in enumerate(self.entries):
+            category = entry.get("category", "")
+            if category not in self.category_ids:
+                self.category_ids[category] = len(self.categories)
+                self.categories.append(category)
+            self.doc_categories[doc_id] = self.category_ids[category]
+            
+            *field_tokens, content_tokens, offsets = entry_field_tokens(entry)
+            for field_id, tokens in enumerate(field_tokens):
+                offset = doc_id * len(FIELDS) + field_id
+                token_keys.extend(
+                    new_term(token, len(terms)) * stride + offset for token in tokens
+                )
+            offset = doc_id * len(FIELDS) + CONTENT_FIELD
+            keys = [new_term(token, len(terms)) * stride + offset for token in content_tokens]
+            token_keys.extend(keys)
+            content_keys.extend(keys)
+            content_offsets.extend(offsets)
+        
+        keys, counts = np.unique(np.asarray(token_keys, dtype=np.int64), return_counts=True)
+        self.field_lengths = np.bincount(
+            keys % stride, weights=counts, minlength=doc_count * len(FIELDS)
+        ).astype(np.float32).reshape(doc_count, len(FIELDS))
+        
+        # Keys sort by term, then doc, then field: each (term, doc) run is one posting
+        pairs = keys // len(FIELDS)
+        first_of_posting = np.r_[True, pairs[1:] != pairs[:-1]][:len(pairs)]
+        posting_pairs = pairs[first_of_posting]
+        self.field_tfs = np.zeros((len(posting_pairs), len(FIELDS)), dtype=np.float32)
+        self.field_tfs[np.cumsum(first_of_posting) - 1, keys % len(FIELDS)] = counts
+        self.doc_ids = (posting_pairs % max(doc_count, 1)).astype(np.int32)
+        self.offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        np.cumsum(
+            np.bincount(posting_pairs // max(doc_count, 1), minlength=len(self.terms)), out=self.offsets[1:]
+        )
+        
+        # Content offsets in key order: by posting, then by position in the text
+        order = np.argsort(np.asarray(content_keys, dtype=np.int64), kind="stable")
+        self.positions = np.asarray(content_offsets, dtype=np.int32)[order]
+        self.position_offsets = np.zeros(len(posting_pairs) + 1, dtype=np.int64)
+        np.cumsum(self.field_tfs[:, CONTENT_FIELD], out=self.position_offsets[1:], dtype=np.int64)
+        
+        self.avg_field_lengths = (
+            np.maximum(self.field_lengths.mean(axis=0), 1.0)
+            if len(self.entries) else np.ones(len(FIELDS), dtype=np.float32)
+        )
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        entries: Sequence[Dict],
+        terms: Mapping[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        field_tfs: np.ndarray,
+        field_lengths: np.ndarray,
+        doc_categories: np.ndarray,
+        categories: List[str],
+        avg_field_lengths: np.ndarray,
+        positions: np.ndarray,
+        position_offsets: np.ndarray,
+        field_weights: Tuple[float, ...] = DEFAULT_FIELD_WEIGHTS,
+        field_b: Tuple[float, ...] = DEFAULT_FIELD_B,
+        k1: float = DEFAULT_K1
+    ) -> "InvertedIndex":
+        """
+        Wrap prebuilt index arrays (e.g. memory-mapped ones) without copying
+        
+        ``terms`` may be any mapping from term to the term's postings slot.
+        """
+        index = cls.__new__(cls)
+        index.entries = entries
+        index.terms = terms
+        index.offsets = offsets
+        index.doc_ids = doc_ids
+        index.field_tfs = field_tfs
+        index.field_lengths = field_lengths
+        index.doc_categories = doc_categories
+        index.categories = list(categories)
+        index.category_ids = {category: category_id for category_id, category in enumerate(categories)}
+        index.avg_field_lengths = np.asarray(avg_field_lengths, dtype=np.float32)
+        index.positions = positions
+        index.position_offsets = position_offsets
+        index.field_weights = np.asarray(field_weights, dtype=np.float32)
+        index.field_b = np.asarray(field_b, dtype=np.float32)
+        index.k1 = k1
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def document_frequency(self, term: str) -> int:
+        """Number of entries containing ``term``"""
+        term_id = self.terms.get(term)
+        return 0 if term_id is None else int(self.offsets[term_id + 1] - self.offsets[term_id])
+    
+    def term_positions(self, doc_id: int, terms: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Content character offsets of each of ``terms`` that occurs in an entry
+        
+        Terms occurring only in the title or tags map to an empty array.
+        """
+        positions = {}
+        for term in terms:
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+            start, end = int(self.offsets[term_id]), int(self.offsets[term_id + 1])
+            posting = start + int(np.searchsorted(self.doc_ids[start:end], doc_id))
+            if posting < end and self.doc_ids[posting] == doc_id:
+                positions[term] = self.positions[self.position_offsets[posting]:self.position_offsets[posting + 1]]
+        return positions
+    
+    def idf(self, document_frequency: int, doc_count: Optional[int] = None) -> float:
+        """BM25 inverse document frequency (never negative)"""
+        doc_count = len(self.entries) if doc_count is None else doc_count
+        return math.log(1.0 + (doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+    
+    def score(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        statistics: Optional[CorpusStatistics] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25F scores of the entries matching at least one query term
+        
+        Args:
+            query: Search text
+            category: Only score entries of this category
+            statistics: Corpus-wide statistics to score with when this index
+                is one segment of a larger corpus (defaults to this index's)
+        
+        Returns:
+            Matching doc ids and their scores (unordered)
+        """
+        query_terms = []
+        for term in set(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is not None:
+                query_terms.append((term_id, term))
+        query_terms.sort()
+        if not query_terms:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+        avg_field_lengths = self.avg_field_lengths if statistics is None else statistics.avg_field_lengths
+        
+        doc_parts = []
+        score_parts = []
+        for term_id, term in query_terms:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            normalization = 1.0 - self.field_b + self.field_b * (
+                self.field_lengths[docs] / avg_field_lengths
+            )
+            pseudo_tf = (self.field_tfs[start:end] / normalization) @ self.field_weights
+            if statistics is None:
+                idf = self.idf(end - start)
+            else:
+                idf = self.idf(statistics.document_frequencies.get(term, end - start), statistics.doc_count)
+            doc_parts.append(docs)
+            score_parts.append(idf * pseudo_tf / (self.k1 + pseudo_tf))
+        
+        docs = np.concatenate(doc_parts)
+        contributions = np.concatenate(score_parts)
+        if len(query_terms) > 1:
+            docs, inverse = np.unique(docs, return_inverse=True)
+            contributions = np.bincount(inverse, weights=contributions, minlength=len(docs))
+        
+        if category is not None:
+            category_id = self.category_ids.get(category)
+            if category_id is None:
+                return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float32)
+            keep = self.doc_categories[docs] == category_id
+            docs, contributions = docs[keep], contributions[keep]
+        
+        return docs, contributions.astype(np.float32)
+    
+    def search(self, query: str, category: Optional[str] = None, limit: int = 5) -> List[Tuple[int, float]]:
+        """Top ``limit`` (doc id, score) pairs, best first"""
+        docs, scores = self.score(query, category)
+        return top_k(docs, scores, limit)
+
+
+def top_k(docs: np.ndarray, scores: np.ndarray, limit: int) -> List[Tuple[int, float]]:
+    """Best ``limit`` (doc id, score) pairs; ties go to the lower doc id"""
+    if limit <= 0 or len(docs) == 0:
+        return []
+    if len(docs) > limit:
+        candidates = np.argpartition(-scores, limit - 1)[:limit]
+        docs, scores = docs[candidates], scores[candidates]
+    order = np.lexsort((docs, -scores))
+    return [(int(docs[i]), float(scores[i])) for i in order]
\ No newline at end of file
@@ -0,0 +1,260 @@
+"""
+Approximate nearest-neighbour search with an inverted-file (IVF-flat) index
+"""
+
+import logging
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .embedder import normalize_rows
+from .inverted_index import top_k
+
+logger = logging.getLogger(__name__)
+
+# Training vectors sampled per list, and k-means passes over them
+_TRAIN_SAMPLES_PER_LIST = 64
+_TRAIN_ITERATIONS = 10
+
+
+class IVFIndex:
+    """
+    Cosine-similarity ANN index over unit-length vectors
+    
+    Vectors are partitioned by spherical k-means into ``nlist`` inverted
+    lists, each a contiguous float32 matrix. A query scores the centroids,
+    then only the ``nprobe`` closest lists, so it reads roughly
+    ``nprobe / nlist`` of the corpus. Raising ``nprobe`` trades speed for
+    recall; ``nprobe == nlist`` is an exact search.
+    
+    Vectors can be added and removed by id after the build. New vectors go
+    to their nearest list; removal swaps the list's last row into the gap.
+    Centroids are not retrained on updates, so rebuild after the corpus
+    has drifted substantially. KnowledgeSnapshot adds each new segment's
+    vectors under its oldest segment's centroids; it deletes by masking
+    rows instead of calling ``remove``, since published segments are read
+    by searches in flight.
+    """
+    
+    def __init__(self, centroids: np.ndarray, nprobe: int = 8):
+        self.centroids = np.ascontiguousarray(normalize_rows(np.asarray(centroids, dtype=np.float32)))
+        self.dimension = self.centroids.shape[1]
+        self.nprobe = nprobe
+        nlist = len(self.centroids)
+        self._vectors: List[np.ndarray] = [np.zeros((0, self.dimension), dtype=np.float32)] * nlist
+        self._ids: List[np.ndarray] = [np.zeros(0, dtype=np.int32)] * nlist
+        self._sizes = [0] * nlist
+        self._location_map: Optional[Dict[int, Tuple[int, int]]] = {}  # id -> (list, row)
+    
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        ids: Optional[np.ndarray] = None,
+        nlist: int = 0,
+        nprobe: int = 8,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        Train centroids on ``vectors`` and index them
+        
+        Args:
+            vectors: (n, dimension) vectors to index
+            ids: Ids of the vectors (defaults to their row numbers)
+            nlist: Number of inverted lists (0 picks about sqrt(n))
+            nprobe: Default lists searched per query
+            seed: Seed for centroid initialization and sampling
+        """
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        if nlist <= 0:
+            nlist = max(1, int(math.sqrt(len(vectors))))
+        index = cls(train_centroids(vectors, nlist, seed), nprobe)
+        index.add(np.arange(len(vectors)) if ids is None else ids, vectors)
+        return index
+    
+    @classmethod
+    def from_lists(
+        cls,
+        centroids: np.ndarray,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        list_offsets: np.ndarray,
+        nprobe: int = 8
+    ) -> "IVFIndex":
+        """
+        Wrap stored inverted lists (e.g. memory-mapped ones) without copying
+        
+        List ``i`` is ``vectors[list_offsets[i]:list_offsets[i + 1]]`` with
+        the matching ``ids``. Lists are copied on their first update, and
+        the id map is only built once an update needs it.
+        """
+        index = cls(centroids, nprobe)
+        for list_id in range(index.nlist):
+            start, end = int(list_offsets[list_id]), int(list_offsets[list_id + 1])
+            index._vectors[list_id] = vectors[start:end]
+            index._ids[list_id] = ids[start:end]
+            index._sizes[list_id] = end - start
+        index._location_map = None
+        index._count = int(list_offsets[-1])
+        return index
+    
+    def lists(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """(ids, vectors) of every inverted list, in list order"""
+        for list_id, size in enumerate(self._sizes):
+            yield self._ids[list_id][:size], self._vectors[list_id][:size]
+    
+    @property
+    def _locations(self) -> Dict[int, Tuple[int, int]]:
+        if self._location_map is None:
+            self._location_map = {
+                vector_id: (list_id, row)
+                for list_id, (ids, _) in enumerate(self.lists())
+                for row, vector_id in enumerate(ids.tolist())
+            }
+        return self._location_map
+    
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+    
+    def __len__(self) -> int:
+        return len(self._locations) if self._location_map is not None else self._count
+    
+    def __contains__(self, vector_id: int) -> bool:
+        return vector_id in self._locations
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored vectors and ids, including spare capacity"""
+        return self.centroids.nbytes + sum(
+            vectors.nbytes + ids.nbytes for vectors, ids in zip(self._vectors, self._ids)
+        )
+    
+    def add(self, ids: np.ndarray, vectors: np.ndarray):
+        """Insert vectors under the given ids, replacing any existing ones"""
+        ids = np.asarray(ids, dtype=np.int32)
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dimension))
+        self.remove(ids)
+        if not len(ids):
+            return
+        
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        boundaries = np.flatnonzero(np.diff(assignments[order])) + 1
+        for group in np.split(order, boundaries):
+            self._append(int(assignments[group[0]]), ids[group], vectors[group])
+    
+    def _append(self, list_id: int, ids: np.ndarray, vectors: np.ndarray):
+        """Append rows to one inverted list, growing its capacity geometrically"""
+        size = self._sizes[list_id]
+        needed = size + len(ids)
+        if needed > len(self._ids[list_id]):
+            capacity = max(needed, 2 * len(self._ids[list_id]), 16)
+            grown_vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+            grown_vectors[:size] = self._vectors[list_id][:size]
+            grown_ids = np.zeros(capacity, dtype=np.int32)
+            grown_ids[:size] = self._ids[list_id][:size]
+            self._vectors[list_id], self._ids[list_id] = grown_vectors, grown_ids
+        
+        self._vectors[list_id][size:needed] = vectors
+        self._ids[list_id][size:needed] = ids
+        self._sizes[list_id] = needed
+        for row, vector_id in enumerate(ids.tolist(), start=size):
+            self._locations[vector_id] = (list_id, row)
+    
+    def remove(self, ids: np.ndarray) -> int:
+        """
+        Delete vectors by id
+        
+        Returns:
+            Number of vectors removed (unknown ids are ignored)
+        """
+        removed = 0
+        for vector_id in np.asarray(ids, dtype=np.int64).tolist():
+            location = self._locations.pop(vector_id, None)
+            if location is None:
+                continue
+            list_id, row = location
+            if not self._ids[list_id].flags.writeable:
+                self._vectors[list_id] = self._vectors[list_id].copy()
+                self._ids[list_id] = self._ids[list_id].copy()
+            last = self._sizes[list_id] - 1
+            if row != last:
+                moved_id = int(self._ids[list_id][last])
+                self._vectors[list_id][row] = self._vectors[list_id][last]
+                self._ids[list_id][row] = moved_id
+                self._locations[moved_id] = (list_id, row)
+            self._sizes[list_id] = last
+            removed += 1
+        return removed
+    
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 5,
+        mask: Optional[np.ndarray] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Approximate top ``limit`` (id, cosine similarity) pairs, best first
+        
+        Args:
+            query_vector: Unit-length query embedding
+            limit: Number of results
+            mask: Optional boolean filter indexed by id
+            nprobe: Lists to search (defaults to the index's nprobe)
+        """
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        centroid_scores = self.centroids @ query_vector
+        probes = (
+            np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+            if nprobe < self.nlist else range(self.nlist)
+        )
+        
+        id_parts = []
+        score_parts = []
+        for list_id in probes:
+            size = self._sizes[list_id]
+            if size:
+                id_parts.append(self._ids[list_id][:size])
+                score_parts.append(self._vectors[list_id][:size] @ query_vector)
+        if not id_parts:
+            return []
+        
+        ids = np.concatenate(id_parts)
+        scores = np.concatenate(score_parts)
+        if mask is not None:
+            keep = mask[ids]
+            ids, scores = ids[keep], scores[keep]
+        return top_k(ids, scores, limit)
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means centroids of (a sample of) unit-length vectors
+    
+    Empty clusters are re-seeded with random sample vectors, so exactly
+    ``nlist`` centroids come back even for clumpy data.
+    """
+    rng = np.random.default_rng(seed)
+    if len(vectors) == 0:
+        return normalize_rows(rng.standard_normal((nlist, vectors.shape[1])).astype(np.float32))
+    
+    sample_size = min(len(vectors), nlist * _TRAIN_SAMPLES_PER_LIST)
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=sample_size < nlist)].copy()
+    for _ in range(_TRAIN_ITERATIONS):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=nlist)
+        starts = np.cumsum(counts) - counts
+        empty = counts == 0
+        sums = np.zeros_like(centroids)
+        sums[~empty] = np.add.reduceat(sample[order], starts[~empty], axis=0)
+        sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+        centroids = normalize_rows(sums)
+    
+    logger.debug(f"Trained {nlist} IVF centroids on {sample_size} vectors")
+    return centroids
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Change detection for knowledge documents under KNOWLEDGE_BASE_PATH
+"""
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from pydantic import ValidationError
+
+from ..models.chat_models import KnowledgeEntry
+from .documents import DocumentState, content_hash, iter_document_paths, parse_document
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentChanges(NamedTuple):
+    """Result of one scan of the knowledge directory"""
+    added: List[Dict[str, Any]]  # Entries of new and changed documents
+    removed_ids: List[str]  # Entries of changed and deleted documents that are gone
+    states: Dict[str, Optional[DocumentState]]  # Updated document states (None: deleted)
+    errors: Dict[str, str]  # Documents that could not be parsed; their old entries stay
+    
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed_ids)
+
+
+class KnowledgeRefresher:
+    """
+    Finds the knowledge documents that changed since the last scan
+    
+    A document is re-read only when its mtime or size changed, and
+    re-parsed only when its SHA-256 changed too, so a scan of an untouched
+    directory costs one ``stat`` per file. Scans do not modify the
+    refresher; ``commit`` records a scan once its changes are published.
+    """
+    
+    def __init__(
+        self,
+        root: Path,
+        chunk_size: int = 1500,
+        known_categories: Optional[List[str]] = None,
+        states: Optional[Dict[str, DocumentState]] = None
+    ):
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.known_categories = known_categories or []
+        self.states: Dict[str, DocumentState] = dict(states or {})
+    
+    def scan(self) -> DocumentChanges:
+        """Compare the knowledge directory with the committed document states"""
+        changes = DocumentChanges([], [], {}, {})
+        seen = set()
+        paths = iter_document_paths(self.root) if self.root.is_dir() else iter(())
+        for path in paths:
+            relative_path = path.relative_to(self.root).as_posix()
+            seen.add(relative_path)
+            try:
+                stat = path.stat()
+                previous = self.states.get(relative_path)
+                if previous is not None and (previous.mtime_ns, previous.size) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                
+                data = path.read_bytes()
+                digest = content_hash(data)
+                if previous is not None and previous.sha256 == digest:
+                    changes.states[relative_path] = previous._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                    continue
+                
+                entries = [
+                    {**KnowledgeEntry(**entry).model_dump(mode="json"), "source": relative_path}
+                    for entry in parse_document(relative_path, data, self.chunk_size, self.known_categories)
+                ]
+            except (OSError, ValueError, ValidationError) as e:
+                changes.errors[relative_path] = str(e)
+                logger.warning(f"Skipping knowledge document {relative_path}: {e}")
+                continue
+            
+            entry_ids = tuple(entry["id"] for entry in entries)
+            if previous is not None:
+                changes.removed_ids.extend(set(previous.entry_ids) - set(entry_ids))
+            changes.added.extend(entries)
+            changes.states[relative_path] = DocumentState(stat.st_mtime_ns, stat.st_size, digest, entry_ids)
+        
+        for relative_path in self.states.keys() - seen:
+            changes.removed_ids.extend(self.states[relative_path].entry_ids)
+            changes.states[relative_path] = None
+        return changes
+    
+    def commit(self, changes: DocumentChanges):
+        """Record a scan whose changes have been published"""
+        for relative_path, state in changes.states.items():
+            if state is None:
+                self.states.pop(relative_path, None)
+            else:
+                self.states[relative_path] = state
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Document states, for storing next to an index build"""
+        return {relative_path: state._asdict() for relative_path, state in self.states.items()}
+    
+    @staticmethod
+    def states_from_json(data: Dict[str, Any]) -> Dict[str, DocumentState]:
+        return {
+            relative_path: DocumentState(
+                state["mtime_ns"], state["size"], state["sha256"], tuple(state["entry_ids"])
+            )
+            for relative_path, state in data.items()
+        }
\ No newline at end of file
@@ -0,0 +1,117 @@
+"""
+Versioned LRU cache of knowledge search results
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
+
+# Bookkeeping charged per cached query on top of its serialized results
+ENTRY_OVERHEAD_BYTES = 256
+
+
+class _CachedResults:
+    __slots__ = ("version", "expires_at", "size", "results")
+    
+    def __init__(self, version: int, expires_at: float, size: int, results: List[Dict[str, Any]]):
+        self.version = version
+        self.expires_at = expires_at
+        self.size = size
+        self.results = results
+
+
+class SearchResultCache:
+    """
+    LRU cache of search results with a TTL, an entry limit and a byte budget
+    
+    Every result is tagged with the knowledge index version it was
+    computed from, and a lookup against any other version is a miss that
+    drops the stale result. Publishing a new index therefore invalidates
+    the cache without flushing it; stale results are dropped as they are
+    looked up or reach the LRU end. Cached result lists are shared between
+    callers and must not be modified.
+    """
+    
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 2 ** 20, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Misses on results of an older index version
+        self.expired = 0
+        self.evictions = 0
+        self._results: OrderedDict = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._results)
+    
+    def get(self, key: Hashable, version: int) -> Optional[List[Dict[str, Any]]]:
+        """Results cached for ``key`` at index ``version``, marking them most recently used"""
+        if self.max_entries <= 0:
+            return None
+        
+        cached = self._results.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        if cached.version != version or cached.expires_at <= time.monotonic():
+            if cached.version != version:
+                self.stale += 1
+            else:
+                self.expired += 1
+            self.misses += 1
+            self._remove(key)
+            return None
+        
+        self._results.move_to_end(key)
+        self.hits += 1
+        return cached.results
+    
+    def put(self, key: Hashable, version: int, results: List[Dict[str, Any]]):
+        """Cache results computed at index ``version``, evicting least recently used ones"""
+        if self.max_entries <= 0:
+            return
+        
+        size = ENTRY_OVERHEAD_BYTES + len(json.dumps(results, default=str))
+        if size > self.max_bytes:
+            return
+        if key in self._results:
+            self._remove(key)
+        self._results[key] = _CachedResults(version, time.monotonic() + self.ttl, size, results)
+        self.bytes += size
+        
+        while len(self._results) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self._results.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+    
+    def clear(self):
+        self._results.clear()
+        self.bytes = 0
+    
+    def _remove(self, key: Hashable):
+        self.bytes -= self._results.pop(key).size
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get search result cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._results),
+            "max_size": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "expired": self.expired,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0
+        }
+
+
+def normalize_query(query: str) -> str:
+    """Cache key form of a query: lowercased, whitespace collapsed"""
+    return " ".join(query.lower().split())
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+Per-category knowledge shards: grouping entries and merging shard results
+"""
+
+import heapq
+from itertools import islice
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .inverted_index import FIELDS, CorpusStatistics
+
+# A hit of a sharded search: ((category, doc id within the shard), score)
+ShardHit = Tuple[Tuple[str, int], float]
+
+
+def group_by_category(entries: Sequence[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Entries grouped by category, keeping their order within each group"""
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in entries:
+        groups.setdefault(entry["category"], []).append(entry)
+    return groups
+
+
+def combine_statistics(statistics: Sequence[CorpusStatistics]) -> CorpusStatistics:
+    """
+    BM25F statistics of the union of several shards
+    
+    Shards hold disjoint entries, so document counts and frequencies add
+    up and average field lengths are weighted by each shard's size.
+    """
+    doc_count = sum(shard.doc_count for shard in statistics)
+    field_length_sums = sum(
+        (shard.avg_field_lengths * shard.doc_count for shard in statistics),
+        np.zeros(len(FIELDS), dtype=np.float32)
+    )
+    document_frequencies: Dict[str, int] = {}
+    for shard in statistics:
+        for term, frequency in shard.document_frequencies.items():
+            document_frequencies[term] = document_frequencies.get(term, 0) + frequency
+    return CorpusStatistics(
+        doc_count,
+        np.maximum(field_length_sums / max(doc_count, 1), 1.0),
+        document_frequencies
+    )
+
+
+def merge_top_k(rankings: Dict[str, List[Tuple[int, float]]], limit: int) -> List[ShardHit]:
+    """
+    Best ``limit`` hits of several shards' rankings
+    
+    Each ranking is already sorted best first, so a heap merge stops
+    after ``limit`` hits instead of sorting them all.
+    
+    Args:
+        rankings: (doc id, score) pairs, best first, per shard category
+        limit: Maximum number of hits
+    """
+    merged = heapq.merge(
+        *([((category, doc_id), score) for doc_id, score in hits] for category, hits in rankings.items()),
+        key=lambda hit: -hit[1]
+    )
+    return list(islice(merged, limit))
\ No newline at end of file
@@ -0,0 +1,353 @@
+"""
+Segmented, immutable knowledge index snapshots
+"""
+
+import bisect
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .inverted_index import FIELDS, CorpusStatistics, InvertedIndex, top_k
+from .ivf_index import IVFIndex
+from .snippets import best_window_snippet
+from .tokenizer import tokenize
+from .vector_index import VectorIndex
+
+logger = logging.getLogger(__name__)
+
+
+class Segment:
+    """
+    Entries indexed together: an inverted index, their vectors and a live mask
+    
+    Segments are never modified. Deleting entries produces a new segment
+    sharing the same indexes with a copied ``live`` mask.
+    """
+    
+    __slots__ = ("index", "vectors", "live", "live_count", "_local_ids")
+    
+    def __init__(
+        self,
+        index: InvertedIndex,
+        vectors: Union[VectorIndex, IVFIndex],
+        live: Optional[np.ndarray] = None,
+        local_ids: Optional[Dict[str, int]] = None
+    ):
+        self.index = index
+        self.vectors = vectors
+        self.live = np.ones(len(index), dtype=bool) if live is None else live
+        self.live_count = int(self.live.sum())
+        self._local_ids = local_ids
+    
+    def __len__(self) -> int:
+        return len(self.index)
+    
+    @property
+    def local_ids(self) -> Dict[str, int]:
+        """Entry id -> row, built on first use (it decodes every entry)"""
+        if self._local_ids is None:
+            self._local_ids = {self.index.entries[row].get("id"): row for row in range(len(self.index))}
+        return self._local_ids
+    
+    def without(self, rows: Iterable[int]) -> "Segment":
+        """This segment with the given rows deleted"""
+        live = self.live.copy()
+        live[list(rows)] = False
+        return Segment(self.index, self.vectors, live, self._local_ids)
+    
+    def live_entries(self) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """Live entries and their stored vectors"""
+        rows = np.flatnonzero(self.live)
+        entries = [self.index.entries[row] for row in rows.tolist()]
+        if isinstance(self.vectors, IVFIndex):
+            by_id = {}
+            for ids, list_vectors in self.vectors.lists():
+                for vector_id, vector in zip(ids.tolist(), list_vectors):
+                    by_id[vector_id] = vector
+            vectors = np.array([by_id[row] for row in rows.tolist()], dtype=np.float32)
+        elif self.vectors.quantized:
+            vectors = self.vectors.matrix[rows].astype(np.float32) * self.vectors.scales[rows, None]
+        else:
+            vectors = np.asarray(self.vectors.matrix[rows], dtype=np.float32)
+        return entries, vectors.reshape(len(rows), self.vectors.dimension)
+
+
+class KnowledgeSnapshot:
+    """
+    Immutable view of the knowledge base, searched as one corpus
+    
+    The corpus is a list of segments; doc ids are global, segment ``i``
+    owning ``bases[i]`` up to ``bases[i + 1]``. Changes never touch an
+    existing segment: added entries become a new small segment, and
+    replaced or removed entries are masked out of older ones. The newest,
+    smallest segments are merged once there are more than ``max_segments``,
+    so an update costs time proportional to the changed entries, not the
+    corpus.
+    
+    BM25F uses corpus-wide document frequencies and field lengths, which
+    still count masked entries until their segment is merged, as in
+    Lucene.
+    """
+    
+    def __init__(self, segments: Sequence[Segment], version: int = 1):
+        self.segments = tuple(segments)
+        self.version = version
+        self.bases = [0]
+        for segment in self.segments:
+            self.bases.append(self.bases[-1] + len(segment))
+        self.doc_count = self.bases[-1]
+        
+        field_length_sums = sum(
+            (segment.index.avg_field_lengths * len(segment) for segment in self.segments),
+            np.zeros(len(FIELDS), dtype=np.float32)
+        )
+        self.avg_field_lengths = np.maximum(field_length_sums / max(self.doc_count, 1), 1.0)
+    
+    @classmethod
+    def build(
+        cls,
+        entries: List[Dict[str, Any]],
+        embed: Callable[[List[str]], np.ndarray],
+        vector_index: str = "exact",
+        quantize: bool = False,
+        nlist: int = 0,
+        nprobe: int = 8
+    ) -> "KnowledgeSnapshot":
+        """
+        Snapshot holding a single segment over ``entries``
+        
+        Args:
+            entries: Knowledge entries (inactive ones are skipped)
+            embed: Embeds a batch of entry texts (see entry_text)
+            vector_index: "exact" or "ivf"
+            quantize: Store exact-index vectors as int8
+            nlist: IVF inverted lists (0 picks about sqrt(n))
+            nprobe: IVF lists searched per query
+        """
+        index = InvertedIndex(entries)
+        vectors = build_vector_index(embed_entries(index.entries, embed), vector_index, quantize, nlist, nprobe)
+        return cls([Segment(index, vectors)])
+    
+    def __len__(self) -> int:
+        return sum(segment.live_count for segment in self.segments)
+    
+    def entry(self, doc_id: int) -> Dict[str, Any]:
+        """Entry of a global doc id"""
+        segment_id = bisect.bisect_right(self.bases, doc_id) - 1
+        return self.segments[segment_id].index.entries[doc_id - self.bases[segment_id]]
+    
+    def snippet(
+        self,
+        doc_id: int,
+        content: str,
+        terms: Iterable[str]
+    ) -> Tuple[str, List[Tuple[int, int]], List[str]]:
+        """
+        Best-window snippet of an entry's content for the query terms
+        
+        Returns:
+            The snippet, (start, end) offsets of highlighted terms in it, and
+            the query terms the entry contains in any field
+        """
+        segment_id = bisect.bisect_right(self.bases, doc_id) - 1
+        term_positions = self.segments[segment_id].index.term_positions(doc_id - self.bases[segment_id], terms)
+        snippet, highlights = best_window_snippet(content, term_positions)
+        return snippet, highlights, list(term_positions)
+    
+    def statistics(self, query: str) -> CorpusStatistics:
+        """Corpus-wide BM25F statistics for a query's terms"""
+        return CorpusStatistics(
+            self.doc_count,
+            self.avg_field_lengths,
+            {
+                term: sum(segment.index.document_frequency(term) for segment in self.segments)
+                for term in set(tokenize(query))
+            }
+        )
+    
+    def search_lexical(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        limit: int = 5,
+        statistics: Optional[CorpusStatistics] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top ``limit`` (doc id, BM25F score) pairs, best first
+        
+        Args:
+            statistics: Statistics of a larger corpus this snapshot is part
+                of, so scores compare across snapshots (default: its own)
+        """
+        if not self.segments:
+            return []
+        if statistics is None and len(self.segments) == 1 and self.segments[0].live_count == len(self.segments[0]):
+            return self.segments[0].index.search(query, category, limit)
+        
+        statistics = statistics or self.statistics(query)
+        doc_parts = []
+        score_parts = []
+        for base, segment in zip(self.bases, self.segments):
+            docs, scores = segment.index.score(query, category, statistics)
+            keep = segment.live[docs]
+            doc_parts.append(docs[keep].astype(np.int64) + base)
+            score_parts.append(scores[keep])
+        return top_k(np.concatenate(doc_parts), np.concatenate(score_parts), limit)
+    
+    def search_vectors(
+        self,
+        query_vector: np.ndarray,
+        category: Optional[str] = None,
+        limit: int = 5
+    ) -> List[Tuple[int, float]]:
+        """Top ``limit`` (doc id, cosine similarity) pairs, best first"""
+        hits = []
+        for base, segment in zip(self.bases, self.segments):
+            mask = segment.live
+            if category is not None:
+                category_id = segment.index.category_ids.get(category)
+                if category_id is None:
+                    continue
+                mask = mask & (segment.index.doc_categories == category_id)
+            elif segment.live_count == len(segment):
+                mask = None
+            hits.extend((base + row, score) for row, score in segment.vectors.search(query_vector, limit, mask))
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits[:limit]
+    
+    def locate(self, entry_id: str) -> Optional[Tuple[int, int]]:
+        """(segment, row) of the live entry with this id, newest segment first"""
+        for segment_id in range(len(self.segments) - 1, -1, -1):
+            segment = self.segments[segment_id]
+            row = segment.local_ids.get(entry_id)
+            if row is not None and segment.live[row]:
+                return segment_id, row
+        return None
+    
+    def with_changes(
+        self,
+        added: List[Dict[str, Any]],
+        removed_ids: Iterable[str],
+        embed: Callable[[List[str]], np.ndarray],
+        max_segments: int = 8,
+        vector_index: str = "exact",
+        quantize: bool = False,
+        nlist: int = 0,
+        nprobe: int = 8
+    ) -> "KnowledgeSnapshot":
+        """
+        Snapshot with entries added, replaced or removed
+        
+        New and merged segments get the same kind of vector index as
+        ``build`` makes. IVF segments are filled through ``IVFIndex.add``
+        under the oldest segment's trained centroids; centroids are only
+        retrained when a merge takes in that oldest segment.
+        
+        Args:
+            added: New entries; an entry whose id is already live replaces it
+            removed_ids: Ids of entries to delete
+            embed: Embeds a batch of entry texts (see entry_text)
+            max_segments: Merge the newest segments once there are more
+            vector_index: "exact" or "ivf"
+            quantize: Store exact-index vectors as int8
+            nlist: IVF inverted lists when centroids are trained (0 picks about sqrt(n))
+            nprobe: IVF lists searched per query
+        
+        Returns:
+            The new snapshot, or this one if nothing changed
+        """
+        deleted: Dict[int, List[int]] = {}
+        for entry_id in list(removed_ids) + [entry["id"] for entry in added]:
+            location = self.locate(entry_id)
+            if location is not None:
+                deleted.setdefault(location[0], []).append(location[1])
+        
+        segments = [
+            segment.without(deleted[segment_id]) if segment_id in deleted else segment
+            for segment_id, segment in enumerate(self.segments)
+        ]
+        index = InvertedIndex(added)
+        if not deleted and not len(index):
+            return self
+        
+        options = dict(vector_index=vector_index, quantize=quantize, nlist=nlist, nprobe=nprobe)
+        base_vectors = segments[0].vectors if segments else None
+        centroids = base_vectors.centroids if isinstance(base_vectors, IVFIndex) else None
+        if len(index):
+            vectors = build_vector_index(embed_entries(index.entries, embed), centroids=centroids, **options)
+            segments.append(Segment(index, vectors))
+        segments = [segment for segment in segments if segment.live_count or segment is segments[0]]
+        
+        if len(segments) > max_segments:
+            # Merge the newest segments, taking in older ones while they are no
+            # bigger than the merge so far: segment sizes stay geometric and
+            # each entry is re-indexed O(log n) times however many batches arrive.
+            # The oldest segment joins once deletions or growth shrink it below the
+            # merge, which reclaims its deleted rows.
+            start = len(segments) - 2
+            merged_count = segments[-1].live_count + segments[-2].live_count
+            while start > 0 and segments[start - 1].live_count <= merged_count:
+                start -= 1
+                merged_count += segments[start].live_count
+            merged = merge_segments(segments[start:], centroids=centroids if start else None, **options)
+            segments = segments[:start] + [merged]
+        return KnowledgeSnapshot(segments, self.version + 1)
+
+
+def entry_text(entry: Dict[str, Any]) -> str:
+    """Text embedded for a knowledge entry"""
+    return " ".join([entry.get("title", ""), " ".join(entry.get("tags", [])), entry.get("content", "")])
+
+
+def embed_entries(entries: Sequence[Dict[str, Any]], embed: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+    """(len(entries), dimension) embeddings of entries"""
+    vectors = embed([entry_text(entries[row]) for row in range(len(entries))])
+    return vectors.reshape(len(entries), -1) if len(entries) else vectors
+
+
+def build_vector_index(
+    vectors: np.ndarray,
+    vector_index: str = "exact",
+    quantize: bool = False,
+    nlist: int = 0,
+    nprobe: int = 8,
+    centroids: Optional[np.ndarray] = None
+) -> Union[VectorIndex, IVFIndex]:
+    """
+    Vector index of a segment, its rows being the segment's doc ids
+    
+    Args:
+        vectors: (n, dimension) entry vectors
+        vector_index: "exact" or "ivf"
+        quantize: Store exact-index vectors as int8
+        nlist: IVF inverted lists (0 picks about sqrt(n))
+        nprobe: IVF lists searched per query
+        centroids: Trained IVF centroids to add the vectors under instead
+            of training new ones
+    """
+    if vector_index != "ivf":
+        return VectorIndex(vectors, quantize=quantize)
+    if centroids is None:
+        return IVFIndex.build(vectors, nlist=nlist, nprobe=nprobe)
+    index = IVFIndex(centroids, nprobe)
+    index.add(np.arange(len(vectors)), vectors)
+    return index
+
+
+def merge_segments(segments: Sequence[Segment], **options: Any) -> Segment:
+    """
+    One segment holding the live entries of several, reusing their stored vectors
+    
+    Args:
+        segments: Segments to merge
+        options: Vector index settings, as for build_vector_index
+    """
+    entries: List[Dict[str, Any]] = []
+    vector_parts = []
+    for segment in segments:
+        segment_entries, segment_vectors = segment.live_entries()
+        entries.extend(segment_entries)
+        vector_parts.append(segment_vectors)
+    logger.debug(f"Merged {len(segments)} knowledge segments into one of {len(entries)} entries")
+    return Segment(InvertedIndex(entries), build_vector_index(np.concatenate(vector_parts), **options))
\ No newline at end of file
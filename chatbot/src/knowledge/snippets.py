@@ -0,0 +1,95 @@
+"""
+Best-window snippets of knowledge entries, cut from postings positions
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+SNIPPET_LENGTH = 200
+ELLIPSIS = "..."
+
+_TOKEN = re.compile(r"\w+")
+
+
+def leading_snippet(content: str, length: int = SNIPPET_LENGTH) -> str:
+    """The start of the content, for entries without a matched position"""
+    return content[:length] + ELLIPSIS if len(content) > length else content
+
+
+def best_window_snippet(
+    content: str,
+    term_positions: Dict[str, np.ndarray],
+    length: int = SNIPPET_LENGTH
+) -> Tuple[str, List[Tuple[int, int]]]:
+    """
+    Snippet around the densest window of query terms, and its highlights
+    
+    The window of ``length`` characters is chosen to contain the most
+    distinct query terms, then the most occurrences, then to come first.
+    Only the given positions are examined, never the text around them.
+    
+    Args:
+        content: Entry content
+        term_positions: Content character offsets of each matched query term
+        length: Snippet length, not counting ellipses
+    
+    Returns:
+        The snippet, and (start, end) offsets of the highlighted terms in it
+    """
+    occurrences = sorted(
+        (position, label)
+        for label, positions in enumerate(term_positions.values())
+        for position in positions.tolist()
+    )
+    if not occurrences:
+        return leading_snippet(content, length), []
+    
+    # Two pointers over the occurrences: window i holds those starting
+    # within ``length`` characters of occurrence i (a handful per hit, so
+    # plain Python beats NumPy's per-call overhead here)
+    counts = [0] * len(term_positions)
+    distinct = 0
+    window_end = 0
+    best = (0, 0)
+    first = last = 0
+    for i, (position, label) in enumerate(occurrences):
+        while window_end < len(occurrences) and occurrences[window_end][0] < position + length:
+            end_label = occurrences[window_end][1]
+            distinct += counts[end_label] == 0
+            counts[end_label] += 1
+            window_end += 1
+        if (distinct, window_end - i) > best:
+            best = (distinct, window_end - i)
+            first, last = i, window_end - 1
+        counts[label] -= 1
+        distinct -= counts[label] == 0
+    positions = [position for position, _ in occurrences]
+    
+    # Centre the matched span in the window, then snap the edges to word boundaries
+    first_start = positions[first]
+    last_end = _token_end(content, positions[last])
+    start = max(0, min(first_start - (length - (last_end - first_start)) // 2, len(content) - length, first_start))
+    if start > 0:
+        space = content.find(" ", start, first_start)
+        start = space + 1 if space >= 0 else start
+    end = min(start + length, len(content))
+    if end < len(content):
+        space = content.rfind(" ", last_end, end)
+        end = space if space > 0 else end
+    
+    prefix = ELLIPSIS if start > 0 else ""
+    snippet = prefix + content[start:end] + (ELLIPSIS if end < len(content) else "")
+    shift = len(prefix) - start
+    highlights = []
+    for position in positions[first:last + 1]:
+        token_end = _token_end(content, position)
+        if token_end <= end:
+            highlights.append((position + shift, token_end + shift))
+    return snippet, highlights
+
+
+def _token_end(content: str, position: int) -> int:
+    match = _TOKEN.match(content, position)
+    return match.end() if match else position
\ No newline at end of file
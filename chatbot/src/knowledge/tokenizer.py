@@ -0,0 +1,29 @@
+"""
+Tokenization shared by knowledge indexing and querying
+"""
+
+import re
+from itertools import accumulate
+from typing import List, Tuple
+
+_TOKEN = re.compile(r"\w+")
+_TOKEN_SPLIT = re.compile(r"(\w+)")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased word tokens"""
+    return _TOKEN.findall(text.lower())
+
+
+def tokenize_with_offsets(text: str) -> Tuple[List[str], List[int]]:
+    """Tokens of ``text`` as ``tokenize`` splits them, and their start offsets in ``text``"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        # Splitting on a capturing group alternates separators and tokens, so
+        # the running length of the parts gives every token's start
+        parts = _TOKEN_SPLIT.split(lowered)
+        return parts[1::2], list(accumulate(map(len, parts)))[:-1:2]
+    
+    # Lowercasing changed the text's length (rare, e.g. "İ"): offsets must come from the original
+    matches = list(_TOKEN.finditer(text))
+    return [match.group().lower() for match in matches], [match.start() for match in matches]
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+In-process dense vector index with exact top-k retrieval
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .embedder import normalize_rows
+from .inverted_index import top_k
+
+# Rows dequantized per block when scoring an int8 matrix
+_INT8_BLOCK_ROWS = 16384
+
+
+class VectorIndex:
+    """
+    Immutable matrix of unit-length vectors searched by cosine similarity
+    
+    All vectors live in one contiguous (n, dimension) matrix, so a query
+    is a single matrix-vector product followed by ``argpartition``. With
+    ``quantize=True`` rows are stored as int8 with one float32 scale per
+    row, a quarter of the float32 footprint at a small loss in precision.
+    """
+    
+    def __init__(self, vectors: np.ndarray, quantize: bool = False):
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        self.dimension = vectors.shape[1]
+        self.quantized = quantize
+        if quantize:
+            scales = np.abs(vectors).max(axis=1) / 127.0
+            self.scales = np.where(scales > 0, scales, 1.0).astype(np.float32)
+            self.matrix = np.ascontiguousarray(
+                np.rint(vectors / self.scales[:, None]), dtype=np.int8
+            )
+        else:
+            self.scales = None
+            self.matrix = np.ascontiguousarray(vectors, dtype=np.float32)
+    
+    @classmethod
+    def from_arrays(cls, matrix: np.ndarray, scales: Optional[np.ndarray] = None) -> "VectorIndex":
+        """
+        Wrap a stored matrix (e.g. a memory-mapped one) without copying
+        
+        ``matrix`` holds unit-length float32 rows, or int8 rows when
+        ``scales`` gives their per-row float32 scale.
+        """
+        index = cls.__new__(cls)
+        index.matrix = matrix
+        index.scales = scales
+        index.quantized = scales is not None
+        index.dimension = matrix.shape[1]
+        return index
+    
+    def __len__(self) -> int:
+        return len(self.matrix)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored vectors"""
+        return self.matrix.nbytes + (self.scales.nbytes if self.quantized else 0)
+    
+    def similarities(self, query_vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query to every stored vector"""
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        if not self.quantized:
+            return self.matrix @ query_vector
+        
+        scores = np.empty(len(self.matrix), dtype=np.float32)
+        for start in range(0, len(self.matrix), _INT8_BLOCK_ROWS):
+            block = self.matrix[start:start + _INT8_BLOCK_ROWS]
+            scores[start:start + len(block)] = block.astype(np.float32) @ query_vector
+        return scores * self.scales
+    
+    def search(
+        self,
+        query_vector: np.ndarray,
+        limit: int = 5,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """
+        Top ``limit`` (row, cosine similarity) pairs, best first
+        
+        Args:
+            query_vector: Unit-length query embedding
+            limit: Number of results
+            mask: Optional boolean row filter
+        """
+        scores = self.similarities(query_vector)
+        if mask is not None:
+            rows = np.flatnonzero(mask).astype(np.int32)
+            return top_k(rows, scores[rows], limit)
+        return top_k(np.arange(len(scores), dtype=np.int32), scores, limit)
\ No newline at end of file
@@ -3,24 +3,26 @@ ElevateHub Chatbot Backend API
 FastAPI-based chatbot service for onboarding assistance
 """
 
-from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal, AsyncIterator, Awaitable, Tuple
 import asyncio
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
 
-from .config import settings
+from .config import settings, INTENT_KNOWLEDGE_CATEGORIES
 from .handlers.message_handler import MessageHandler
 from .handlers.context_handler import ContextHandler
 from .nlp.intent_classifier import IntentClassifier
 from .nlp.response_generator import ResponseGenerator
+from .nlp.text_analysis import AnalyzedMessage
 from .integrations.knowledge_base import KnowledgeBase
-from .models.chat_models import ChatMessage, ChatSession, ChatResponse
+from .models.chat_models import ChatMessage, ChatSession, ChatResponse, time_ordered_id
 from .database.session_manager import SessionManager
 
 # Configure logging
@@ -64,6 +66,15 @@ class QuickActionRequest(BaseModel):
     session_id: Optional[str] = None
     user_id: str
 
+class BatchClassifyRequest(BaseModel):
+    messages: List[str]
+    contexts: Optional[List[Optional[Dict[str, Any]]]] = None
+
+class IntentCategoryUpdate(BaseModel):
+    keywords: List[str]
+    examples: List[str] = []
+    description: Optional[str] = None
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
@@ -71,6 +82,10 @@ async def startup_event():
     
     # Initialize knowledge base
     await knowledge_base.initialize()
+    knowledge_base.start_refresher()
+    
+    # Start session expiry and message persistence (when PERSIST_MESSAGES is set)
+    await session_manager.start()
     
     # Initialize ML models
     await intent_classifier.load_models()
@@ -83,6 +98,8 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     logger.info("Shutting down ElevateHub Chatbot API...")
     await session_manager.cleanup()
+    await session_manager.close()
+    await knowledge_base.close()
 
 @app.get("/")
 async def root():
@@ -104,6 +121,10 @@ async def health_check():
             "knowledge_base": "active",
             "database": "active"
         },
+        "caches": {
+            "intent_classification": intent_classifier.get_cache_stats(),
+            "knowledge_search": knowledge_base.result_cache.get_cache_stats()
+        },
         "timestamp": datetime.utcnow().isoformat()
     }
 
@@ -113,54 +134,74 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
     Main chat endpoint for processing user messages
     """
     try:
-        # Create or get session
+        started = time.perf_counter()
+        timings: Dict[str, float] = {}
         session_id = request.session_id or str(uuid.uuid4())
-        session = await session_manager.get_or_create_session(
-            session_id, request.user_id
+        
+        # Process message through NLP pipeline (text analyzed once per request)
+        analyzed_message = AnalyzedMessage(request.message)
+        classification = asyncio.ensure_future(
+            _timed("classification", _classify(analyzed_message), timings)
+        )
+        
+        async def retrieve_knowledge():
+            intent, _ = await classification
+            return await _timed("retrieval", _retrieve_knowledge(request.message, intent), timings)
+        
+        # Independent stages run concurrently; retrieval needs the intent's category
+        session, history, (intent, confidence), knowledge, context = await asyncio.gather(
+            _timed("session", session_manager.get_or_create_session(session_id, request.user_id), timings),
+            _timed("history", session_manager.get_recent_messages(session_id, settings.CONTEXT_WINDOW_SIZE), timings),
+            classification,
+            retrieve_knowledge(),
+            _timed("context", context_handler.build_context(session_id, request.context or {}), timings)
         )
         
-        # Create chat message
+        # Create the user message (stored together with the reply)
         user_message = ChatMessage(
-            id=str(uuid.uuid4()),
+            id=time_ordered_id(),
             content=request.message,
             sender="user",
             timestamp=datetime.utcnow(),
             session_id=session_id
         )
         
-        # Store user message
-        await session_manager.add_message(session_id, user_message)
-        
-        # Process message through NLP pipeline
-        intent = await intent_classifier.classify_intent(request.message)
-        context = await context_handler.build_context(
-            session_id, request.context or {}
-        )
-        
         # Generate response
-        bot_response_content = await response_generator.generate_response(
-            message=request.message,
-            intent=intent,
-            context=context,
-            session_history=session.messages
+        bot_response_content, suggestions = await asyncio.gather(
+            _timed(
+                "generation",
+                response_generator.generate_response(
+                    message=request.message,
+                    intent=intent,
+                    context=context,
+                    session_history=[*history, user_message],
+                    knowledge=knowledge
+                ),
+                timings
+            ),
+            _get_suggestions(intent, context)
         )
+        response_time_ms = (time.perf_counter() - started) * 1000
         
         # Create bot message
         bot_message = ChatMessage(
-            id=str(uuid.uuid4()),
+            id=time_ordered_id(),
             content=bot_response_content,
             sender="bot",
             timestamp=datetime.utcnow(),
             session_id=session_id,
             metadata={
                 "intent": intent,
-                "confidence": intent_classifier.last_confidence,
-                "response_type": "generated"
+                "confidence": confidence,
+                "response_type": "generated",
+                "knowledge_sources": [result["entry"]["id"] for result in knowledge],
+                "stage_timings_ms": timings,
+                "response_time_ms": round(response_time_ms, 2)
             }
         )
         
-        # Store bot message
-        await session_manager.add_message(session_id, bot_message)
+        # Store both turns in one session store write
+        await session_manager.add_messages(session_id, [user_message, bot_message], session.user_id)
         
         # Update session context in background
         background_tasks.add_task(
@@ -175,8 +216,9 @@ async def chat(request: ChatRequest, background_tasks: BackgroundTasks):
             message=bot_message,
             session_id=session_id,
             intent=intent,
-            suggestions=await _get_suggestions(intent, context),
-            confidence=intent_classifier.last_confidence
+            suggestions=suggestions,
+            confidence=confidence,
+            response_time_ms=round(response_time_ms)
         )
         
     except Exception as e:
@@ -224,18 +266,46 @@ async def get_user_sessions(user_id: str, limit: int = 10):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/chat/sessions/{session_id}/history")
-async def get_session_history(session_id: str):
+async def get_session_history(
+    session_id: str,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    stream: bool = False
+):
     """
-    Get message history for a session
+    Get a page of a session's message history, oldest message first
+    
+    Without cursors the page holds the latest ``limit`` messages
+    (HISTORY_PAGE_SIZE by default). Pass the first message's id as
+    ``before`` for the previous page, or the last one's as ``after`` for
+    the next; ``has_older``/``has_newer`` tell whether there is one.
+    
+    With ``stream=true`` the messages in range (all of them unless
+    ``limit`` is given) are streamed as NDJSON, one message per line,
+    reading the session a chunk at a time.
     """
     try:
         session = await session_manager.get_session(session_id)
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
+        try:
+            start, stop, total = await session_manager.locate_messages(
+                session_id, before, after, limit if limit is not None or stream else settings.HISTORY_PAGE_SIZE
+            )
+        except ValueError:
+            raise HTTPException(status_code=404, detail="Message not found in session")
+        
+        if stream:
+            return StreamingResponse(_stream_messages(session_id, start, stop), media_type="application/x-ndjson")
+        
         return {
             "session_id": session_id,
-            "messages": session.messages,
+            "messages": await session_manager.get_messages(session_id, start, stop),
+            "has_older": start > 0,
+            "has_newer": stop < total,
+            "total": total,
             "created_at": session.created_at,
             "updated_at": session.updated_at
         }
@@ -263,17 +333,49 @@ async def delete_session(session_id: str, user_id: str):
         raise HTTPException(status_code=500, detail="Internal server error")
 
 @app.get("/knowledge/search")
-async def search_knowledge(query: str, category: Optional[str] = None, limit: int = 5):
+async def search_knowledge(
+    query: str,
+    category: Optional[str] = None,
+    limit: int = 5,
+    mode: Optional[Literal["semantic", "lexical", "hybrid"]] = None
+):
     """
     Search knowledge base
+    
+    mode selects BM25F keyword ranking (lexical), embedding similarity
+    (semantic) or both fused (hybrid); defaults to KNOWLEDGE_SEARCH_MODE.
     """
     try:
-        results = await knowledge_base.search(query, category, limit)
+        results = await knowledge_base.search(query, category, limit, mode)
         return {"results": results}
     except Exception as e:
         logger.error(f"Error searching knowledge base: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+@app.post("/knowledge/bulk")
+async def bulk_import_knowledge(request: Request, batch_size: Optional[int] = Query(None, ge=1, le=10000)):
+    """
+    Import an NDJSON body of KnowledgeEntry records (one per line)
+    
+    The body is read as it arrives and indexed in batches; entries are
+    searchable once their batch is committed. Invalid lines are reported
+    with their batch and do not stop the import. Committed batches are
+    saved under KNOWLEDGE_BASE_PATH/imports, from where other workers pick
+    them up on their next refresh and a restart indexes them again.
+    """
+    try:
+        batches = []
+        async for batch in knowledge_base.import_entries(request.stream(), batch_size):
+            batches.append(batch)
+        return {
+            "indexed": sum(batch["indexed"] for batch in batches),
+            "failed": sum(batch["failed"] for batch in batches),
+            "batches": batches
+        }
+    except Exception as e:
+        logger.error(f"Error importing knowledge entries: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/intents")
 async def get_supported_intents():
     """
@@ -283,6 +385,64 @@ async def get_supported_intents():
         "intents": intent_classifier.get_supported_intents()
     }
 
+@app.post("/intents/classify/batch")
+async def classify_intents_batch(request: BatchClassifyRequest):
+    """
+    Classify many messages in one call (e.g. re-labelling historical messages)
+    """
+    if request.contexts is not None and len(request.contexts) != len(request.messages):
+        raise HTTPException(status_code=400, detail="contexts must have one entry per message")
+    
+    try:
+        results = await asyncio.to_thread(
+            intent_classifier.classify_batch, request.messages, request.contexts
+        )
+        return {"results": results}
+    except Exception as e:
+        logger.error(f"Error classifying message batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.put("/admin/intents/{intent}")
+async def update_intent_category(intent: str, request: IntentCategoryUpdate):
+    """
+    Add or replace an intent's vocabulary without restarting the service
+    """
+    try:
+        version = await intent_classifier.update_intent_category(
+            intent, request.keywords, request.examples, request.description
+        )
+        return {
+            "intent": intent,
+            "vocabulary_version": version,
+            "updated_at": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error updating intent category: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+@app.post("/admin/knowledge/shards/{category}/rebuild")
+async def rebuild_knowledge_shard(category: str):
+    """
+    Re-index one category's knowledge shard from its live entries
+    
+    Searches keep using the current shard until the rebuilt one is
+    published, and other categories' shards keep updating meanwhile.
+    """
+    if category not in knowledge_base.shards:
+        raise HTTPException(status_code=404, detail=f"No knowledge shard for category {category}")
+    
+    try:
+        version = await knowledge_base.rebuild_shard(category)
+        return {
+            "category": category,
+            "entries": len(knowledge_base.shards[category]),
+            "version": version,
+            "rebuilt_at": datetime.utcnow().isoformat()
+        }
+    except Exception as e:
+        logger.error(f"Error rebuilding knowledge shard: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+
 @app.get("/quick-actions")
 async def get_quick_actions():
     """
@@ -329,6 +489,40 @@ async def get_quick_actions():
         ]
     }
 
+async def _timed(stage: str, awaitable: Awaitable, timings: Dict[str, float]):
+    """Await ``awaitable``, recording its duration under ``stage`` in milliseconds"""
+    started = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round((time.perf_counter() - started) * 1000, 2)
+
+async def _classify(message: AnalyzedMessage) -> Tuple[str, float]:
+    """Intent and confidence, read together so concurrent requests cannot interleave"""
+    intent = await intent_classifier.classify_intent(message)
+    return intent, intent_classifier.last_confidence
+
+async def _retrieve_knowledge(message: str, intent: str) -> List[Dict[str, Any]]:
+    """Top knowledge entries for the message in the intent's category (empty on failure)"""
+    if settings.RESPONSE_KNOWLEDGE_RESULTS <= 0:
+        return []
+    try:
+        return await knowledge_base.search(
+            message, INTENT_KNOWLEDGE_CATEGORIES.get(intent), settings.RESPONSE_KNOWLEDGE_RESULTS
+        )
+    except Exception as e:
+        logger.warning(f"Knowledge retrieval failed, answering without it: {str(e)}")
+        return []
+
+async def _stream_messages(session_id: str, start: int, stop: int) -> AsyncIterator[str]:
+    """NDJSON lines of a session's messages, a chunk of lines at a time"""
+    try:
+        async for messages in session_manager.iter_messages(session_id, start, stop):
+            yield "".join(message.model_dump_json() + "\n" for message in messages)
+    except Exception as e:
+        # The response has started; the client sees a truncated stream
+        logger.error(f"Error streaming session history: {str(e)}")
+
 async def _get_suggestions(intent: str, context: Dict[str, Any]) -> List[str]:
     """Generate follow-up suggestions based on intent and context"""
     suggestions_map = {
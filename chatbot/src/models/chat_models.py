@@ -3,14 +3,47 @@ Pydantic models for chat functionality
 """
 
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Literal
+from typing import Optional, List, Dict, Any, Literal, Tuple
 from pydantic import BaseModel, Field
+import os
+import time
 import uuid
 
+_last_id_ms = 0
+_last_id_counter = 0
+
+
+def time_ordered_id() -> str:
+    """
+    Time-ordered UUIDv7-style id (RFC 9562)
+    
+    48-bit Unix milliseconds followed by 74 bits seeded randomly each
+    millisecond and incremented within it, so ids made later by this
+    process sort after earlier ones.
+    """
+    global _last_id_ms, _last_id_counter
+    ms = time.time_ns() // 1000000
+    if ms > _last_id_ms:
+        _last_id_ms = ms
+        _last_id_counter = int.from_bytes(os.urandom(10), "big") >> 7  # 73 bits leave room to count up
+    else:
+        _last_id_counter += 1
+        if _last_id_counter >> 74:
+            _last_id_ms += 1
+            _last_id_counter = 0
+    value = (
+        _last_id_ms << 80
+        | 0x7 << 76
+        | (_last_id_counter >> 62) << 64
+        | 0b10 << 62
+        | _last_id_counter & ((1 << 62) - 1)
+    )
+    return str(uuid.UUID(int=value))
+
 
 class ChatMessage(BaseModel):
     """Individual chat message model"""
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=time_ordered_id)  # Sorts in creation order within a session
     content: str = Field(..., min_length=1, max_length=5000)
     sender: Literal["user", "bot"] = Field(...)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -102,6 +135,7 @@ class SearchResult(BaseModel):
     relevance_score: float = Field(..., ge=0.0, le=1.0)
     snippet: str = Field(...)
     highlighted_terms: List[str] = Field(default_factory=list)
+    highlights: List[Tuple[int, int]] = Field(default_factory=list)  # (start, end) in snippet
 
 
 class TeamMember(BaseModel):
@@ -0,0 +1,130 @@
+"""
+Fixed-capacity classification history with incremental statistics
+"""
+
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+
+class ClassificationHistory:
+    """
+    Ring buffer of recent intent classifications
+    
+    Entries live in preallocated arrays (intent ids, float32 confidences,
+    epoch timestamps), so appending never allocates per entry and the oldest
+    entry is overwritten in O(1) once the buffer is full.
+    
+    Per-intent count, sum, min and max over the buffered entries are kept
+    up to date on every append. Count and sum are adjusted when an entry is
+    overwritten; min and max use monotonic queues of entry sequence numbers,
+    the sliding-window minimum/maximum technique. Statistics queries
+    therefore cost O(#intents) regardless of capacity.
+    """
+    
+    def __init__(self, capacity: int = 100):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        
+        self.capacity = capacity
+        self._intent_ids = np.zeros(capacity, dtype=np.int32)
+        self._confidences = np.zeros(capacity, dtype=np.float32)
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._appended = 0  # Sequence number of the next entry
+        
+        self.intents: List[str] = []
+        self._intent_lookup: Dict[str, int] = {}
+        self._counts: List[int] = []
+        self._sums: List[float] = []
+        self._min_queues: List[Deque[int]] = []
+        self._max_queues: List[Deque[int]] = []
+    
+    def __len__(self) -> int:
+        return min(self._appended, self.capacity)
+    
+    def _get_intent_id(self, intent: str) -> int:
+        """Intern an intent name"""
+        intent_id = self._intent_lookup.get(intent)
+        if intent_id is None:
+            intent_id = len(self.intents)
+            self._intent_lookup[intent] = intent_id
+            self.intents.append(intent)
+            self._counts.append(0)
+            self._sums.append(0.0)
+            self._min_queues.append(deque())
+            self._max_queues.append(deque())
+        return intent_id
+    
+    def _confidence_at(self, sequence: int) -> float:
+        return float(self._confidences[sequence % self.capacity])
+    
+    def append(self, intent: str, confidence: float, timestamp: Optional[float] = None):
+        """Record a classification, overwriting the oldest one when full"""
+        sequence = self._appended
+        slot = sequence % self.capacity
+        if sequence >= self.capacity:
+            self._evict(slot, sequence - self.capacity)
+        
+        intent_id = self._get_intent_id(intent)
+        self._intent_ids[slot] = intent_id
+        self._confidences[slot] = confidence
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        stored = float(self._confidences[slot])
+        
+        self._counts[intent_id] += 1
+        self._sums[intent_id] += stored
+        
+        min_queue = self._min_queues[intent_id]
+        while min_queue and self._confidence_at(min_queue[-1]) >= stored:
+            min_queue.pop()
+        min_queue.append(sequence)
+        
+        max_queue = self._max_queues[intent_id]
+        while max_queue and self._confidence_at(max_queue[-1]) <= stored:
+            max_queue.pop()
+        max_queue.append(sequence)
+        
+        self._appended += 1
+    
+    def _evict(self, slot: int, sequence: int):
+        """Remove the entry in ``slot`` from the running statistics"""
+        intent_id = int(self._intent_ids[slot])
+        self._counts[intent_id] -= 1
+        self._sums[intent_id] -= float(self._confidences[slot])
+        if self._counts[intent_id] == 0:
+            self._sums[intent_id] = 0.0
+        
+        for queue in (self._min_queues[intent_id], self._max_queues[intent_id]):
+            if queue and queue[0] == sequence:
+                queue.popleft()
+    
+    def recent(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """Get the most recent classifications, oldest first"""
+        limit = max(0, min(limit, len(self)))
+        entries = []
+        for sequence in range(self._appended - limit, self._appended):
+            slot = sequence % self.capacity
+            entries.append({
+                "intent": self.intents[self._intent_ids[slot]],
+                "confidence": float(self._confidences[slot]),
+                "timestamp": datetime.utcfromtimestamp(self._timestamps[slot]).isoformat()
+            })
+        return entries
+    
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get per-intent confidence statistics over the buffered entries"""
+        stats = {}
+        for intent_id, intent in enumerate(self.intents):
+            count = self._counts[intent_id]
+            if not count:
+                continue
+            stats[intent] = {
+                "avg_confidence": self._sums[intent_id] / count,
+                "min_confidence": self._confidence_at(self._min_queues[intent_id][0]),
+                "max_confidence": self._confidence_at(self._max_queues[intent_id][0]),
+                "count": count
+            }
+        return stats
\ No newline at end of file
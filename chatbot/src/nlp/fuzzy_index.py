@@ -0,0 +1,167 @@
+"""
+Typo-tolerant keyword lookup with a symmetric-delete index
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TOKEN = re.compile(r"\w+")
+
+# Memoized corrections kept per index before the memo is reset
+_CORRECTION_MEMO_SIZE = 10000
+
+
+def _deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings obtained by removing up to ``max_distance`` characters"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {
+            variant[:index] + variant[index + 1:]
+            for variant in frontier
+            for index in range(len(variant))
+        }
+        variants |= frontier
+    return variants
+
+
+def _edit_distance(source: str, target: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance, or ``max_distance + 1`` when larger
+    
+    Insertions, deletions, substitutions and adjacent transpositions each
+    count as one edit, so "salesfroce" is one edit from "salesforce". Only
+    the diagonal band of width ``2 * max_distance + 1`` is computed.
+    """
+    if abs(len(source) - len(target)) > max_distance:
+        return max_distance + 1
+    if max_distance == 1:
+        return _edit_distance_within_one(source, target)
+    
+    limit = max_distance + 1
+    previous_previous: List[int] = []
+    previous = [min(col, limit) for col in range(len(target) + 1)]
+    for row in range(1, len(source) + 1):
+        current = [limit] * (len(target) + 1)
+        if row <= max_distance:
+            current[0] = row
+        for col in range(max(1, row - max_distance), min(len(target), row + max_distance) + 1):
+            cost = 0 if source[row - 1] == target[col - 1] else 1
+            distance = min(previous[col] + 1, current[col - 1] + 1, previous[col - 1] + cost)
+            if (
+                row > 1 and col > 1
+                and source[row - 1] == target[col - 2]
+                and source[row - 2] == target[col - 1]
+            ):
+                distance = min(distance, previous_previous[col - 2] + 1)
+            current[col] = min(distance, limit)
+        if min(current) >= limit:
+            return limit
+        previous_previous, previous = previous, current
+    
+    return previous[-1]
+
+
+def _edit_distance_within_one(source: str, target: str) -> int:
+    """``_edit_distance`` for ``max_distance=1`` using slice comparisons"""
+    if source == target:
+        return 0
+    if len(source) < len(target):
+        source, target = target, source
+    
+    index = 0
+    while index < len(target) and source[index] == target[index]:
+        index += 1
+    
+    if len(source) != len(target):
+        return 1 if source[index + 1:] == target[index:] else 2
+    if source[index + 1:] == target[index + 1:]:
+        return 1
+    if (
+        index + 1 < len(source)
+        and source[index] == target[index + 1]
+        and source[index + 1] == target[index]
+        and source[index + 2:] == target[index + 2:]
+    ):
+        return 1
+    return 2
+
+
+class SymmetricDeleteIndex:
+    """
+    SymSpell-style dictionary of keywords and their delete variants
+    
+    Every dictionary word is stored under each string reachable by deleting
+    up to ``max_distance`` of its characters. A misspelled token generates
+    its own delete variants and looks each one up, so a correction costs a
+    fixed number of hash lookups per token no matter how large the
+    vocabulary is. Candidates are confirmed with a bounded edit distance.
+    """
+    
+    def __init__(self, words: Iterable[str], max_distance: int = 1, min_length: int = 5):
+        self.max_distance = max_distance
+        self.min_length = min_length
+        
+        # Multi-word keywords are indexed word by word
+        self.words: List[str] = []
+        known: Set[str] = set()
+        for word in words:
+            for token in _TOKEN.findall(word.lower()):
+                if token not in known:
+                    known.add(token)
+                    self.words.append(token)
+        self._known = frozenset(known)
+        
+        # Delete variant -> ids of the words it was derived from
+        deletes: Dict[str, List[int]] = {}
+        for word_id, word in enumerate(self.words):
+            if len(word) + max_distance < min_length:
+                continue  # Too short to be within reach of a correctable token
+            for variant in _deletes(word, max_distance):
+                deletes.setdefault(variant, []).append(word_id)
+        self._deletes: Dict[str, Tuple[int, ...]] = {
+            variant: tuple(word_ids) for variant, word_ids in deletes.items()
+        }
+        
+        self._memo: Dict[str, Optional[str]] = {}
+    
+    def correct(self, token: str) -> Optional[str]:
+        """
+        Get the dictionary word a lowercased token is a misspelling of
+        
+        Returns:
+            The closest word (earliest in the dictionary on ties), or None
+            when the token is known, too short or not close to any word
+        """
+        if len(token) < self.min_length or token in self._known:
+            return None
+        
+        if token in self._memo:
+            return self._memo[token]
+        
+        candidates = {
+            word_id
+            for variant in _deletes(token, self.max_distance)
+            for word_id in self._deletes.get(variant, ())
+        }
+        best = min(
+            ((_edit_distance(token, self.words[word_id], self.max_distance), word_id)
+             for word_id in candidates),
+            default=None
+        )
+        correction = (
+            self.words[best[1]] if best is not None and best[0] <= self.max_distance else None
+        )
+        
+        if len(self._memo) >= _CORRECTION_MEMO_SIZE:
+            self._memo.clear()
+        self._memo[token] = correction
+        return correction
+    
+    def correct_text(self, text: str) -> str:
+        """Replace misspelled keywords in lowercased text with their dictionary form"""
+        return _TOKEN.sub(self._correct_match, text)
+    
+    def _correct_match(self, match: re.Match) -> str:
+        token = match.group(0)
+        return self.correct(token) or token
\ No newline at end of file
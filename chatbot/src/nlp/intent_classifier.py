@@ -2,12 +2,20 @@
 Intent Classification for understanding user queries
 """
 
+import asyncio
 import logging
-import re
-from typing import Dict, List, Tuple, Optional
-from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple, Optional, Union
 
-from ..config import INTENT_CATEGORIES
+import numpy as np
+
+from ..config import settings, INTENT_CATEGORIES, TECH_KEYWORDS, TECH_KEYWORD_ALIASES
+from .classification_history import ClassificationHistory
+from .entity_extractor import EntityExtractor
+from .intent_model import IntentModel
+from .intent_vocabulary import IntentVocabulary
+from .keyword_matcher import KeywordMatcher
+from .text_analysis import AnalyzedMessage, normalize_text
 
 logger = logging.getLogger(__name__)
 
@@ -15,75 +23,92 @@ logger = logging.getLogger(__name__)
 class IntentClassifier:
     """Classifies user messages into intents"""
     
-    def __init__(self):
-        self.intent_categories = INTENT_CATEGORIES
+    def __init__(self, cache_size: int = settings.INTENT_CACHE_SIZE):
         self.last_confidence = 0.0
-        self.classification_history = []
+        self.classification_history = ClassificationHistory(settings.INTENT_HISTORY_SIZE)
+        
+        # LRU cache of classification results, keyed by normalized message and context
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        
+        # Trained model, used when it is at least this confident
+        self.intent_model: Optional[IntentModel] = None
+        self.model_confidence_threshold = settings.INTENT_CONFIDENCE_THRESHOLD
+        
+        # Current vocabulary snapshot; replaced as a whole, never mutated
+        self._vocabulary = IntentVocabulary(
+            INTENT_CATEGORIES,
+            extra_keywords=TECH_KEYWORDS,
+            fuzzy_max_distance=(
+                settings.INTENT_FUZZY_MAX_DISTANCE if settings.INTENT_FUZZY_MATCHING else 0
+            ),
+            fuzzy_min_length=settings.INTENT_FUZZY_MIN_LENGTH
+        )
+        self._reload_lock = asyncio.Lock()
         
-        # Pre-compile regex patterns for better performance
-        self._compile_patterns()
+        self.entity_extractor = EntityExtractor(TECH_KEYWORDS, TECH_KEYWORD_ALIASES)
     
-    def _compile_patterns(self):
-        """Compile regex patterns for each intent"""
-        self.intent_patterns = {}
-        
-        for intent, config in self.intent_categories.items():
-            patterns = []
-            for keyword in config.get("keywords", []):
-                # Create flexible patterns that match word boundaries
-                pattern = rf"\b{re.escape(keyword)}\w*\b"
-                patterns.append(pattern)
-            
-            self.intent_patterns[intent] = [
-                re.compile(pattern, re.IGNORECASE) for pattern in patterns
-            ]
+    @property
+    def intent_categories(self) -> Dict[str, Dict]:
+        """Intent categories of the current vocabulary (read-only)"""
+        return self._vocabulary.categories
+    
+    @property
+    def keyword_matcher(self) -> KeywordMatcher:
+        """Keyword matcher of the current vocabulary"""
+        return self._vocabulary.keyword_matcher
+    
+    @property
+    def vocabulary_version(self) -> int:
+        """Version of the current vocabulary"""
+        return self._vocabulary.version
+    
+    def _publish_vocabulary(self, vocabulary: IntentVocabulary):
+        """Make ``vocabulary`` current with a single reference swap"""
+        self._vocabulary = vocabulary
+        
+        # Cache keys carry the vocabulary version, so stale entries can never
+        # hit; clearing just frees their slots
+        self._cache.clear()
     
-    async def classify_intent(self, message: str, context: Optional[Dict] = None) -> str:
+    async def classify_intent(
+        self, 
+        message: Union[str, AnalyzedMessage], 
+        context: Optional[Dict] = None
+    ) -> str:
         """
         Classify user message intent
         
         Args:
-            message: User message text
+            message: User message text, or the request's AnalyzedMessage
             context: Optional context information
             
         Returns:
             Intent name
         """
         try:
-            # Clean message
-            cleaned_message = self._preprocess_message(message)
+            # Clean message (analyzed once per request)
+            cleaned_message = AnalyzedMessage.of(message).normalized
             
-            # Calculate scores for each intent
-            intent_scores = {}
+            # Score against one snapshot even if a reload publishes meanwhile
+            vocabulary = self._vocabulary
             
-            for intent in self.intent_categories.keys():
-                score = await self._calculate_intent_score(
-                    cleaned_message, intent, context
+            cache_key = self._get_cache_key(cleaned_message, context, vocabulary.version)
+            cached = self._cache_lookup(cache_key)
+            if cached is not None:
+                best_intent, confidence = cached
+            else:
+                best_intent, confidence = self._classify_cleaned(
+                    cleaned_message, context, vocabulary
                 )
-                intent_scores[intent] = score
-            
-            # Find best matching intent
-            best_intent, confidence = self._get_best_intent(intent_scores)
-            
-            # Apply confidence threshold
-            if confidence < 0.3:  # Low confidence threshold
-                best_intent = "general_help"
-                confidence = 0.5
+                self._cache_store(cache_key, (best_intent, confidence))
             
             self.last_confidence = confidence
             
-            # Store classification history
-            self.classification_history.append({
-                "message": message,
-                "intent": best_intent,
-                "confidence": confidence,
-                "scores": intent_scores,
-                "timestamp": datetime.utcnow().isoformat()
-            })
-            
-            # Keep only last 100 classifications
-            if len(self.classification_history) > 100:
-                self.classification_history.pop(0)
+            # Store classification history (oldest entries are overwritten)
+            self.classification_history.append(best_intent, confidence)
             
             logger.info(f"Classified intent: {best_intent} (confidence: {confidence:.2f})")
             return best_intent
@@ -93,21 +118,236 @@ class IntentClassifier:
             self.last_confidence = 0.1
             return "general_help"
     
-    async def _calculate_intent_score(
+    def _classify_cleaned(
+        self, 
+        cleaned_message: str, 
+        context: Optional[Dict] = None, 
+        vocabulary: Optional[IntentVocabulary] = None
+    ) -> Tuple[str, float]:
+        """Classify a preprocessed message into (intent, confidence)"""
+        # Trained model first, keyword matching when it is unsure
+        if self.intent_model is not None:
+            intent, probability = self.intent_model.predict(cleaned_message)
+            if probability >= self.model_confidence_threshold:
+                return intent, probability
+        
+        vocabulary = vocabulary or self._vocabulary
+        matcher = vocabulary.keyword_matcher
+        
+        # Score all intents in a single scan of the (typo-corrected) message
+        intent_scores = self._score_intents(
+            vocabulary.correct_typos(cleaned_message), context, matcher
+        )
+        
+        # Find best matching intent
+        best_intent, confidence = self._get_best_intent(intent_scores, len(matcher.intents))
+        
+        # Apply confidence threshold
+        if confidence < 0.3:  # Low confidence threshold
+            best_intent = "general_help"
+            confidence = 0.5
+        
+        return best_intent, confidence
+    
+    def _get_cache_key(
+        self, 
+        cleaned_message: str, 
+        context: Optional[Dict], 
+        vocabulary_version: int = 0
+    ) -> Optional[Tuple]:
+        """
+        Build the cache key for a classification
+        
+        The context is reduced to the fields ``_calculate_context_score``
+        reads. Returns None when the context cannot be fingerprinted, in
+        which case the result is not cached.
+        """
+        if not context:
+            return (vocabulary_version, cleaned_message, None)
+        
+        source_action = (
+            context.get("action_id", "") if context.get("source") == "quick_action" else None
+        )
+        try:
+            key = (
+                vocabulary_version,
+                cleaned_message,
+                context.get("onboarding_phase", 0) < 6,
+                bool(context.get("current_projects", [])),
+                frozenset(context.get("recent_intents", [])),
+                source_action
+            )
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
+    def _cache_lookup(self, key: Optional[Tuple]) -> Optional[Tuple[str, float]]:
+        """Get a cached classification and mark it most recently used"""
+        if key is None or self.cache_size <= 0:
+            return None
+        
+        cached = self._cache.get(key)
+        if cached is None:
+            self.cache_misses += 1
+            return None
+        
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        return cached
+    
+    def _cache_store(self, key: Optional[Tuple], result: Tuple[str, float]):
+        """Cache a classification, evicting the least recently used entry"""
+        if key is None or self.cache_size <= 0:
+            return
+        
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get classification cache statistics"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "size": len(self._cache),
+            "max_size": self.cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_ratio": self.cache_hits / lookups if lookups else 0.0
+        }
+    
+    def classify_batch(
+        self, 
+        messages: List[str], 
+        contexts: Optional[List[Optional[Dict]]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Classify many messages at once
+        
+        Every intent score, the best intent and its confidence are computed
+        with array operations over a sparse message x keyword incidence
+        matrix. Results equal those of ``classify_intent`` message by message;
+        ``last_confidence`` and the classification history are left untouched.
+        
+        Args:
+            messages: User message texts
+            contexts: Optional context per message (same length as messages)
+            
+        Returns:
+            One {"intent", "confidence"} dict per message
+        """
+        if contexts is None:
+            contexts = [None] * len(messages)
+        if len(contexts) != len(messages):
+            raise ValueError("contexts must have one entry per message")
+        if not messages:
+            return []
+        
+        vocabulary = self._vocabulary
+        matcher = vocabulary.keyword_matcher
+        if not matcher.intents:
+            return [{"intent": "general_help", "confidence": 0.5} for _ in messages]
+        
+        cleaned_messages = [self._preprocess_message(message) for message in messages]
+        keyword_scores, pattern_scores = matcher.match_batch(
+            [vocabulary.correct_typos(message) for message in cleaned_messages]
+        )
+        
+        # Context scores are sparse: only a handful of intents per context
+        context_scores = np.zeros_like(keyword_scores)
+        for row, context in enumerate(contexts):
+            for intent in self._get_context_intents(context, matcher):
+                if intent in matcher.intent_index:
+                    context_scores[row, matcher.intent_index[intent]] = (
+                        self._calculate_context_score(intent, context)
+                    )
+        
+        # Same weighting as _calculate_intent_score
+        scores = keyword_scores * 0.6 + pattern_scores * 0.3
+        scores = np.minimum(scores + context_scores * 0.1, 1.0)
+        
+        # Same margin-based confidence as _get_best_intent
+        rows = np.arange(len(messages))
+        best = scores.argmax(axis=1)
+        best_scores = scores[rows, best]
+        intent_count = len(matcher.intents)
+        if intent_count > 1:
+            second_scores = np.partition(scores, intent_count - 2, axis=1)[:, intent_count - 2]
+            confidences = np.minimum(best_scores + (best_scores - second_scores) * 0.5, 1.0)
+        else:
+            confidences = best_scores
+        
+        # Apply confidence threshold
+        low_confidence = confidences < 0.3
+        confidences = np.where(low_confidence, 0.5, confidences)
+        
+        results = [
+            {
+                "intent": "general_help" if low else matcher.intents[intent_id],
+                "confidence": float(confidence)
+            }
+            for intent_id, confidence, low in zip(
+                best.tolist(), confidences.tolist(), low_confidence.tolist()
+            )
+        ]
+        
+        # Confident model predictions take precedence, as in _classify_cleaned
+        if self.intent_model is not None:
+            model_best, probabilities = self.intent_model.predict_batch(cleaned_messages)
+            for row in np.flatnonzero(probabilities >= self.model_confidence_threshold).tolist():
+                results[row] = {
+                    "intent": self.intent_model.intents[int(model_best[row])],
+                    "confidence": float(probabilities[row])
+                }
+        
+        return results
+    
+    def _score_intents(
         self, 
         message: str, 
+        context: Optional[Dict] = None, 
+        matcher: Optional[KeywordMatcher] = None
+    ) -> Dict[str, float]:
+        """
+        Score intents with a keyword hit or a context signal
+        
+        Intents left out of the result score zero. The result is ordered
+        like ``intent_categories`` so ties resolve the same way as a full
+        per-intent scan.
+        """
+        matcher = matcher or self._vocabulary.keyword_matcher
+        keyword_hits = matcher.match(message)
+        
+        candidates = set(keyword_hits) | self._get_context_intents(context, matcher)
+        intent_index = matcher.intent_index
+        
+        intent_scores = {}
+        for intent in sorted(
+            (intent for intent in candidates if intent in intent_index),
+            key=intent_index.__getitem__
+        ):
+            keyword_score, pattern_score = keyword_hits.get(intent, (0.0, 0.0))
+            intent_scores[intent] = self._calculate_intent_score(
+                intent, keyword_score, pattern_score, context
+            )
+        
+        return intent_scores
+    
+    def _calculate_intent_score(
+        self, 
         intent: str, 
+        keyword_score: float, 
+        pattern_score: float, 
         context: Optional[Dict] = None
     ) -> float:
         """Calculate score for a specific intent"""
         score = 0.0
         
         # Keyword matching score
-        keyword_score = self._calculate_keyword_score(message, intent)
         score += keyword_score * 0.6  # 60% weight
         
         # Pattern matching score
-        pattern_score = self._calculate_pattern_score(message, intent)
         score += pattern_score * 0.3  # 30% weight
         
         # Context score
@@ -116,43 +356,26 @@ class IntentClassifier:
         
         return min(score, 1.0)  # Cap at 1.0
     
-    def _calculate_keyword_score(self, message: str, intent: str) -> float:
-        """Calculate keyword matching score"""
-        if intent not in self.intent_categories:
-            return 0.0
-        
-        keywords = self.intent_categories[intent].get("keywords", [])
-        if not keywords:
-            return 0.0
-        
-        message_lower = message.lower()
-        total_weight = 0.0
-        matched_weight = 0.0
-        
-        for keyword in keywords:
-            weight = len(keyword)  # Longer keywords get more weight
-            total_weight += weight
-            
-            if keyword.lower() in message_lower:
-                matched_weight += weight
-        
-        return matched_weight / total_weight if total_weight > 0 else 0.0
-    
-    def _calculate_pattern_score(self, message: str, intent: str) -> float:
-        """Calculate pattern matching score"""
-        if intent not in self.intent_patterns:
-            return 0.0
+    def _get_context_intents(
+        self, 
+        context: Optional[Dict], 
+        matcher: Optional[KeywordMatcher] = None
+    ) -> set:
+        """Get intents that can receive a non-zero context score"""
+        if not context:
+            return set()
         
-        patterns = self.intent_patterns[intent]
-        if not patterns:
-            return 0.0
+        intents = {"onboarding", "project"}
+        intents.update(
+            intent for intent in context.get("recent_intents", []) if isinstance(intent, str)
+        )
         
-        matches = 0
-        for pattern in patterns:
-            if pattern.search(message):
-                matches += 1
+        if context.get("source") == "quick_action":
+            action_id = context.get("action_id", "")
+            matcher = matcher or self._vocabulary.keyword_matcher
+            intents.update(intent for intent in matcher.intents if intent in action_id)
         
-        return matches / len(patterns)
+        return intents
     
     def _calculate_context_score(self, intent: str, context: Optional[Dict]) -> float:
         """Calculate context-based score"""
@@ -185,23 +408,41 @@ class IntentClassifier:
         
         return min(score, 1.0)
     
-    def _get_best_intent(self, intent_scores: Dict[str, float]) -> Tuple[str, float]:
-        """Get the best matching intent and confidence"""
+    def _get_best_intent(
+        self, 
+        intent_scores: Dict[str, float], 
+        intent_count: Optional[int] = None
+    ) -> Tuple[str, float]:
+        """
+        Get the best matching intent and confidence
+        
+        Args:
+            intent_scores: Scores in intent order; missing intents score zero
+            intent_count: Total number of intents (defaults to len(intent_scores))
+        """
         if not intent_scores:
             return "general_help", 0.1
         
-        # Sort by score
-        sorted_intents = sorted(
-            intent_scores.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )
+        if intent_count is None:
+            intent_count = len(intent_scores)
+        
+        # Track the top two scores; the first intent wins ties
+        best_intent, best_score = None, 0.0
+        second_score = None
+        for intent, score in intent_scores.items():
+            if best_intent is None or score > best_score:
+                if best_intent is not None:
+                    second_score = best_score
+                best_intent, best_score = intent, score
+            elif second_score is None or score > second_score:
+                second_score = score
         
-        best_intent, best_score = sorted_intents[0]
+        # Intents without hits are zero-scored runners-up
+        if len(intent_scores) < intent_count and second_score is None:
+            second_score = 0.0
         
         # Calculate confidence based on score difference
-        if len(sorted_intents) > 1:
-            second_score = sorted_intents[1][1]
+        if second_score is not None:
             score_difference = best_score - second_score
             confidence = min(best_score + score_difference * 0.5, 1.0)
         else:
@@ -211,36 +452,7 @@ class IntentClassifier:
     
     def _preprocess_message(self, message: str) -> str:
         """Preprocess message for classification"""
-        # Convert to lowercase
-        processed = message.lower()
-        
-        # Remove extra whitespace
-        processed = " ".join(processed.split())
-        
-        # Remove punctuation but keep important chars
-        processed = re.sub(r'[^\w\s\-\']', ' ', processed)
-        
-        # Handle common contractions
-        contractions = {
-            "can't": "cannot",
-            "won't": "will not",
-            "i'm": "i am",
-            "i've": "i have",
-            "i'll": "i will",
-            "don't": "do not",
-            "doesn't": "does not",
-            "didn't": "did not",
-            "haven't": "have not",
-            "hasn't": "has not",
-            "shouldn't": "should not",
-            "wouldn't": "would not",
-            "couldn't": "could not"
-        }
-        
-        for contraction, expansion in contractions.items():
-            processed = processed.replace(contraction, expansion)
-        
-        return processed.strip()
+        return normalize_text(" ".join(message.lower().split()))
     
     def get_supported_intents(self) -> List[Dict[str, str]]:
         """Get list of supported intents with descriptions"""
@@ -255,103 +467,85 @@ class IntentClassifier:
     
     def get_classification_history(self, limit: int = 10) -> List[Dict]:
         """Get recent classification history"""
-        return self.classification_history[-limit:]
+        return self.classification_history.recent(limit)
     
-    def get_intent_confidence_stats(self) -> Dict[str, float]:
+    def get_intent_confidence_stats(self) -> Dict[str, Dict[str, float]]:
         """Get confidence statistics for recent classifications"""
-        if not self.classification_history:
-            return {}
-        
-        recent_classifications = self.classification_history[-50:]  # Last 50
-        
-        intent_confidences = {}
-        for classification in recent_classifications:
-            intent = classification["intent"]
-            confidence = classification["confidence"]
-            
-            if intent not in intent_confidences:
-                intent_confidences[intent] = []
-            intent_confidences[intent].append(confidence)
-        
-        # Calculate average confidence per intent
-        stats = {}
-        for intent, confidences in intent_confidences.items():
-            stats[intent] = {
-                "avg_confidence": sum(confidences) / len(confidences),
-                "min_confidence": min(confidences),
-                "max_confidence": max(confidences),
-                "count": len(confidences)
-            }
-        
-        return stats
+        return self.classification_history.stats()
     
     async def load_models(self):
-        """Load ML models (placeholder for future implementation)"""
+        """Load the trained intent model exported to INTENT_MODEL_PATH, if any"""
         logger.info("Loading intent classification models...")
-        # In the future, load pre-trained models here
-        logger.info("Intent classifier ready")
-    
-    def update_intent_category(self, intent: str, keywords: List[str], examples: List[str]):
-        """Update or add new intent category"""
-        if intent not in self.intent_categories:
-            self.intent_categories[intent] = {}
         
-        self.intent_categories[intent].update({
-            "keywords": keywords,
-            "examples": examples,
-            "description": f"Custom intent: {intent}"
-        })
-        
-        # Recompile patterns
-        self._compile_patterns()
+        model_path = settings.INTENT_MODEL_PATH
+        if IntentModel.exists(model_path):
+            try:
+                self.intent_model = IntentModel(model_path)
+                self._cache.clear()
+                logger.info(
+                    f"Loaded intent model from {model_path} "
+                    f"({len(self.intent_model.intents)} intents, "
+                    f"{len(self.intent_model.vocabulary)} terms)"
+                )
+            except Exception as e:
+                logger.error(f"Error loading intent model: {str(e)}")
+        else:
+            logger.info(f"No intent model at {model_path}, using keyword matching")
         
-        logger.info(f"Updated intent category: {intent}")
+        logger.info("Intent classifier ready")
     
-    def analyze_message_entities(self, message: str) -> Dict[str, List[str]]:
-        """Extract entities from message (simplified implementation)"""
-        entities = {
-            "dates": [],
-            "numbers": [],
-            "emails": [],
-            "urls": [],
-            "technologies": [],
-            "people": []
-        }
-        
-        # Date patterns
-        date_patterns = [
-            r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-            r'\b\d{4}[/-]\d{1,2}[/-]\d{1,2}\b',
-            r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2},?\s+\d{4}\b'
-        ]
-        
-        for pattern in date_patterns:
-            matches = re.findall(pattern, message, re.IGNORECASE)
-            entities["dates"].extend(matches)
-        
-        # Number patterns
-        number_pattern = r'\b\d+(?:\.\d+)?(?:%|percent|hours?|days?|weeks?|months?|years?)?\b'
-        entities["numbers"] = re.findall(number_pattern, message, re.IGNORECASE)
+    async def update_intent_category(
+        self, 
+        intent: str, 
+        keywords: List[str], 
+        examples: List[str], 
+        description: Optional[str] = None
+    ) -> int:
+        """
+        Update or add new intent category
         
-        # Email patterns
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        entities["emails"] = re.findall(email_pattern, message)
+        The new vocabulary is compiled in a worker thread and published with
+        one reference swap, so the event loop keeps serving while it builds
+        and classifications already running finish on the old vocabulary.
+        Concurrent updates are applied one after another.
         
-        # URL patterns
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        entities["urls"] = re.findall(url_pattern, message)
+        Returns:
+            Version of the published vocabulary
+        """
+        async with self._reload_lock:
+            vocabulary = await asyncio.to_thread(
+                self._vocabulary.with_category,
+                intent,
+                {
+                    "keywords": list(keywords),
+                    "examples": list(examples),
+                    "description": description or f"Custom intent: {intent}"
+                }
+            )
+            self._publish_vocabulary(vocabulary)
+        
+        logger.info(f"Updated intent category: {intent} (vocabulary v{vocabulary.version})")
+        return vocabulary.version
+    
+    def analyze_message_entities(self, message: Union[str, AnalyzedMessage]) -> Dict[str, List[str]]:
+        """
+        Extract dates, numbers, emails, URLs and technologies from a message
         
-        # Technology keywords
-        tech_keywords = [
-            "python", "javascript", "typescript", "react", "node.js", "sql",
-            "postgres", "mongodb", "redis", "docker", "kubernetes", "aws",
-            "azure", "git", "github", "jira", "salesforce", "api", "rest",
-            "graphql", "json", "xml", "html", "css", "tailwind", "bootstrap"
-        ]
+        Entities are found in a single scan and do not overlap; technologies
+        match whole words only.
+        """
+        analyzed = AnalyzedMessage.of(message)
+        entities = self.entity_extractor.extract(analyzed.text)
         
-        message_lower = message.lower()
-        for tech in tech_keywords:
-            if tech.lower() in message_lower:
-                entities["technologies"].append(tech)
+        # Misspelled technologies are only found in the typo-corrected text
+        vocabulary = self._vocabulary
+        if vocabulary.fuzzy_index is not None:
+            entities["technologies"] = self.entity_extractor.find_technologies(
+                vocabulary.correct_typos(analyzed.lowered)
+            )
         
-        return entities 
\ No newline at end of file
+        return entities
+    
+    def analyze_entities_batch(self, messages: List[str]) -> List[Dict[str, List[str]]]:
+        """Extract entities from many messages at once (e.g. offline log mining)"""
+        return self.entity_extractor.extract_batch(messages)
\ No newline at end of file
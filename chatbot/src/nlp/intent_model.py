@@ -0,0 +1,108 @@
+"""
+Trained intent model loaded from INTENT_MODEL_PATH
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import List, Tuple
+
+import numpy as np
+
+SUPPORTED_FORMAT_VERSION = 1
+
+MODEL_FILES = ("meta.json", "vocabulary.txt", "idf.npy", "weights.npy", "bias.npy")
+
+
+class IntentModel:
+    """
+    TF-IDF + linear intent model exported by ml-service's train_intent_model
+    
+    Weight and IDF arrays are memory-mapped, so loading is cheap and
+    several workers share one copy through the page cache. Scoring a
+    message is a single sparse-dot against the weight rows of its terms;
+    no ML framework is needed at serving time.
+    """
+    
+    def __init__(self, path: str):
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as handle:
+            meta = json.load(handle)
+        
+        if meta.get("format_version") != SUPPORTED_FORMAT_VERSION:
+            raise ValueError(
+                f"Unsupported intent model format {meta.get('format_version')} in {path}"
+            )
+        
+        self.intents: List[str] = meta["intents"]
+        self.metrics = meta.get("metrics", {})
+        
+        features = meta["features"]
+        self.token_pattern = re.compile(features["token_pattern"])
+        self.ngram_range = tuple(features["ngram_range"])
+        
+        with open(os.path.join(path, "vocabulary.txt"), encoding="utf-8") as handle:
+            self.vocabulary = {
+                term: index for index, term in enumerate(handle.read().splitlines())
+            }
+        
+        # Plain ndarray views over the mappings skip np.memmap's per-slice overhead
+        self.idf = np.asarray(np.load(os.path.join(path, "idf.npy"), mmap_mode="r"))
+        self.weights = np.asarray(np.load(os.path.join(path, "weights.npy"), mmap_mode="r"))
+        self.bias = np.load(os.path.join(path, "bias.npy")).astype(np.float64)
+        
+        if self.weights.shape != (len(self.vocabulary), len(self.intents)):
+            raise ValueError(f"Intent model weights do not match vocabulary in {path}")
+    
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Check whether a complete model was exported to ``path``"""
+        return all(os.path.isfile(os.path.join(path, name)) for name in MODEL_FILES)
+    
+    def _vectorize(self, text: str) -> Tuple[List[int], np.ndarray]:
+        """Sublinear TF-IDF vector of normalized text as (term ids, values)"""
+        tokens = self.token_pattern.findall(text)
+        low, high = self.ngram_range
+        counts = Counter()
+        for size in range(low, high + 1):
+            for start in range(len(tokens) - size + 1):
+                term_id = self.vocabulary.get(" ".join(tokens[start:start + size]))
+                if term_id is not None:
+                    counts[term_id] += 1
+        
+        term_ids = list(counts)
+        values = np.fromiter(
+            (1.0 + math.log(count) for count in counts.values()), dtype=np.float64, count=len(term_ids)
+        ) * self.idf[term_ids]
+        norm = math.sqrt(values.dot(values))
+        if norm > 0:
+            values /= norm
+        return term_ids, values
+    
+    def _probabilities(self, text: str) -> np.ndarray:
+        """Intent probabilities for normalized text: one sparse-dot with the weights"""
+        term_ids, values = self._vectorize(text)
+        logits = values @ self.weights[term_ids] + self.bias
+        logits -= logits.max()
+        probabilities = np.exp(logits)
+        return probabilities / probabilities.sum()
+    
+    def predict_batch(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Predict intents for normalized texts
+        
+        Returns:
+            Best intent index and its probability per text
+        """
+        probabilities = np.array([self._probabilities(text) for text in texts]).reshape(
+            len(texts), len(self.intents)
+        )
+        best = probabilities.argmax(axis=1)
+        return best, probabilities[np.arange(len(texts)), best]
+    
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Predict the intent of normalized text and its probability"""
+        probabilities = self._probabilities(text)
+        best = int(probabilities.argmax())
+        return self.intents[best], float(probabilities[best])
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Immutable intent vocabulary snapshots for lock-free hot reload
+"""
+
+import copy
+from typing import Dict, List, Optional
+
+from .fuzzy_index import SymmetricDeleteIndex
+from .keyword_matcher import KeywordMatcher
+
+
+class IntentVocabulary:
+    """
+    Intent categories and the keyword matcher compiled from them
+    
+    A vocabulary is never modified after construction. Updates build a new
+    one (off the event loop) and the classifier swaps a single reference to
+    publish it, so a classification that already holds a vocabulary keeps
+    scoring against it until it finishes.
+    
+    Attributes:
+        version: Monotonically increasing version, starting at 1
+        categories: Deep copy of the intent categories
+        keyword_matcher: Single-pass matcher over ``categories``
+        extra_keywords: Keywords typo-corrected besides the intent keywords
+        fuzzy_index: Typo corrector over all keywords, None when disabled
+    """
+    
+    __slots__ = ("version", "categories", "keyword_matcher", "extra_keywords", "fuzzy_index")
+    
+    def __init__(
+        self,
+        categories: Dict[str, Dict],
+        version: int = 1,
+        extra_keywords: Optional[List[str]] = None,
+        fuzzy_max_distance: int = 0,
+        fuzzy_min_length: int = 5
+    ):
+        self.version = version
+        self.categories: Dict[str, Dict] = copy.deepcopy(categories)
+        self.keyword_matcher = KeywordMatcher(self.categories)
+        self.extra_keywords: List[str] = list(extra_keywords or [])
+        
+        self.fuzzy_index: Optional[SymmetricDeleteIndex] = None
+        if fuzzy_max_distance > 0:
+            self.fuzzy_index = SymmetricDeleteIndex(
+                self.keyword_matcher.keywords + self.extra_keywords,
+                max_distance=fuzzy_max_distance,
+                min_length=fuzzy_min_length
+            )
+    
+    def with_category(self, intent: str, config: Dict) -> "IntentVocabulary":
+        """Build the next version with ``intent`` added or replaced"""
+        categories = dict(self.categories)
+        categories[intent] = {**categories.get(intent, {}), **config}
+        return IntentVocabulary(
+            categories,
+            self.version + 1,
+            extra_keywords=self.extra_keywords,
+            fuzzy_max_distance=self.fuzzy_index.max_distance if self.fuzzy_index else 0,
+            fuzzy_min_length=self.fuzzy_index.min_length if self.fuzzy_index else 5
+        )
+    
+    def correct_typos(self, text: str) -> str:
+        """Replace misspelled keywords in lowercased text (no-op when fuzzy matching is off)"""
+        if self.fuzzy_index is None:
+            return text
+        return self.fuzzy_index.correct_text(text)
\ No newline at end of file
@@ -0,0 +1,264 @@
+"""
+Single-pass keyword matcher for intent classification
+"""
+
+import re
+from typing import Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def _is_word_char(char: str) -> bool:
+    """Check a single character against the regex ``\\w`` class"""
+    return _WORD_CHAR.match(char) is not None
+
+
+def build_trie_pattern(words: Iterable[str]) -> str:
+    """
+    Build a regex alternation shaped like a trie of the given words
+    
+    Every branch point starts with a distinct character, so matching costs
+    one step per character of the match regardless of how many words the
+    trie holds. Optional suffixes are greedy, so the longest word starting
+    at a position wins.
+    """
+    trie: Dict[str, Dict] = {}
+    for word in words:
+        if not word:
+            continue
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    return _trie_to_pattern(trie)
+
+
+def _trie_to_pattern(node: Dict[str, Dict]) -> str:
+    """Render one trie node (and its children) as a regex fragment"""
+    branches = [
+        re.escape(char) + _trie_to_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ""
+    
+    if len(branches) == 1 and "" not in node:
+        return branches[0]
+    
+    pattern = "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        pattern += "?"
+    return pattern
+
+
+class KeywordMatcher:
+    """
+    Matches the keywords of every intent against a message in one scan
+    
+    The keywords of all intents are compiled into a single trie-shaped
+    lookahead regex that reports every keyword occurrence, overlapping ones
+    included. Each occurrence yields both signals the classifier uses: a
+    plain substring hit and a ``\\bkeyword\\w*\\b`` word-prefix hit.
+    """
+    
+    def __init__(self, intent_categories: Dict[str, Dict]):
+        self.intents: List[str] = list(intent_categories.keys())
+        self.intent_index: Dict[str, int] = {
+            intent: index for index, intent in enumerate(self.intents)
+        }
+        
+        # Per-intent denominators of the keyword and pattern scores
+        self.keyword_totals: List[float] = [0.0] * len(self.intents)
+        self.pattern_counts: List[int] = [0] * len(self.intents)
+        
+        # Unique lowercased keywords and the intents that list them
+        self.keywords: List[str] = []
+        self.postings: List[List[Tuple[int, float]]] = []
+        self._blank_keywords: Dict[int, int] = {}
+        
+        keyword_ids: Dict[str, int] = {}
+        for intent_id, config in enumerate(intent_categories.values()):
+            for keyword in config.get("keywords", []):
+                weight = len(keyword)  # Longer keywords get more weight
+                self.keyword_totals[intent_id] += weight
+                self.pattern_counts[intent_id] += 1
+                
+                if not keyword:
+                    self._blank_keywords[intent_id] = self._blank_keywords.get(intent_id, 0) + 1
+                    continue
+                
+                keyword_lower = keyword.lower()
+                if keyword_lower not in keyword_ids:
+                    keyword_ids[keyword_lower] = len(self.keywords)
+                    self.keywords.append(keyword_lower)
+                    self.postings.append([])
+                self.postings[keyword_ids[keyword_lower]].append((intent_id, float(weight)))
+        
+        # Keywords that occur at the same position as a longer keyword
+        self._prefix_chains: Dict[str, List[int]] = {
+            keyword: [
+                keyword_ids[keyword[:end]]
+                for end in range(1, len(keyword) + 1)
+                if keyword[:end] in keyword_ids
+            ]
+            for keyword in self.keywords
+        }
+        self._word_edges = [
+            (_is_word_char(keyword[0]), _is_word_char(keyword[-1]))
+            for keyword in self.keywords
+        ]
+        
+        self._pattern = (
+            re.compile(f"(?=({build_trie_pattern(self.keywords)}))")
+            if self.keywords else None
+        )
+        
+        # Keyword -> (intent, weight) postings in CSR form for batch scoring
+        self._slot_offsets = np.zeros(len(self.keywords) + 1, dtype=np.int64)
+        np.cumsum([len(slots) for slots in self.postings], out=self._slot_offsets[1:])
+        self._slot_intents = np.array(
+            [intent_id for slots in self.postings for intent_id, _ in slots], dtype=np.int64
+        )
+        self._slot_weights = np.array(
+            [weight for slots in self.postings for _, weight in slots], dtype=np.float64
+        )
+    
+    def find_keywords(self, text: str) -> Tuple[Set[int], Set[int]]:
+        """
+        Find keyword occurrences in lowercased text
+        
+        Returns:
+            Ids of keywords found as substrings and ids of keywords found
+            as ``\\bkeyword\\w*\\b`` word prefixes
+        """
+        found: Set[int] = set()
+        prefixed: Set[int] = set()
+        if self._pattern is None:
+            return found, prefixed
+        
+        text_length = len(text)
+        for match in self._pattern.finditer(text):
+            start = match.start()
+            before_is_word = start > 0 and _is_word_char(text[start - 1])
+            
+            for keyword_id in self._prefix_chains[match.group(1)]:
+                found.add(keyword_id)
+                if keyword_id in prefixed:
+                    continue
+                
+                starts_with_word, ends_with_word = self._word_edges[keyword_id]
+                if before_is_word == starts_with_word:
+                    continue
+                end = start + len(self.keywords[keyword_id])
+                if ends_with_word or (end < text_length and _is_word_char(text[end])):
+                    prefixed.add(keyword_id)
+        
+        return found, prefixed
+    
+    def match(self, text: str) -> Dict[str, Tuple[float, float]]:
+        """
+        Score lowercased text against every intent vocabulary
+        
+        Returns:
+            Mapping of intent name to (keyword score, pattern score) for
+            intents with at least one hit; all other intents score zero
+        """
+        found, prefixed = self.find_keywords(text)
+        
+        matched_weights: Dict[int, float] = {}
+        for keyword_id in found:
+            for intent_id, weight in self.postings[keyword_id]:
+                matched_weights[intent_id] = matched_weights.get(intent_id, 0.0) + weight
+        
+        pattern_hits: Dict[int, int] = {}
+        for keyword_id in prefixed:
+            for intent_id, _ in self.postings[keyword_id]:
+                pattern_hits[intent_id] = pattern_hits.get(intent_id, 0) + 1
+        
+        # An empty keyword compiles to \b\w*\b, which matches any word character
+        if self._blank_keywords and _WORD_CHAR.search(text):
+            for intent_id, count in self._blank_keywords.items():
+                pattern_hits[intent_id] = pattern_hits.get(intent_id, 0) + count
+        
+        scores = {}
+        for intent_id in sorted(matched_weights.keys() | pattern_hits.keys()):
+            total_weight = self.keyword_totals[intent_id]
+            keyword_score = (
+                matched_weights.get(intent_id, 0.0) / total_weight
+                if total_weight > 0 else 0.0
+            )
+            pattern_score = pattern_hits.get(intent_id, 0) / self.pattern_counts[intent_id]
+            scores[self.intents[intent_id]] = (keyword_score, pattern_score)
+        
+        return scores
+    
+    def match_batch(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score many lowercased texts against every intent vocabulary
+        
+        Keyword hits are collected into sparse text x keyword incidence
+        matrices, which are multiplied with the keyword x intent postings.
+        
+        Returns:
+            Keyword scores and pattern scores, each of shape
+            (len(texts), len(intents)); values equal those of ``match``
+        """
+        found_rows: List[int] = []
+        found_ids: List[int] = []
+        prefixed_rows: List[int] = []
+        prefixed_ids: List[int] = []
+        for row, text in enumerate(texts):
+            found, prefixed = self.find_keywords(text)
+            found_rows.extend([row] * len(found))
+            found_ids.extend(found)
+            prefixed_rows.extend([row] * len(prefixed))
+            prefixed_ids.extend(prefixed)
+        
+        shape = (len(texts), len(self.intents))
+        matched_weights = self._multiply_postings(found_rows, found_ids, shape, weighted=True)
+        pattern_hits = self._multiply_postings(prefixed_rows, prefixed_ids, shape, weighted=False)
+        
+        # An empty keyword compiles to \b\w*\b, which matches any word character
+        if self._blank_keywords:
+            has_word = np.array([_WORD_CHAR.search(text) is not None for text in texts])
+            for intent_id, count in self._blank_keywords.items():
+                pattern_hits[has_word, intent_id] += count
+        
+        keyword_totals = np.array(self.keyword_totals, dtype=np.float64)
+        pattern_counts = np.array(self.pattern_counts, dtype=np.float64)
+        keyword_scores = np.divide(
+            matched_weights, keyword_totals,
+            out=np.zeros(shape), where=keyword_totals > 0
+        )
+        pattern_scores = np.divide(
+            pattern_hits, pattern_counts,
+            out=np.zeros(shape), where=pattern_counts > 0
+        )
+        return keyword_scores, pattern_scores
+    
+    def _multiply_postings(
+        self,
+        rows: List[int],
+        keyword_ids: List[int],
+        shape: Tuple[int, int],
+        weighted: bool
+    ) -> np.ndarray:
+        """Multiply a sparse (row, keyword) incidence matrix with the keyword postings"""
+        rows = np.asarray(rows, dtype=np.int64)
+        keyword_ids = np.asarray(keyword_ids, dtype=np.int64)
+        
+        # Expand every (row, keyword) hit into one entry per posting slot
+        starts = self._slot_offsets[keyword_ids]
+        counts = self._slot_offsets[keyword_ids + 1] - starts
+        slot_rows = np.repeat(rows, counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        slots = np.repeat(starts, counts) + within
+        
+        cells = slot_rows * shape[1] + self._slot_intents[slots]
+        weights = self._slot_weights[slots] if weighted else None
+        totals = np.bincount(cells, weights=weights, minlength=shape[0] * shape[1])
+        return totals.astype(np.float64).reshape(shape)
\ No newline at end of file
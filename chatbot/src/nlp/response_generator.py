@@ -26,9 +26,19 @@ class ResponseGenerator:
         message: str, 
         intent: str, 
         context: Dict[str, Any],
-        session_history: List = None
+        session_history: List = None,
+        knowledge: Optional[List[Dict[str, Any]]] = None
     ) -> str:
-        """Generate contextual response"""
+        """
+        Generate contextual response
+        
+        Args:
+            message: User message text
+            intent: Classified intent
+            context: Conversation context
+            session_history: The session's last CONTEXT_WINDOW_SIZE messages, then this one
+            knowledge: Knowledge base search results for the message, best first
+        """
         
         # Simple template-based responses for now
         templates = {
@@ -81,4 +91,10 @@ class ResponseGenerator:
         elif intent == "project":
             response += " You're currently working on the Insurance Digital Platform project."
         
+        # Ground the answer in the retrieved knowledge entries
+        if knowledge:
+            response += "\n\nHere's what I found in the knowledge base:"
+            for result in knowledge:
+                response += f"\n- {result['entry']['title']}: {result['snippet']}"
+        
         return response 
\ No newline at end of file
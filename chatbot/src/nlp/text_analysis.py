@@ -0,0 +1,77 @@
+"""
+Shared per-request text analysis for the NLP pipeline
+"""
+
+import re
+from typing import List, Optional, Union
+
+# Common contractions expanded before intent classification
+CONTRACTIONS = {
+    "can't": "cannot",
+    "won't": "will not",
+    "i'm": "i am",
+    "i've": "i have",
+    "i'll": "i will",
+    "don't": "do not",
+    "doesn't": "does not",
+    "didn't": "did not",
+    "haven't": "have not",
+    "hasn't": "has not",
+    "shouldn't": "should not",
+    "wouldn't": "would not",
+    "couldn't": "could not"
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s\-\']")
+# Same alternation as ml-service's text_features, so training and serving normalize alike
+_CONTRACTION = re.compile("|".join(re.escape(contraction) for contraction in CONTRACTIONS))
+_TOKEN = re.compile(r"\w+")
+
+
+def normalize_text(lowered: str) -> str:
+    """
+    Strip punctuation and expand contractions in lowercased text
+    
+    Contractions are expanded in one left-to-right regex pass; every
+    contraction contains an apostrophe, so text without one skips it.
+    """
+    processed = _PUNCTUATION.sub(" ", lowered)
+    if "'" in processed:
+        processed = _CONTRACTION.sub(lambda match: CONTRACTIONS[match.group(0)], processed)
+    return processed.strip()
+
+
+class AnalyzedMessage:
+    """
+    A message analyzed once per request and shared by every NLP stage
+    
+    Attributes:
+        text: Original message text
+        words: Whitespace-separated words of the original text
+        cleaned: Words joined by single spaces
+        lowered: Lowercased ``cleaned``
+        normalized: Classifier form of the text: lowercased, punctuation
+            stripped and contractions expanded
+        tokens: Word tokens of ``normalized`` (computed on first access)
+    """
+    
+    __slots__ = ("text", "words", "cleaned", "lowered", "normalized", "_tokens")
+    
+    def __init__(self, text: str):
+        self.text = text
+        self.words: List[str] = text.split()
+        self.cleaned = " ".join(self.words)
+        self.lowered = self.cleaned.lower()
+        self.normalized = normalize_text(self.lowered)
+        self._tokens: Optional[List[str]] = None
+    
+    @property
+    def tokens(self) -> List[str]:
+        if self._tokens is None:
+            self._tokens = _TOKEN.findall(self.normalized)
+        return self._tokens
+    
+    @classmethod
+    def of(cls, message: Union[str, "AnalyzedMessage"]) -> "AnalyzedMessage":
+        """Analyze a message unless it already was"""
+        return message if isinstance(message, cls) else cls(message)
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Tests for write-behind message persistence, with SQLite standing in for PostgreSQL
+"""
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+
+from src.database.message_writer import MessageWriter, chat_messages, create_database_engine
+from src.models.chat_models import ChatMessage
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_database_engine(f"sqlite:///{tmp_path / 'chatbot.db'}")
+
+
+@pytest_asyncio.fixture
+async def writer(engine):
+    writer = MessageWriter(engine, batch_size=4, flush_interval=0.05)
+    yield writer
+    await writer.close()
+
+
+def messages(count, session_id="session-1"):
+    return [
+        ChatMessage(
+            content=f"Message {number}",
+            sender="user" if number % 2 == 0 else "bot",
+            session_id=session_id,
+            metadata={} if number % 2 == 0 else {"intent": "tools", "confidence": 0.8}
+        )
+        for number in range(count)
+    ]
+
+
+def stored_rows(engine):
+    with engine.connect() as connection:
+        query = select(chat_messages).order_by(chat_messages.c.created_at, chat_messages.c.id)
+        return connection.execute(query).mappings().all()
+
+
+def stored_count(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(chat_messages)).scalar()
+
+
+async def wait_for(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_full_batch_is_flushed_without_waiting_for_the_interval(engine):
+    writer = MessageWriter(engine, batch_size=4, flush_interval=60)
+    await writer.start()
+    sent = messages(4)
+    writer.enqueue(sent)
+    
+    await wait_for(lambda: writer.written == 4)
+    rows = stored_rows(engine)
+    assert [row["id"] for row in rows] == [message.id for message in sent]
+    assert rows[1]["metadata"] == {"intent": "tools", "confidence": 0.8}
+    assert rows[1]["sender"] == "bot"
+    assert writer.get_stats()["pending"] == 0
+    await writer.close()
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_after_the_interval(engine, writer):
+    await writer.start()
+    writer.enqueue(messages(3))
+    
+    assert writer.written == 0
+    await wait_for(lambda: writer.written == 3)
+    assert stored_count(engine) == 3
+
+
+@pytest.mark.asyncio
+async def test_close_drains_the_queue(engine):
+    writer = MessageWriter(engine, batch_size=4, flush_interval=60)
+    await writer.start()
+    writer.enqueue(messages(10, "session-1"))
+    writer.enqueue(messages(3, "session-2" * 20))
+    
+    await writer.close()
+    assert stored_count(engine) == 13
+    assert writer.get_stats() == {"pending": 0, "written": 13, "batches": 4, "failures": 0, "dropped": 0}
+
+
+@pytest.mark.asyncio
+async def test_rejected_rows_are_dropped_and_the_rest_written(engine, writer):
+    sent = messages(6)
+    writer.enqueue(sent[:2])
+    await writer.flush()
+    # The first two again: duplicate primary keys among new rows
+    writer.enqueue(sent[2:4] + sent[:2] + sent[4:])
+    
+    assert await writer.flush() == 4
+    assert [row["id"] for row in stored_rows(engine)] == [message.id for message in sent]
+    assert writer.get_stats()["dropped"] == 2
+    assert writer.get_stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_unreachable_database_keeps_messages_queued(tmp_path):
+    writer = MessageWriter(create_database_engine(f"sqlite:///{tmp_path / 'missing' / 'chatbot.db'}"), batch_size=4)
+    writer.enqueue(messages(6))
+    
+    assert await writer.flush() == 0
+    assert writer.get_stats()["pending"] == 6
+    assert writer.get_stats()["dropped"] == 0
+    
+    (tmp_path / "missing").mkdir()
+    assert await writer.flush() == 6
+    await writer.close()
\ No newline at end of file
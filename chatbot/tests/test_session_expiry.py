@@ -0,0 +1,60 @@
+"""
+Soak test of in-memory session expiry on a simulated clock
+"""
+
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.database.session_store import InMemorySessionStore
+from src.models.chat_models import ChatSession
+
+TIMEOUT = 60  # Simulated seconds
+RATE = 50  # Sessions created per simulated second
+REUSE = 0.5  # Sessions used again per new session
+USERS = 800
+MAX_PER_USER = 5
+
+
+@pytest.mark.asyncio
+async def test_expiry_soak_stays_bounded():
+    rng = random.Random(23)
+    store = InMemorySessionStore(MAX_PER_USER)
+    started_at = datetime(2026, 1, 1)
+    created = []
+    expired = 0
+    # Sessions created or used within one timeout, the most that can be live or scheduled
+    bound = int(RATE * (1 + REUSE)) * (TIMEOUT + 1)
+    
+    for second in range(1, 3 * TIMEOUT + 1):
+        now = started_at + timedelta(seconds=second)
+        for _ in range(RATE):
+            session_id = f"session-{len(created)}"
+            created.append(session_id)
+            await store.create(ChatSession(
+                id=session_id, user_id=f"user-{rng.randrange(USERS)}", created_at=now, updated_at=now
+            ))
+        for _ in range(int(RATE * REUSE)):
+            session = store.sessions.get(created[rng.randrange(len(created))])
+            if session is not None:
+                await store.touch(session.id, session.user_id, now)
+        
+        cutoff = now - timedelta(seconds=TIMEOUT)
+        before = {session_id: session.updated_at for session_id, session in store.sessions.items()}
+        expired += await store.expire(cutoff)
+        
+        gone = before.keys() - store.sessions.keys()
+        assert all(before[session_id] < cutoff for session_id in gone)
+        assert all(session.updated_at >= cutoff for session in store.sessions.values())
+        assert len(store.sessions) <= bound
+        assert len(store.sessions) <= len(store._expiry) == len(store._scheduled) <= bound
+        
+        per_user = Counter(session.user_id for session in store.sessions.values())
+        assert max(per_user.values()) <= MAX_PER_USER
+        assert all(len(session_ids) <= MAX_PER_USER for session_ids in store.user_sessions.values())
+        assert sum(len(session_ids) for session_ids in store.user_sessions.values()) == len(store.sessions)
+    
+    assert expired > 0 and store.evicted > 0
+    assert expired + store.evicted + len(store.sessions) == len(created)
\ No newline at end of file
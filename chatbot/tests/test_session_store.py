@@ -0,0 +1,134 @@
+"""
+Tests for the Redis session store, against an in-process fake Redis
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from fakeredis.aioredis import FakeRedis
+
+from src.database.session_store import RedisSessionStore
+from src.models.chat_models import ChatMessage, ChatSession
+
+STARTED = datetime(2026, 1, 1, 9, 0)
+
+
+@pytest_asyncio.fixture
+async def client():
+    client = FakeRedis(decode_responses=True)
+    yield client
+    # Fake clients of one process share their data
+    await client.flushall()
+    await client.aclose()
+
+
+@pytest.fixture
+def store(client):
+    return RedisSessionStore(client=client, ttl=600)
+
+
+def messages(session_id, count, start=0):
+    return [
+        ChatMessage(content=f"Message {number}", sender="user" if number % 2 == 0 else "bot", session_id=session_id)
+        for number in range(start, start + count)
+    ]
+
+
+async def create_session(store, session_id, user_id, updated_at=STARTED, initial=()):
+    session = ChatSession(
+        id=session_id, user_id=user_id, messages=list(initial), created_at=updated_at, updated_at=updated_at
+    )
+    await store.create(session)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_create_and_get(store):
+    await create_session(store, "session-1", "user-1", initial=messages("session-1", 2))
+    
+    session = await store.get("session-1")
+    assert session.user_id == "user-1"
+    assert session.updated_at == STARTED
+    assert await store.owner("session-1") == "user-1"
+    assert await store.count_messages("session-1") == 2
+    assert await store.get("missing") is None
+    assert await store.client.ttl(store._session_key("session-1")) == 600
+
+
+@pytest.mark.asyncio
+async def test_append_and_get_messages(store):
+    await create_session(store, "session-1", "user-1")
+    first, second = messages("session-1", 3), messages("session-1", 2, start=3)
+    await store.append_messages("session-1", "user-1", first, STARTED + timedelta(minutes=1))
+    await store.append_messages("session-1", "user-1", second, STARTED + timedelta(minutes=2))
+    
+    stored = await store.get_messages("session-1")
+    assert [message.content for message in stored] == [f"Message {number}" for number in range(5)]
+    assert [message.id for message in await store.get_messages("session-1", 1, 3)] == [first[1].id, first[2].id]
+    assert await store.get_messages("session-1", 0, 0) == []
+    assert (await store.get("session-1")).updated_at == STARTED + timedelta(minutes=2)
+    
+    for index, message in enumerate(first + second):
+        assert await store.find_message("session-1", message.id) == index
+    assert await store.find_message("session-1", "missing") is None
+
+
+@pytest.mark.asyncio
+async def test_find_message_in_session_stored_before_ids_were_indexed(store):
+    await create_session(store, "session-1", "user-1")
+    legacy, appended = messages("session-1", 3), messages("session-1", 2, start=3)
+    await store.client.rpush(store._messages_key("session-1"), *(message.model_dump_json() for message in legacy))
+    assert await store.find_message("session-1", legacy[1].id) == 1
+    
+    await store.append_messages("session-1", "user-1", appended, STARTED + timedelta(minutes=1))
+    for index, message in enumerate(legacy + appended):
+        assert await store.find_message("session-1", message.id) == index
+    assert await store.find_message("session-1", "missing") is None
+
+
+@pytest.mark.asyncio
+async def test_get_user_sessions_most_recent_first(store):
+    for number in range(3):
+        await create_session(store, f"session-{number}", "user-1", STARTED + timedelta(minutes=number))
+    await create_session(store, "other", "user-2")
+    await store.append_messages("session-0", "user-1", messages("session-0", 2), STARTED + timedelta(hours=1))
+    
+    sessions = await store.get_user_sessions("user-1", 10)
+    assert [session.id for session in sessions] == ["session-0", "session-2", "session-1"]
+    assert len(sessions[0].messages) == 2
+    assert [session.id for session in await store.get_user_sessions("user-1", 2)] == ["session-0", "session-2"]
+    
+    # Expired sessions are skipped and dropped from the user's index
+    await store.client.delete(store._session_key("session-1"))
+    assert [session.id for session in await store.get_user_sessions("user-1", 10)] == ["session-0", "session-2"]
+    assert await store.client.zcard(store._user_key("user-1")) == 2
+
+
+@pytest.mark.asyncio
+async def test_delete(store):
+    await create_session(store, "session-1", "user-1", initial=messages("session-1", 2))
+    
+    assert not await store.delete("session-1", "user-2")
+    assert await store.get("session-1") is not None
+    assert await store.delete("session-1", "user-1")
+    assert await store.get("session-1") is None
+    assert await store.get_messages("session-1") == []
+    assert await store.get_user_sessions("user-1", 10) == []
+    assert await store.client.keys("*") == []
+
+
+@pytest.mark.asyncio
+async def test_per_user_cap_evicts_least_recently_used(client):
+    store = RedisSessionStore(client=client, max_sessions_per_user=2)
+    for number in range(3):
+        await create_session(store, f"session-{number}", "user-1", STARTED + timedelta(minutes=number))
+    await store.touch("session-1", "user-1", STARTED + timedelta(hours=1))
+    await create_session(store, "session-3", "user-1", STARTED + timedelta(hours=2), messages("session-3", 1))
+    await create_session(store, "other", "user-2")
+    
+    assert [session.id for session in await store.get_user_sessions("user-1", 10)] == ["session-3", "session-1"]
+    for evicted in ["session-0", "session-2"]:
+        assert await store.get(evicted) is None
+        assert not await store.client.exists(*store._session_keys(evicted))
+    assert await store.get("other") is not None
@@ -0,0 +1,149 @@
+"""
+Multinomial logistic regression over sparse TF-IDF features
+
+Trained with full-batch Adam in NumPy and exported as memory-mappable
+``.npy`` arrays that the chatbot loads without any ML framework.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MODEL_FORMAT_VERSION = 1
+
+CSRMatrix = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def sparse_dot(matrix: CSRMatrix, dense: np.ndarray) -> np.ndarray:
+    """Multiply a CSR matrix with a dense matrix"""
+    indptr, indices, data = matrix
+    products = dense[indices] * data[:, None]
+    result = np.zeros((len(indptr) - 1, dense.shape[1]), dtype=dense.dtype)
+    
+    non_empty = np.flatnonzero(np.diff(indptr) > 0)
+    if len(non_empty):
+        result[non_empty] = np.add.reduceat(products, indptr[non_empty], axis=0)
+    return result
+
+
+def sparse_transpose_dot(matrix: CSRMatrix, dense: np.ndarray, column_count: int) -> np.ndarray:
+    """Multiply the transpose of a CSR matrix with a dense matrix"""
+    indptr, indices, data = matrix
+    rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+    result = np.zeros((column_count, dense.shape[1]), dtype=dense.dtype)
+    np.add.at(result, indices, dense[rows] * data[:, None])
+    return result
+
+
+def softmax(logits: np.ndarray) -> np.ndarray:
+    """Row-wise softmax"""
+    shifted = logits - logits.max(axis=1, keepdims=True)
+    exponentials = np.exp(shifted)
+    return exponentials / exponentials.sum(axis=1, keepdims=True)
+
+
+class LinearIntentModel:
+    """Softmax regression: probabilities = softmax(x @ weights + bias)"""
+    
+    def __init__(self, intents: List[str], feature_count: int):
+        self.intents = list(intents)
+        self.weights = np.zeros((feature_count, len(intents)), dtype=np.float32)
+        self.bias = np.zeros(len(intents), dtype=np.float32)
+    
+    def fit(
+        self,
+        features: CSRMatrix,
+        labels: np.ndarray,
+        epochs: int = 300,
+        learning_rate: float = 0.1,
+        l2: float = 1e-4
+    ) -> List[float]:
+        """
+        Fit weights with full-batch Adam on L2-regularized cross-entropy
+        
+        Returns:
+            Training loss per epoch
+        """
+        sample_count = len(labels)
+        targets = np.zeros((sample_count, len(self.intents)), dtype=np.float32)
+        targets[np.arange(sample_count), labels] = 1.0
+        
+        parameters = [self.weights, self.bias]
+        first_moments = [np.zeros_like(parameter) for parameter in parameters]
+        second_moments = [np.zeros_like(parameter) for parameter in parameters]
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        
+        losses = []
+        for epoch in range(1, epochs + 1):
+            probabilities = softmax(sparse_dot(features, self.weights) + self.bias)
+            losses.append(float(
+                -np.mean(np.log(probabilities[np.arange(sample_count), labels] + 1e-12))
+                + 0.5 * l2 * np.sum(self.weights ** 2)
+            ))
+            
+            errors = (probabilities - targets) / sample_count
+            gradients = [
+                sparse_transpose_dot(features, errors, self.weights.shape[0]) + l2 * self.weights,
+                errors.sum(axis=0)
+            ]
+            
+            for parameter, gradient, first, second in zip(
+                parameters, gradients, first_moments, second_moments
+            ):
+                first *= beta1
+                first += (1 - beta1) * gradient
+                second *= beta2
+                second += (1 - beta2) * gradient ** 2
+                corrected_first = first / (1 - beta1 ** epoch)
+                corrected_second = second / (1 - beta2 ** epoch)
+                parameter -= learning_rate * corrected_first / (np.sqrt(corrected_second) + epsilon)
+        
+        return losses
+    
+    def predict(self, features: CSRMatrix) -> np.ndarray:
+        """Predict label indices"""
+        return (sparse_dot(features, self.weights) + self.bias).argmax(axis=1)
+    
+    def save(self, path: str, vocabulary: Dict[str, int], idf: np.ndarray, feature_spec: Dict, metrics: Dict):
+        """
+        Export the model directory read by the chatbot's IntentModel
+        
+        Layout:
+            meta.json        format version, intents, feature settings, metrics
+            vocabulary.txt   one term per line, line number = feature id
+            idf.npy          float32 (features,)
+            weights.npy      float32 (features, intents), row per term
+            bias.npy         float32 (intents,)
+        
+        The directory is written to a staging directory next to ``path``
+        and renamed into place, so a reader never sees a half-written model.
+        """
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=".intent-model-", dir=parent)
+        
+        terms = sorted(vocabulary, key=vocabulary.__getitem__)
+        with open(os.path.join(staging, "vocabulary.txt"), "w", encoding="utf-8") as handle:
+            handle.write("\n".join(terms))
+        np.save(os.path.join(staging, "idf.npy"), idf.astype(np.float32))
+        np.save(os.path.join(staging, "weights.npy"), np.ascontiguousarray(self.weights, dtype=np.float32))
+        np.save(os.path.join(staging, "bias.npy"), self.bias.astype(np.float32))
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as handle:
+            json.dump({
+                "format_version": MODEL_FORMAT_VERSION,
+                "intents": self.intents,
+                "features": feature_spec,
+                "metrics": metrics
+            }, handle, indent=2)
+        
+        previous = None
+        if os.path.exists(path):
+            previous = tempfile.mkdtemp(prefix=".intent-model-old-", dir=parent)
+            os.rename(path, os.path.join(previous, "model"))
+        os.rename(staging, path)
+        if previous:
+            shutil.rmtree(previous, ignore_errors=True)
\ No newline at end of file
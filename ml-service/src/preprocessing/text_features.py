@@ -0,0 +1,123 @@
+"""
+Text normalization and TF-IDF features for intent classification
+
+The normalization mirrors ``normalize_text`` in the chatbot service's
+``src/nlp/text_analysis.py`` (keep the two in step), and the feature settings are exported with the model so
+the serving side can rebuild identical vectors without this module.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+TOKEN_PATTERN = r"\b\w\w+\b"
+
+CONTRACTIONS = {
+    "can't": "cannot",
+    "won't": "will not",
+    "i'm": "i am",
+    "i've": "i have",
+    "i'll": "i will",
+    "don't": "do not",
+    "doesn't": "does not",
+    "didn't": "did not",
+    "haven't": "have not",
+    "hasn't": "has not",
+    "shouldn't": "should not",
+    "wouldn't": "would not",
+    "couldn't": "could not"
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s\-\']")
+_CONTRACTION = re.compile("|".join(re.escape(contraction) for contraction in CONTRACTIONS))
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip punctuation and expand contractions like the chatbot does"""
+    processed = " ".join(text.lower().split())
+    processed = _PUNCTUATION.sub(" ", processed)
+    processed = _CONTRACTION.sub(lambda match: CONTRACTIONS[match.group(0)], processed)
+    return processed.strip()
+
+
+class TfidfFeaturizer:
+    """
+    Sublinear TF-IDF over word n-grams with L2-normalized rows
+    
+    Matrices are returned in CSR form as (indptr, indices, data) arrays.
+    """
+    
+    def __init__(self, ngram_range: Tuple[int, int] = (1, 2), min_df: int = 1):
+        self.ngram_range = ngram_range
+        self.min_df = min_df
+        self.token_pattern = re.compile(TOKEN_PATTERN)
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+    
+    def terms(self, text: str) -> List[str]:
+        """Split normalized text into word n-grams"""
+        tokens = self.token_pattern.findall(text)
+        low, high = self.ngram_range
+        return [
+            " ".join(tokens[start:start + size])
+            for size in range(low, high + 1)
+            for start in range(len(tokens) - size + 1)
+        ]
+    
+    def fit(self, texts: Iterable[str]) -> "TfidfFeaturizer":
+        """Learn the vocabulary and smoothed IDF weights"""
+        texts = list(texts)
+        document_frequency = Counter()
+        for text in texts:
+            document_frequency.update(set(self.terms(text)))
+        
+        kept = sorted(term for term, count in document_frequency.items() if count >= self.min_df)
+        self.vocabulary = {term: index for index, term in enumerate(kept)}
+        
+        document_count = len(texts)
+        self.idf = np.array(
+            [math.log((1 + document_count) / (1 + document_frequency[term])) + 1 for term in kept],
+            dtype=np.float32
+        )
+        return self
+    
+    def transform(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Vectorize texts into a CSR matrix"""
+        indptr = [0]
+        indices: List[int] = []
+        data: List[float] = []
+        
+        for text in texts:
+            counts = Counter(
+                self.vocabulary[term] for term in self.terms(text) if term in self.vocabulary
+            )
+            row_ids = sorted(counts)
+            row_values = np.array(
+                [(1.0 + math.log(counts[term_id])) * self.idf[term_id] for term_id in row_ids],
+                dtype=np.float32
+            )
+            norm = float(np.sqrt(np.dot(row_values, row_values)))
+            if norm > 0:
+                row_values /= norm
+            
+            indices.extend(row_ids)
+            data.extend(row_values.tolist())
+            indptr.append(len(indices))
+        
+        return (
+            np.array(indptr, dtype=np.int64),
+            np.array(indices, dtype=np.int64),
+            np.array(data, dtype=np.float32)
+        )
+    
+    def feature_spec(self) -> Dict:
+        """Settings the serving side needs to rebuild identical vectors"""
+        return {
+            "token_pattern": TOKEN_PATTERN,
+            "ngram_range": list(self.ngram_range),
+            "sublinear_tf": True,
+            "norm": "l2"
+        }
\ No newline at end of file
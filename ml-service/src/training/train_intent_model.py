@@ -0,0 +1,177 @@
+"""
+Train the chatbot intent model
+
+Fits TF-IDF + multinomial logistic regression on the ``examples`` of the
+chatbot's INTENT_CATEGORIES plus optional labelled chat logs, reports
+held-out accuracy and exports the model for ``IntentClassifier.load_models``.
+
+Usage (from the ml-service directory):
+    python -m src.training.train_intent_model \
+        --logs data/labelled_messages.ndjson \
+        --output ../chatbot/models/intent_classifier
+
+Labelled logs are NDJSON, one {"message": ..., "intent": ...} per line.
+"""
+
+import argparse
+import ast
+import json
+import logging
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from ..models.linear_intent_model import LinearIntentModel
+from ..preprocessing.text_features import TfidfFeaturizer, normalize_text
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CATEGORIES_PATH = REPO_ROOT / "chatbot" / "src" / "config.py"
+DEFAULT_OUTPUT_PATH = REPO_ROOT / "chatbot" / "models" / "intent_classifier"
+
+
+def load_intent_categories(path: Path) -> Dict[str, Dict]:
+    """
+    Load INTENT_CATEGORIES from a JSON file or from the chatbot's config.py
+    
+    The Python source is parsed, not imported, so training does not need
+    the chatbot's runtime dependencies.
+    """
+    text = Path(path).read_text(encoding="utf-8")
+    if str(path).endswith(".json"):
+        return json.loads(text)
+    
+    for node in ast.parse(text).body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == "INTENT_CATEGORIES"
+            for target in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise ValueError(f"INTENT_CATEGORIES not found in {path}")
+
+
+def load_labelled_logs(paths: List[Path]) -> List[Tuple[str, str]]:
+    """Read (message, intent) pairs from NDJSON files"""
+    samples = []
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                    samples.append((record["message"], record["intent"]))
+                except (ValueError, KeyError) as e:
+                    logger.warning(f"Skipping {path}:{line_number}: {str(e)}")
+    return samples
+
+
+def split_holdout(
+    samples: List[Tuple[str, str]],
+    holdout: float,
+    seed: int
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    """Split samples per intent so every intent keeps training data"""
+    by_intent: Dict[str, List[Tuple[str, str]]] = {}
+    for sample in samples:
+        by_intent.setdefault(sample[1], []).append(sample)
+    
+    rng = random.Random(seed)
+    train, test = [], []
+    for intent_samples in by_intent.values():
+        rng.shuffle(intent_samples)
+        test_count = int(len(intent_samples) * holdout)
+        test.extend(intent_samples[:test_count])
+        train.extend(intent_samples[test_count:])
+    return train, test
+
+
+def train(
+    categories: Dict[str, Dict],
+    logs: List[Tuple[str, str]],
+    output: Path,
+    holdout: float = 0.2,
+    ngram_max: int = 2,
+    min_df: int = 1,
+    epochs: int = 300,
+    l2: float = 1e-4,
+    seed: int = 13
+) -> Dict[str, float]:
+    """Train, evaluate and export the intent model"""
+    intents = list(categories.keys())
+    samples = [
+        (example, intent)
+        for intent, config in categories.items()
+        for example in config.get("examples", [])
+    ]
+    samples.extend((message, intent) for message, intent in logs if intent in categories)
+    
+    # Category examples are too few to hold out; evaluate on logs only
+    train_samples, test_samples = samples, []
+    if logs and holdout > 0:
+        train_samples, test_samples = split_holdout(samples, holdout, seed)
+    
+    intent_ids = {intent: index for index, intent in enumerate(intents)}
+    featurizer = TfidfFeaturizer(ngram_range=(1, ngram_max), min_df=min_df)
+    featurizer.fit(normalize_text(text) for text, _ in train_samples)
+    
+    model = LinearIntentModel(intents, len(featurizer.vocabulary))
+    losses = model.fit(
+        featurizer.transform(normalize_text(text) for text, _ in train_samples),
+        np.array([intent_ids[intent] for _, intent in train_samples]),
+        epochs=epochs,
+        l2=l2
+    )
+    
+    metrics = {
+        "train_samples": len(train_samples),
+        "test_samples": len(test_samples),
+        "vocabulary_size": len(featurizer.vocabulary),
+        "final_loss": losses[-1] if losses else None
+    }
+    if test_samples:
+        predictions = model.predict(
+            featurizer.transform(normalize_text(text) for text, _ in test_samples)
+        )
+        expected = np.array([intent_ids[intent] for _, intent in test_samples])
+        metrics["test_accuracy"] = float(np.mean(predictions == expected))
+    
+    model.save(str(output), featurizer.vocabulary, featurizer.idf, featurizer.feature_spec(), metrics)
+    logger.info(f"Exported intent model to {output}: {metrics}")
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the chatbot intent model")
+    parser.add_argument("--categories", type=Path, default=DEFAULT_CATEGORIES_PATH,
+                        help="INTENT_CATEGORIES source (config.py or JSON)")
+    parser.add_argument("--logs", type=Path, nargs="*", default=[],
+                        help="Labelled NDJSON message logs")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT_PATH,
+                        help="Model directory (the chatbot's INTENT_MODEL_PATH)")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--ngram-max", type=int, default=2)
+    parser.add_argument("--min-df", type=int, default=1)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--l2", type=float, default=1e-4)
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    metrics = train(
+        load_intent_categories(args.categories),
+        load_labelled_logs(args.logs),
+        args.output,
+        holdout=args.holdout,
+        ngram_max=args.ngram_max,
+        min_df=args.min_df,
+        epochs=args.epochs,
+        l2=args.l2
+    )
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file